@@ -4,7 +4,7 @@ echo   STARTING HOTELBASE ^& RESTO SYSTEMS
 echo ================================================
 echo.
 
-echo [1/4] Starting PM2 processes...
+echo [1/4] Starting PM2 processes (backends, frontends, resto ticket worker)...
 pm2 start ecosystem.config.js
 
 echo.
@@ -31,4 +31,6 @@ echo Atau gunakan IP:
 echo Resto:     http://192.168.1.100/resto
 echo HotelBase: http://192.168.1.100/hotel
 echo.
+echo Resto ticket worker logs: pm2 logs resto-ticket-worker
+echo.
 pause
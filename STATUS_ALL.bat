@@ -7,6 +7,10 @@ echo.
 echo [PM2 PROCESSES]
 pm2 status
 
+echo.
+echo [RESTO TICKET WORKER]
+pm2 describe resto-ticket-worker | findstr /r "status restarts uptime"
+
 echo.
 echo [PORT USAGE]
 netstat -ano | findstr :3000
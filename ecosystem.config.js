@@ -22,6 +22,28 @@ module.exports = {
       log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
       time: true,
     },
+    {
+      // Renders the queued kitchen/bar PDF tickets (TicketRenderJob); without it
+      // orders still save but no tickets are produced
+      name: 'resto-ticket-worker',
+      cwd: 'C:/ladapala/resto/backend',
+      script: 'uv',
+      args: 'run python manage.py render_tickets',
+      interpreter: 'none',
+      instances: 1,
+      autorestart: true,
+      watch: false,
+      max_memory_restart: '300M',
+      exec_mode: 'fork',
+      env: {
+        PYTHONUNBUFFERED: '1',
+        DJANGO_SETTINGS_MODULE: 'core.settings',
+      },
+      error_file: 'C:/ladapala/logs/resto/ticket-worker-error.log',
+      out_file: 'C:/ladapala/logs/resto/ticket-worker-out.log',
+      log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+      time: true,
+    },
     {
       name: 'resto-frontend',
       cwd: 'C:/ladapala/resto/frontend',
@@ -0,0 +1,44 @@
+"""
+Management command to build DailyKPISnapshot rows
+Run nightly (e.g. from cron shortly after midnight) to snapshot yesterday;
+pass --start/--end to rebuild a historical range on demand
+"""
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.hotel.services.kpi_snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Build daily KPI snapshots (occupancy, ADR, RevPAR, revenue) for past days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD), defaults to yesterday')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Without --start, rebuild this many days ending yesterday (catches late payments)',
+        )
+
+    def _parse(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        end_date = self._parse(options['end']) if options['end'] else yesterday
+        if options['start']:
+            start_date = self._parse(options['start'])
+        else:
+            start_date = end_date - timedelta(days=max(options['days'], 1) - 1)
+
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        self.stdout.write(f'Building KPI snapshots {start_date} to {end_date}...')
+        written = rebuild_snapshots(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'KPI snapshots built: {written} days'))
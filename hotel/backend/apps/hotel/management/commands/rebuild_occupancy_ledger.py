@@ -0,0 +1,22 @@
+"""
+Management command to backfill the RoomNight occupancy ledger from reservations
+"""
+from django.core.management.base import BaseCommand
+from apps.hotel.services.occupancy_ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the room-night occupancy ledger used by occupancy analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of room-night rows to insert per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding occupancy ledger...')
+        written = rebuild_ledger(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Occupancy ledger rebuilt: {written} room nights'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_room_nights(apps, schema_editor):
+    """Fill the ledger from the existing reservations, like rebuild_occupancy_ledger"""
+    from apps.hotel.services.occupancy_ledger import rebuild_ledger
+
+    rebuild_ledger(
+        reservation_model=apps.get_model('hotel', 'Reservation'),
+        room_night_model=apps.get_model('hotel', 'RoomNight')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0041_warehouseitem_maintenancerequest_parts_needed_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Night of stay (check-in date up to the night before check-out)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='hotel.reservation')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='hotel.room')),
+            ],
+            options={
+                'verbose_name': 'Room Night',
+                'verbose_name_plural': 'Room Nights',
+                'ordering': ['date', 'room'],
+                'indexes': [models.Index(fields=['date', 'room'], name='hotel_roomn_date_76d210_idx')],
+                'unique_together': {('reservation', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
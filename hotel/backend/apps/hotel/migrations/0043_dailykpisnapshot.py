@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:47
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0042_roomnight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyKPISnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_rooms', models.IntegerField(default=0, help_text='Active rooms when the snapshot was built')),
+                ('occupied_rooms', models.IntegerField(default=0, help_text='Rooms occupied that night (occupancy ledger)')),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Room revenue earned that night (reservation total spread over its nights)', max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Completed payments received that day', max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('expenses', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Paid expenses recorded that day', max_digits=14)),
+                ('check_ins', models.IntegerField(default=0, help_text='Reservations with check-in on this date')),
+                ('check_outs', models.IntegerField(default=0, help_text='Reservations with check-out on this date')),
+                ('occupancy_rate', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('adr', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Average daily rate', max_digits=14)),
+                ('revpar', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Revenue per available room', max_digits=14)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily KPI Snapshot',
+                'verbose_name_plural': 'Daily KPI Snapshots',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0043_dailykpisnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'payment_date'], name='hotel_payme_status_ec8d40_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['check_in_date', 'status'], name='hotel_reser_check_i_5dd312_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['check_out_date', 'status'], name='hotel_reser_check_o_22b25d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['created_at'], name='hotel_reser_created_718763_idx'),
+        ),
+    ]
@@ -20,6 +20,8 @@ from .audit import WarehouseAuditLog
 from .promotions import Voucher, Discount, LoyaltyProgram, GuestLoyaltyPoints, LoyaltyTransaction
 from .lost_found import LostAndFound
 from .wake_up_call import WakeUpCall
+from .occupancy import RoomNight
+from .kpi import DailyKPISnapshot
 
 # Make all models available for import
 __all__ = [
@@ -32,5 +34,5 @@ __all__ = [
     'EventBooking', 'EventPackage', 'FoodPackage', 'EventPayment', 'EventAddOn',
     'WarehouseAuditLog',
     'Voucher', 'Discount', 'LoyaltyProgram', 'GuestLoyaltyPoints', 'LoyaltyTransaction',
-    'LostAndFound', 'WakeUpCall'
+    'LostAndFound', 'WakeUpCall', 'RoomNight', 'DailyKPISnapshot'
 ]
@@ -0,0 +1,43 @@
+"""
+KPI Snapshot Model
+Precomputed daily hotel KPIs used by analytics, financial and report summaries
+"""
+from decimal import Decimal
+from django.db import models
+
+
+class DailyKPISnapshot(models.Model):
+    """Occupancy and revenue figures for one past day, filled nightly by build_kpi_snapshots"""
+
+    date = models.DateField(unique=True)
+    total_rooms = models.IntegerField(default=0, help_text='Active rooms when the snapshot was built')
+    occupied_rooms = models.IntegerField(default=0, help_text='Rooms occupied that night (occupancy ledger)')
+    room_revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'),
+        help_text='Room revenue earned that night (reservation total spread over its nights)'
+    )
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'),
+        help_text='Completed payments received that day'
+    )
+    payment_count = models.IntegerField(default=0)
+    expenses = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'),
+        help_text='Paid expenses recorded that day'
+    )
+    check_ins = models.IntegerField(default=0, help_text='Reservations with check-in on this date')
+    check_outs = models.IntegerField(default=0, help_text='Reservations with check-out on this date')
+
+    occupancy_rate = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+    adr = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), help_text='Average daily rate')
+    revpar = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), help_text='Revenue per available room')
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        verbose_name = 'Daily KPI Snapshot'
+        verbose_name_plural = 'Daily KPI Snapshots'
+
+    def __str__(self):
+        return f'KPI {self.date}'
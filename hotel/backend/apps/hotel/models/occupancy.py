@@ -0,0 +1,39 @@
+"""
+Occupancy Ledger Model
+Denormalized room-night rows used for occupancy analytics
+"""
+from django.db import models
+from .reservations import Reservation
+from .rooms import Room
+
+
+class RoomNight(models.Model):
+    """One occupied room for one night, derived from a reservation"""
+
+    # Reservation statuses that occupy a room for analytics purposes
+    OCCUPYING_STATUSES = ['CHECKED_IN', 'CONFIRMED', 'CHECKED_OUT']
+
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name='room_nights'
+    )
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name='room_nights'
+    )
+    date = models.DateField(help_text='Night of stay (check-in date up to the night before check-out)')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['date', 'room']
+        verbose_name = 'Room Night'
+        verbose_name_plural = 'Room Nights'
+        unique_together = ['reservation', 'date']
+        indexes = [
+            models.Index(fields=['date', 'room']),
+        ]
+
+    def __str__(self):
+        return f'{self.room.number} - {self.date}'
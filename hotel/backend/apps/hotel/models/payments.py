@@ -83,6 +83,10 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ['-payment_date']
+        indexes = [
+            # Revenue reports: status='COMPLETED' over a payment_date range
+            models.Index(fields=['status', 'payment_date']),
+        ]
 
     def __str__(self):
         return f'Payment {self.id} - {self.reservation.reservation_number}'
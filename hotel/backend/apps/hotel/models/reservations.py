@@ -43,6 +43,13 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ['check_in_date']  # Closest dates first
+        indexes = [
+            # Arrivals/departures per day or range, optionally by status; the
+            # check_out_date index also serves "in house between" overlap queries
+            models.Index(fields=['check_in_date', 'status']),
+            models.Index(fields=['check_out_date', 'status']),
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f'Reservation {self.reservation_number} - {self.guest.full_name}'
@@ -69,56 +76,90 @@ class Reservation(models.Model):
             return self.room_type.base_price * self.nights
         return Decimal('0.00')
 
+    # Tax charged on the room total; additional charges are not taxed
+    TAX_RATE = Decimal('0.11')
+
+    def _is_prefetched(self, relation):
+        """True if the reverse relation was loaded with prefetch_related"""
+        return relation in getattr(self, '_prefetched_objects_cache', {})
+
+    def _completed_payment_sums(self):
+        """Amount paid and discounts given over COMPLETED payments (prefetched or one aggregate query)"""
+        if self._is_prefetched('payments'):
+            completed_payments = [payment for payment in self.payments.all() if payment.status == 'COMPLETED']
+            total_paid = sum((payment.amount for payment in completed_payments), Decimal('0.00'))
+            total_discounts = sum(
+                (
+                    (payment.voucher_discount or 0) + (payment.discount_amount or 0) + (payment.loyalty_points_value or 0)
+                    for payment in completed_payments
+                ),
+                Decimal('0.00')
+            )
+            return total_paid, total_discounts
+
+        sums = self.payments.filter(status='COMPLETED').aggregate(
+            total_paid=models.Sum('amount'),
+            voucher_discount=models.Sum('voucher_discount'),
+            discount_amount=models.Sum('discount_amount'),
+            loyalty_points_value=models.Sum('loyalty_points_value')
+        )
+        total_discounts = (
+            (sums['voucher_discount'] or Decimal('0.00'))
+            + (sums['discount_amount'] or Decimal('0.00'))
+            + (sums['loyalty_points_value'] or Decimal('0.00'))
+        )
+        return sums['total_paid'] or Decimal('0.00'), total_discounts
+
     def get_additional_charges_total(self):
         """Calculate total additional charges for this reservation"""
+        if self._is_prefetched('additional_charges'):
+            return sum(
+                (charge.amount * charge.quantity for charge in self.additional_charges.all()),
+                Decimal('0.00')
+            )
+
         total = self.additional_charges.aggregate(
             total=models.Sum(models.F('amount') * models.F('quantity'))
         )['total']
         return total or Decimal('0.00')
 
+    def _grand_total(self, additional_charges_total):
+        """Room total + tax + additional charges"""
+        return self.calculate_total_amount() * (1 + self.TAX_RATE) + additional_charges_total
+
     def get_grand_total(self):
         """Calculate grand total including room, tax, and additional charges"""
-        room_total = self.calculate_total_amount()
-        # Add tax (11%)
-        subtotal_with_tax = room_total * Decimal('1.11')
-        # Add additional charges
-        additional_charges = self.get_additional_charges_total()
-        return subtotal_with_tax + additional_charges
+        return self._grand_total(self.get_additional_charges_total())
 
     def get_total_paid(self):
         """Calculate total amount paid for this reservation"""
-        from .payments import Payment
-        total = self.payments.filter(status='COMPLETED').aggregate(
-            total=models.Sum('amount')
-        )['total']
-        return total or Decimal('0.00')
+        return self._completed_payment_sums()[0]
 
     def get_expected_payment_amount(self):
         """Calculate expected payment amount after discounts/vouchers"""
-        from .payments import Payment
-
-        # Start with grand total (base + tax + additional charges)
-        grand_total = self.get_grand_total()
-
-        # Get total discounts from all payments for this reservation
-        total_discounts = self.payments.filter(status='COMPLETED').aggregate(
-            voucher_discount=models.Sum('voucher_discount'),
-            discount_amount=models.Sum('discount_amount'),
-            loyalty_points_value=models.Sum('loyalty_points_value')
-        )
-
-        voucher_discount = total_discounts['voucher_discount'] or Decimal('0.00')
-        discount_amount = total_discounts['discount_amount'] or Decimal('0.00')
-        loyalty_points_value = total_discounts['loyalty_points_value'] or Decimal('0.00')
-
-        # Expected amount = grand total - all discounts
-        expected = grand_total - voucher_discount - discount_amount - loyalty_points_value
-
-        # Ensure it's not negative
-        return max(expected, Decimal('0.00'))
+        return self.get_folio_totals()['expected_payment']
 
     def is_fully_paid(self):
         """Check if reservation is fully paid including additional charges and discounts"""
-        expected_total = self.get_expected_payment_amount()
-        total_paid = self.get_total_paid()
-        return total_paid >= expected_total
\ No newline at end of file
+        return self.get_folio_totals()['is_fully_paid']
+
+    def get_folio_totals(self):
+        """
+        Every folio money figure; the one place that applies tax and discounts
+        Reads prefetched payments/additional_charges when available (no queries),
+        otherwise runs one aggregate query per relation
+        """
+        additional_charges_total = self.get_additional_charges_total()
+        total_paid, total_discounts = self._completed_payment_sums()
+
+        grand_total = self._grand_total(additional_charges_total)
+        # Expected amount = grand total - all discounts, never negative
+        expected_payment = max(grand_total - total_discounts, Decimal('0.00'))
+
+        return {
+            'additional_charges_total': additional_charges_total,
+            'total_paid': total_paid,
+            'grand_total': grand_total,
+            'expected_payment': expected_payment,
+            'is_fully_paid': total_paid >= expected_payment,
+        }
@@ -41,35 +41,20 @@ class RoomTypeSerializer(serializers.ModelSerializer):
             check_out = request.query_params.get('check_out')
 
             if check_in and check_out:
-                from datetime import datetime
-                from django.db.models import Q
+                from ..services.availability import AvailabilityIndex, parse_stay_dates
 
                 try:
-                    check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
-                    check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
-
-                    # Get all active rooms of this type
-                    all_rooms = obj.rooms.filter(is_active=True)
-                    total_rooms = all_rooms.count()
-
-                    # Find rooms with overlapping reservations in the date range
-                    # A reservation overlaps if:
-                    # - Its check_in is before our check_out AND
-                    # - Its check_out is after our check_in
-                    occupied_room_ids = Reservation.objects.filter(
-                        Q(room__room_type=obj) &
-                        Q(check_in_date__lt=check_out_date) &
-                        Q(check_out_date__gt=check_in_date) &
-                        ~Q(status__in=['CANCELLED', 'NO_SHOW', 'CHECKED_OUT'])
-                    ).values_list('room_id', flat=True).distinct()
-
-                    # Available rooms = total rooms - occupied rooms
-                    available_count = total_rooms - len(set(occupied_room_ids))
-                    return max(0, available_count)
-
+                    check_in_date, check_out_date = parse_stay_dates(check_in, check_out)
                 except (ValueError, TypeError):
                     # If date parsing fails, fall back to current status
                     pass
+                else:
+                    # Load booked intervals once and share them across every room type in the list
+                    availability = self.context.get('availability')
+                    if availability is None:
+                        availability = AvailabilityIndex(check_in_date, check_out_date)
+                        self.context['availability'] = availability
+                    return availability.available_count(obj.id, check_in_date, check_out_date)
 
         # Default: return currently available rooms
         return obj.rooms.filter(status='AVAILABLE', is_active=True).count()
@@ -186,6 +171,9 @@ class GuestSerializer(serializers.ModelSerializer):
 
     def get_total_stays(self, obj):
         """Count completed reservations"""
+        if hasattr(obj, 'stat_total_stays'):
+            return obj.stat_total_stays
+
         from ..models import Reservation
         return Reservation.objects.filter(
             guest=obj,
@@ -194,9 +182,10 @@ class GuestSerializer(serializers.ModelSerializer):
 
     def get_total_nights(self, obj):
         """Sum total nights from completed reservations"""
+        if hasattr(obj, 'stat_total_nights'):
+            return obj.stat_total_nights.days if obj.stat_total_nights else 0
+
         from ..models import Reservation
-        from django.db.models import Sum, F
-        from datetime import timedelta
 
         reservations = Reservation.objects.filter(
             guest=obj,
@@ -212,6 +201,9 @@ class GuestSerializer(serializers.ModelSerializer):
 
     def get_total_spent(self, obj):
         """Calculate total amount spent from completed reservations"""
+        if hasattr(obj, 'stat_total_spent'):
+            return float(obj.stat_total_spent)
+
         from ..models import Reservation, Payment
         from django.db.models import Sum
 
@@ -230,6 +222,9 @@ class GuestSerializer(serializers.ModelSerializer):
 
     def get_last_stay_date(self, obj):
         """Get the check-out date of the most recent completed stay"""
+        if hasattr(obj, 'stat_last_stay_date'):
+            return obj.stat_last_stay_date
+
         from ..models import Reservation
 
         last_stay = Reservation.objects.filter(
@@ -241,6 +236,9 @@ class GuestSerializer(serializers.ModelSerializer):
 
     def get_upcoming_stays(self, obj):
         """Count upcoming confirmed reservations"""
+        if hasattr(obj, 'stat_upcoming_stays'):
+            return obj.stat_upcoming_stays
+
         from ..models import Reservation
         from django.utils import timezone
 
@@ -254,9 +252,12 @@ class GuestSerializer(serializers.ModelSerializer):
         """Get all reservations for this guest with full details"""
         from ..models import Reservation
 
-        reservations = Reservation.objects.filter(
-            guest=obj
-        ).select_related('room', 'room_type').order_by('-check_in_date')
+        if hasattr(obj, 'prefetched_reservations'):
+            reservations = obj.prefetched_reservations
+        else:
+            reservations = Reservation.objects.filter(
+                guest=obj
+            ).select_related('room', 'room_type').order_by('-check_in_date')
 
         return [{
             'id': res.id,
@@ -321,6 +322,11 @@ class ReservationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'reservation_number', 'nights']
 
+    def to_representation(self, instance):
+        # Compute folio totals once per reservation; the money fields below read from it
+        self._folio = instance.get_folio_totals()
+        return super().to_representation(instance)
+
     def get_subtotal(self, obj):
         """Calculate subtotal (room rate * nights)"""
         if obj.room and obj.room.room_type:
@@ -340,7 +346,7 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     def get_additional_charges_total(self, obj):
         """Calculate total additional charges"""
-        return float(obj.get_additional_charges_total())
+        return float(self._folio['additional_charges_total'])
 
     def get_additional_charges(self, obj):
         """Get all additional charges for this reservation"""
@@ -370,11 +376,11 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     def get_total_paid(self, obj):
         """Get total amount paid for this reservation"""
-        return float(obj.get_total_paid())
+        return float(self._folio['total_paid'])
 
     def get_is_fully_paid(self, obj):
         """Check if reservation is fully paid"""
-        return obj.is_fully_paid()
+        return self._folio['is_fully_paid']
 
     def get_can_cancel(self, obj):
         """Check if reservation can be cancelled"""
@@ -779,6 +785,9 @@ class GuestListSerializer(serializers.ModelSerializer):
 
     def get_total_stays(self, obj):
         """Count completed reservations"""
+        if hasattr(obj, 'stat_total_stays'):
+            return obj.stat_total_stays
+
         from ..models import Reservation
         return Reservation.objects.filter(
             guest=obj,
@@ -787,6 +796,9 @@ class GuestListSerializer(serializers.ModelSerializer):
 
     def get_total_spent(self, obj):
         """Calculate total amount spent from completed reservations"""
+        if hasattr(obj, 'stat_total_spent'):
+            return float(obj.stat_total_spent)
+
         from ..models import Reservation, Payment
         from django.db.models import Sum
 
@@ -824,17 +836,22 @@ class ReservationListSerializer(serializers.ModelSerializer):
             'booking_source_display', 'is_fully_paid', 'grand_total', 'created_at'
         ]
 
+    def to_representation(self, instance):
+        # Compute folio totals once per reservation
+        self._folio = instance.get_folio_totals()
+        return super().to_representation(instance)
+
     def get_total_guests(self, obj):
         """Calculate total number of guests (adults + children)"""
         return obj.adults + obj.children
 
     def get_is_fully_paid(self, obj):
         """Check if reservation is fully paid"""
-        return obj.is_fully_paid()
+        return self._folio['is_fully_paid']
 
     def get_grand_total(self, obj):
         """Calculate grand total including taxes and additional charges"""
-        return float(obj.get_grand_total())
+        return float(self._folio['grand_total'])
 
 
 class HolidayListSerializer(serializers.ModelSerializer):
@@ -0,0 +1,134 @@
+"""
+Room Availability Service
+Loads booked intervals once per request and answers date-range availability
+for every room and room type without further queries
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+
+from ..models.reservations import Reservation
+from ..models.rooms import Room
+
+
+# Reservations in these statuses no longer hold a room
+NON_BLOCKING_STATUSES = ['CANCELLED', 'NO_SHOW', 'CHECKED_OUT']
+
+
+def parse_stay_dates(check_in, check_out):
+    """
+    Parse check_in/check_out query strings (YYYY-MM-DD)
+    Returns: (check_in_date, check_out_date) or raises ValueError
+    """
+    check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
+    check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
+    if check_out_date <= check_in_date:
+        raise ValueError('check_out must be after check_in')
+    return check_in_date, check_out_date
+
+
+class RoomIntervals:
+    """
+    Booked [check_in, check_out) intervals of one room, sorted by start date.
+    A running maximum of end dates lets overlap checks run in O(log n) even
+    when intervals overlap each other (double bookings).
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _ in intervals]
+        self.max_ends = []
+        running_max = None
+        for _, end in intervals:
+            running_max = end if running_max is None or end > running_max else running_max
+            self.max_ends.append(running_max)
+
+    def is_free(self, check_in, check_out):
+        """True if no interval overlaps [check_in, check_out)"""
+        # Intervals starting before check_out are the only overlap candidates
+        candidates = bisect_left(self.starts, check_out)
+        if candidates == 0:
+            return True
+        return self.max_ends[candidates - 1] <= check_in
+
+
+class AvailabilityIndex:
+    """
+    In-memory availability index for active rooms over a date window.
+
+    Usage:
+        index = AvailabilityIndex(check_in, check_out)
+        index.available_count(room_type_id, check_in, check_out)
+        index.free_room_ids(check_in, check_out)
+
+    Queries made: one for rooms, one for reservations overlapping the window
+    (skipped when no window is given, in which case only status counts apply).
+    """
+
+    def __init__(self, window_start=None, window_end=None):
+        self.window_start = window_start
+        self.window_end = window_end
+
+        self.rooms_by_type = defaultdict(list)
+        self.room_status = {}
+        for room_id, room_type_id, room_status in Room.objects.filter(is_active=True).values_list(
+            'id', 'room_type_id', 'status'
+        ).order_by('number'):
+            self.rooms_by_type[room_type_id].append(room_id)
+            self.room_status[room_id] = room_status
+
+        booked = defaultdict(list)
+        if window_start and window_end:
+            reservations = Reservation.objects.filter(
+                room__isnull=False,
+                check_in_date__lt=window_end,
+                check_out_date__gt=window_start
+            ).exclude(status__in=NON_BLOCKING_STATUSES).values_list('room_id', 'check_in_date', 'check_out_date')
+            for room_id, check_in_date, check_out_date in reservations:
+                booked[room_id].append((check_in_date, check_out_date))
+
+        self.intervals = {room_id: RoomIntervals(intervals) for room_id, intervals in booked.items()}
+
+    def _covers(self, check_in, check_out):
+        return (
+            self.window_start is not None
+            and self.window_end is not None
+            and self.window_start <= check_in
+            and check_out <= self.window_end
+        )
+
+    def is_room_free(self, room_id, check_in, check_out):
+        """Check if a room has no blocking reservation in [check_in, check_out)"""
+        if not self._covers(check_in, check_out):
+            raise ValueError('Requested dates fall outside the loaded availability window')
+        intervals = self.intervals.get(room_id)
+        return intervals is None or intervals.is_free(check_in, check_out)
+
+    def free_room_ids(self, check_in, check_out, room_type_id=None):
+        """IDs of active rooms that are free for the whole stay"""
+        if room_type_id is not None:
+            room_ids = self.rooms_by_type.get(room_type_id, [])
+        else:
+            room_ids = self.room_status.keys()
+        return [room_id for room_id in room_ids if self.is_room_free(room_id, check_in, check_out)]
+
+    def available_count(self, room_type_id, check_in, check_out):
+        """Number of active rooms of a type free for the whole stay"""
+        return len(self.free_room_ids(check_in, check_out, room_type_id))
+
+    def status_counts(self, room_type_id):
+        """Current total/available/occupied counts for a room type based on room status"""
+        room_ids = self.rooms_by_type.get(room_type_id, [])
+        statuses = [self.room_status[room_id] for room_id in room_ids]
+        return {
+            'total': len(room_ids),
+            'available': statuses.count('AVAILABLE'),
+            'occupied': statuses.count('OCCUPIED'),
+        }
+
+    def summary(self, check_in, check_out):
+        """Per room type free room IDs for a stay, keyed by room type ID"""
+        return {
+            room_type_id: self.free_room_ids(check_in, check_out, room_type_id)
+            for room_type_id in self.rooms_by_type
+        }
@@ -0,0 +1,61 @@
+"""
+Guest Statistics Service
+Annotates guest querysets with stay statistics and prefetches reservation history,
+so guest serializers read precomputed attributes instead of querying per guest
+"""
+from django.db.models import (
+    Count, DateField, DecimalField, DurationField, F, IntegerField, Max, OuterRef, Prefetch, Subquery, Sum
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Payment, Reservation
+
+
+def _guest_subquery(queryset, aggregate, output_field):
+    """Single-value correlated subquery aggregating rows per guest"""
+    return Subquery(
+        queryset.order_by().values('guest').annotate(value=aggregate).values('value'),
+        output_field=output_field
+    )
+
+
+def with_guest_stats(queryset, reservations=True):
+    """
+    Annotate guests with:
+        stat_total_stays, stat_total_nights, stat_total_spent,
+        stat_last_stay_date, stat_upcoming_stays
+    and, when reservations=True, prefetch the reservation history into
+    prefetched_reservations (newest check-in first)
+    """
+    completed = Reservation.objects.filter(guest=OuterRef('pk'), status='CHECKED_OUT')
+    upcoming = Reservation.objects.filter(
+        guest=OuterRef('pk'),
+        status__in=['CONFIRMED', 'CHECKED_IN'],
+        check_in_date__gte=timezone.now().date()
+    )
+    spent = Payment.objects.filter(
+        reservation__guest=OuterRef('pk'),
+        reservation__status='CHECKED_OUT'
+    ).order_by().values('reservation__guest').annotate(value=Sum('amount')).values('value')
+
+    queryset = queryset.annotate(
+        stat_total_stays=Coalesce(_guest_subquery(completed, Count('id'), IntegerField()), 0),
+        stat_total_nights=_guest_subquery(
+            completed, Sum(F('check_out_date') - F('check_in_date')), DurationField()
+        ),
+        stat_total_spent=Coalesce(
+            Subquery(spent, output_field=DecimalField(max_digits=14, decimal_places=2)), 0,
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        ),
+        stat_last_stay_date=_guest_subquery(completed, Max('check_out_date'), DateField()),
+        stat_upcoming_stays=Coalesce(_guest_subquery(upcoming, Count('id'), IntegerField()), 0),
+    )
+
+    if reservations:
+        queryset = queryset.prefetch_related(Prefetch(
+            'reservation_set',
+            queryset=Reservation.objects.select_related('room', 'room_type').order_by('-check_in_date'),
+            to_attr='prefetched_reservations'
+        ))
+    return queryset
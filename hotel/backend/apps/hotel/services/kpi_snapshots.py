@@ -0,0 +1,138 @@
+"""
+KPI Snapshot Service
+Builds DailyKPISnapshot rows and answers date-range KPI questions from them;
+only today (and any day not yet snapshotted) is computed from raw rows
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from ..models import DailyKPISnapshot, Expense, Payment, Reservation, Room, RoomNight
+from ..utils.daily_series import daily_series, date_spine
+
+
+CENT = Decimal('0.01')
+
+# Fields summed when a date range is aggregated
+SUMMED_FIELDS = [
+    'total_rooms', 'occupied_rooms', 'room_revenue', 'revenue',
+    'payment_count', 'expenses', 'check_ins', 'check_outs',
+]
+
+
+def _ratio(numerator, denominator, scale=1):
+    if not denominator:
+        return Decimal('0.00')
+    return (Decimal(numerator) * scale / Decimal(denominator)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _with_rates(values):
+    """Add occupancy rate, ADR and RevPAR to a dict of summed fields"""
+    values['occupancy_rate'] = _ratio(values['occupied_rooms'], values['total_rooms'], 100)
+    values['adr'] = _ratio(values['room_revenue'], values['occupied_rooms'])
+    values['revpar'] = _ratio(values['room_revenue'], values['total_rooms'])
+    return values
+
+
+def compute_daily_kpis(start_date, end_date):
+    """
+    Compute KPI values from raw rows for every day in [start_date, end_date]
+    Returns: {date: {field: value}} with one grouped query per source table
+    """
+    total_rooms = Room.objects.filter(is_active=True).count()
+
+    payments = daily_series(
+        Payment.objects.filter(status='COMPLETED'), 'payment_date', start_date, end_date,
+        revenue=Sum('amount'), payment_count=Count('id')
+    )
+    expenses = daily_series(
+        Expense.objects.filter(status='PAID'), 'expense_date', start_date, end_date,
+        expenses=Sum('amount')
+    )
+    check_ins = daily_series(Reservation.objects.all(), 'check_in_date', start_date, end_date, count=Count('id'))
+    check_outs = daily_series(Reservation.objects.all(), 'check_out_date', start_date, end_date, count=Count('id'))
+
+    # Occupied rooms and nightly room revenue from the occupancy ledger
+    occupied = defaultdict(set)
+    room_revenue = defaultdict(Decimal)
+    nights = RoomNight.objects.filter(date__range=[start_date, end_date]).values_list(
+        'date', 'room_id', 'reservation__total_amount',
+        'reservation__check_in_date', 'reservation__check_out_date'
+    )
+    for night, room_id, total_amount, check_in_date, check_out_date in nights:
+        occupied[night].add(room_id)
+        stay_nights = (check_out_date - check_in_date).days
+        if total_amount and stay_nights > 0:
+            room_revenue[night] += Decimal(total_amount) / stay_nights
+
+    kpis = {}
+    for day in date_spine(start_date, end_date):
+        kpis[day] = _with_rates({
+            'total_rooms': total_rooms,
+            'occupied_rooms': len(occupied[day]),
+            'room_revenue': room_revenue[day].quantize(CENT, rounding=ROUND_HALF_UP),
+            'revenue': Decimal(payments[day]['revenue']),
+            'payment_count': payments[day]['payment_count'],
+            'expenses': Decimal(expenses[day]['expenses']),
+            'check_ins': check_ins[day]['count'],
+            'check_outs': check_outs[day]['count'],
+        })
+    return kpis
+
+
+def rebuild_snapshots(start_date, end_date):
+    """
+    Replace snapshots for [start_date, end_date], never past yesterday
+    Returns: number of snapshot rows written
+    """
+    end_date = min(end_date, timezone.localdate() - timedelta(days=1))
+    if end_date < start_date:
+        return 0
+
+    kpis = compute_daily_kpis(start_date, end_date)
+    with transaction.atomic():
+        DailyKPISnapshot.objects.filter(date__range=[start_date, end_date]).delete()
+        DailyKPISnapshot.objects.bulk_create(
+            DailyKPISnapshot(date=day, **values) for day, values in kpis.items()
+        )
+    return len(kpis)
+
+
+def get_daily_kpis(start_date, end_date):
+    """
+    KPI values per day for a date range
+    Past days come from snapshots; today and days without a snapshot are computed live
+    Returns: {date: {field: value}} ordered by date
+    """
+    snapshots = {
+        snapshot['date']: snapshot
+        for snapshot in DailyKPISnapshot.objects.filter(
+            date__range=[start_date, end_date],
+            date__lt=timezone.localdate()
+        ).values('date', *SUMMED_FIELDS, 'occupancy_rate', 'adr', 'revpar')
+    }
+
+    missing = [day for day in date_spine(start_date, end_date) if day not in snapshots]
+    live = compute_daily_kpis(min(missing), max(missing)) if missing else {}
+
+    daily = {}
+    for day in date_spine(start_date, end_date):
+        daily[day] = snapshots[day] if day in snapshots else live[day]
+        daily[day].pop('date', None)
+    return daily
+
+
+def get_kpi_totals(start_date, end_date):
+    """
+    KPI totals for a date range: summed fields plus occupancy rate, ADR and RevPAR
+    over the whole range (total_rooms becomes available room nights)
+    """
+    totals = dict.fromkeys(SUMMED_FIELDS, 0)
+    for values in get_daily_kpis(start_date, end_date).values():
+        for field in SUMMED_FIELDS:
+            totals[field] += values[field]
+    return _with_rates(totals)
@@ -0,0 +1,184 @@
+"""
+Occupancy Forecast Service
+Projects occupied rooms per room type and day from the booking pipeline:
+
+    forecast = on-the-books nights x (1 - cancellation/no-show rate of their source)
+             + expected pickup for the remaining lead time
+    capped at the room type's capacity
+
+Pickup is the additive pickup curve of the lookback window: the average number of
+room nights per stay date that were booked less than L days before arrival.
+All arithmetic runs on NumPy room-type x day matrices; data loading is five queries.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Reservation, Room, RoomType, RoomNight
+
+
+MAX_HORIZON_DAYS = 365
+
+# Reservations still expected to (or currently) occupy a room
+ON_THE_BOOKS_STATUSES = ['PENDING', 'CONFIRMED', 'CHECKED_IN']
+
+# Reservations that were booked but never stayed
+LOST_STATUSES = ['CANCELLED', 'NO_SHOW']
+
+
+def _cancellation_rates(since, until):
+    """Share of reservations arriving in [since, until) that were cancelled or no-shows, per booking source"""
+    rows = Reservation.objects.filter(
+        check_in_date__gte=since,
+        check_in_date__lt=until
+    ).values('booking_source').annotate(
+        total=Count('id'),
+        lost=Count('id', filter=Q(status__in=LOST_STATUSES))
+    ).order_by()
+    return {row['booking_source']: row['lost'] / row['total'] for row in rows if row['total']}
+
+
+def _pickup_curve(type_index, today, lookback_days, horizon):
+    """
+    Additive pickup matrix A[type, lead]: average room nights per stay date in the
+    lookback window that were booked less than `lead` days before the stay date
+    """
+    curve = np.zeros((len(type_index), horizon + 1))
+    if lookback_days <= 0:
+        return curve
+
+    nights = list(RoomNight.objects.filter(
+        date__gte=today - timedelta(days=lookback_days),
+        date__lt=today
+    ).values_list('room__room_type_id', 'date', 'reservation__created_at'))
+    nights = [
+        (type_index[type_id], (night - timezone.localtime(created_at).date()).days)
+        for type_id, night, created_at in nights
+        if type_id in type_index and created_at
+    ]
+    if not nights:
+        return curve
+
+    types, leads = np.array(nights, dtype=np.int64).T
+    # Nights booked with lead >= horizon never count as pickup inside the horizon
+    inside = leads < horizon
+    histogram = np.zeros((len(type_index), horizon + 1))
+    np.add.at(histogram, (types[inside], np.clip(leads[inside], 0, None) + 1), 1)
+
+    # curve[t, L] = nights booked with lead in [0, L) per stay date
+    curve = np.cumsum(histogram, axis=1) / lookback_days
+    return curve
+
+
+def forecast_occupancy(days=30, room_type_id=None, lookback_days=90, start_date=None):
+    """
+    Forecast occupied rooms for `days` days starting at start_date (default today)
+
+    Returns: dict with per-day totals and per room type rows
+    """
+    days = max(1, min(int(days), MAX_HORIZON_DAYS))
+    today = timezone.localdate()
+    start_date = start_date or today
+    end_date = start_date + timedelta(days=days)
+    day_offsets = np.arange(days)
+
+    room_types = RoomType.objects.order_by('name')
+    if room_type_id is not None:
+        room_types = room_types.filter(id=room_type_id)
+    room_types = list(room_types.values('id', 'name'))
+    type_index = {room_type['id']: index for index, room_type in enumerate(room_types)}
+
+    # Capacity per room type
+    capacity = np.zeros(len(room_types))
+    for type_id, count in Room.objects.filter(is_active=True, room_type_id__in=type_index).values_list(
+        'room_type_id'
+    ).annotate(count=Count('id')).order_by():
+        capacity[type_index[type_id]] = count
+
+    # Cancellation / no-show probability per booking source over the lookback year
+    cancellation_rates = _cancellation_rates(today - timedelta(days=365), today)
+
+    # On-the-books nights, each weighted by its chance of actually staying
+    booked = Reservation.objects.filter(
+        status__in=ON_THE_BOOKS_STATUSES,
+        check_in_date__lt=end_date,
+        check_out_date__gt=start_date
+    ).annotate(
+        stay_type_id=Coalesce('room__room_type', 'room_type')
+    ).values_list('stay_type_id', 'check_in_date', 'check_out_date', 'status', 'booking_source')
+
+    otb_changes = np.zeros((len(room_types), days + 1))
+    expected_changes = np.zeros((len(room_types), days + 1))
+    rows = [row for row in booked if row[0] in type_index]
+    if rows:
+        types = np.array([type_index[row[0]] for row in rows])
+        starts = np.clip([(row[1] - start_date).days for row in rows], 0, days)
+        ends = np.clip([(row[2] - start_date).days for row in rows], 0, days)
+        weights = np.array([
+            1.0 if row[3] == 'CHECKED_IN' else 1.0 - cancellation_rates.get(row[4], 0.0)
+            for row in rows
+        ])
+        np.add.at(otb_changes, (types, starts), 1)
+        np.add.at(otb_changes, (types, ends), -1)
+        np.add.at(expected_changes, (types, starts), weights)
+        np.add.at(expected_changes, (types, ends), -weights)
+
+    on_the_books = np.cumsum(otb_changes, axis=1)[:, :days]
+    expected_stays = np.cumsum(expected_changes, axis=1)[:, :days]
+
+    # Remaining pickup for each stay date given its lead time from today
+    lead_times = np.clip((start_date - today).days + day_offsets, 0, None)
+    curve = _pickup_curve(type_index, today, lookback_days, int(lead_times.max()) + 1)
+    pickup = curve[:, lead_times]
+
+    forecast = np.minimum(expected_stays + pickup, capacity[:, None])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        type_rates = np.where(capacity[:, None] > 0, forecast / capacity[:, None] * 100, 0.0)
+
+    total_capacity = capacity.sum()
+    daily_forecast = forecast.sum(axis=0)
+    daily_rates = daily_forecast / total_capacity * 100 if total_capacity else np.zeros(days)
+
+    daily = []
+    for offset in range(days):
+        daily.append({
+            'date': (start_date + timedelta(days=offset)).isoformat(),
+            'on_the_books': int(on_the_books[:, offset].sum()),
+            'expected_pickup': round(float(pickup[:, offset].sum()), 2),
+            'forecast_occupied': round(float(daily_forecast[offset]), 2),
+            'occupancy_rate': round(float(daily_rates[offset]), 1),
+            'room_types': {
+                room_type['name']: {
+                    'on_the_books': int(on_the_books[index, offset]),
+                    'forecast_occupied': round(float(forecast[index, offset]), 2),
+                    'occupancy_rate': round(float(type_rates[index, offset]), 1),
+                }
+                for index, room_type in enumerate(room_types)
+            }
+        })
+
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': (end_date - timedelta(days=1)).isoformat(),
+        'days': days,
+        'total_rooms': int(total_capacity),
+        'average_occupancy': round(float(daily_rates.mean()), 1),
+        'assumptions': {
+            'lookback_days': lookback_days,
+            'cancellation_rates': {source: round(rate, 4) for source, rate in cancellation_rates.items()},
+        },
+        'room_type_summary': [
+            {
+                'room_type_id': room_type['id'],
+                'room_type': room_type['name'],
+                'capacity': int(capacity[index]),
+                'average_occupancy': round(float(type_rates[index].mean()), 1),
+                'peak_forecast_occupied': round(float(forecast[index].max()), 2),
+            }
+            for index, room_type in enumerate(room_types)
+        ],
+        'daily_data': daily,
+    }
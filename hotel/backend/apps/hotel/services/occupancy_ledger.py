@@ -0,0 +1,60 @@
+"""
+Occupancy Ledger Service
+Keeps the RoomNight ledger in sync with reservations
+"""
+from datetime import timedelta
+from django.db import transaction
+
+from ..models.occupancy import RoomNight
+from ..models.reservations import Reservation
+
+
+def build_room_nights(reservation, room_night_model=RoomNight):
+    """
+    Return unsaved RoomNight rows for a reservation (empty if it does not occupy a room)
+    Migrations pass their historical RoomNight model as room_night_model
+    """
+    if not reservation.room_id or reservation.status not in RoomNight.OCCUPYING_STATUSES:
+        return []
+
+    nights = []
+    current = reservation.check_in_date
+    while current < reservation.check_out_date:
+        nights.append(room_night_model(reservation_id=reservation.id, room_id=reservation.room_id, date=current))
+        current += timedelta(days=1)
+    return nights
+
+
+def sync_reservation_nights(reservation):
+    """Replace the ledger rows of a single reservation"""
+    with transaction.atomic():
+        RoomNight.objects.filter(reservation=reservation).delete()
+        RoomNight.objects.bulk_create(build_room_nights(reservation))
+
+
+def rebuild_ledger(batch_size=500, reservation_model=Reservation, room_night_model=RoomNight):
+    """
+    Rebuild the whole ledger from reservations
+    Migration 0042 runs it with historical models to backfill existing reservations
+    Returns: number of room-night rows written
+    """
+    written = 0
+    reservations = reservation_model.objects.filter(
+        room__isnull=False,
+        status__in=RoomNight.OCCUPYING_STATUSES
+    ).only('id', 'room_id', 'status', 'check_in_date', 'check_out_date')
+
+    with transaction.atomic():
+        room_night_model.objects.all().delete()
+        nights = []
+        for reservation in reservations.iterator(chunk_size=batch_size):
+            nights.extend(build_room_nights(reservation, room_night_model))
+            if len(nights) >= batch_size:
+                room_night_model.objects.bulk_create(nights)
+                written += len(nights)
+                nights = []
+        if nights:
+            room_night_model.objects.bulk_create(nights)
+            written += len(nights)
+
+    return written
@@ -0,0 +1,86 @@
+"""
+Sidebar Counter Service
+Caches sidebar badge counts; signals drop a counter when its source model changes,
+so each count is only recomputed on a cache miss
+"""
+from datetime import date
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, F
+
+from ..models import Reservation, Complaint, HousekeepingTask, AmenityRequest, InventoryItem
+
+
+CACHE_KEY_PREFIX = 'hotel:sidebar'
+
+
+def count_pending_bookings():
+    """Reservations with check_in_date = today and status = PENDING (not checked in yet)"""
+    return Reservation.objects.filter(status='PENDING', check_in_date=date.today()).count()
+
+
+def count_uncompleted_complaints():
+    """Complaints that are OPEN or IN_PROGRESS"""
+    return Complaint.objects.filter(Q(status='OPEN') | Q(status='IN_PROGRESS')).count()
+
+
+def count_unfinished_housekeeping():
+    """Housekeeping tasks that are not CLEAN"""
+    return HousekeepingTask.objects.exclude(status='CLEAN').count()
+
+
+def count_low_stock_items():
+    """Items with current_stock <= minimum_stock (or <= 10 if minimum_stock not set)"""
+    return InventoryItem.objects.filter(
+        Q(current_stock__lte=F('minimum_stock')) |
+        Q(minimum_stock__isnull=True, current_stock__lte=10)
+    ).count()
+
+
+def count_unfinished_amenities():
+    """Amenity requests that are PENDING or IN_PROGRESS"""
+    return AmenityRequest.objects.filter(Q(status='PENDING') | Q(status='IN_PROGRESS')).count()
+
+
+# counter name -> (source model, count function)
+COUNTERS = {
+    'pending_bookings': (Reservation, count_pending_bookings),
+    'uncompleted_complaints': (Complaint, count_uncompleted_complaints),
+    'unfinished_housekeeping': (HousekeepingTask, count_unfinished_housekeeping),
+    'low_stock_items': (InventoryItem, count_low_stock_items),
+    'unfinished_amenities': (AmenityRequest, count_unfinished_amenities),
+}
+
+
+def _cache_key(name):
+    # Pending bookings depend on today's date, so the key rolls over at midnight
+    if name == 'pending_bookings':
+        return f'{CACHE_KEY_PREFIX}:{name}:{date.today().isoformat()}'
+    return f'{CACHE_KEY_PREFIX}:{name}'
+
+
+def get_counts():
+    """Return every sidebar counter, recounting only the ones missing from the cache"""
+    keys = {name: _cache_key(name) for name in COUNTERS}
+    cached = cache.get_many(keys.values())
+
+    counts = {}
+    missing = {}
+    for name, key in keys.items():
+        if key in cached:
+            counts[name] = cached[key]
+        else:
+            counts[name] = COUNTERS[name][1]()
+            missing[key] = counts[name]
+
+    if missing:
+        # Signals normally invalidate first; the TTL only bounds staleness for
+        # writes that bypass signals (queryset.update) or other worker processes
+        cache.set_many(missing, getattr(settings, 'HOTEL_SIDEBAR_COUNTS_CACHE_TTL', 300))
+    return counts
+
+
+def invalidate_for_model(model):
+    """Drop every counter whose source is the given model"""
+    cache.delete_many([_cache_key(name) for name, (source, _) in COUNTERS.items() if source is model])
+
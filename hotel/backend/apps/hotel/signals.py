@@ -0,0 +1,79 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.db import transaction
+from core.caching import invalidate
+from core.events import broker
+from .models import (
+    Reservation, CheckIn, Complaint, HousekeepingTask, AmenityRequest, InventoryItem, RoomType, Room, Holiday
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Reservation)
+def sync_occupancy_ledger(sender, instance, created, **kwargs):
+    """
+    Keep the RoomNight occupancy ledger in sync whenever a reservation is
+    created, re-dated, re-assigned, cancelled or checked out.
+    Deleted reservations drop their ledger rows via cascade.
+    """
+    from .services.occupancy_ledger import sync_reservation_nights
+
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not {'status', 'room', 'check_in_date', 'check_out_date'} & set(update_fields):
+        return
+
+    sync_reservation_nights(instance)
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+@receiver(post_save, sender=CheckIn)
+@receiver(post_delete, sender=CheckIn)
+def invalidate_dashboard(sender, instance, **kwargs):
+    """Drop the cached hotel dashboard and notify live streams when reservations or check-ins change"""
+    from .views.dashboard import invalidate_dashboard_cache
+
+    invalidate_dashboard_cache()
+    transaction.on_commit(lambda: broker.publish('dashboard', {'model': sender.__name__}))
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+@receiver(post_save, sender=Complaint)
+@receiver(post_delete, sender=Complaint)
+@receiver(post_save, sender=HousekeepingTask)
+@receiver(post_delete, sender=HousekeepingTask)
+@receiver(post_save, sender=AmenityRequest)
+@receiver(post_delete, sender=AmenityRequest)
+@receiver(post_save, sender=InventoryItem)
+@receiver(post_delete, sender=InventoryItem)
+def invalidate_sidebar_counters(sender, instance, **kwargs):
+    """Drop the sidebar badge counters fed by the changed model and notify live streams"""
+    from .services.sidebar_counters import invalidate_for_model
+
+    invalidate_for_model(sender)
+    transaction.on_commit(lambda: broker.publish('sidebar', {'model': sender.__name__}))
+
+
+@receiver(post_save, sender=RoomType)
+@receiver(post_delete, sender=RoomType)
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_room_types(sender, instance, **kwargs):
+    """Drop cached room type listings; their availability counts depend on rooms and reservations"""
+    from .views.bookings_api import ROOM_TYPES_CACHE_NAMESPACE
+
+    invalidate(ROOM_TYPES_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_holidays(sender, instance, **kwargs):
+    """Drop cached holiday listings"""
+    from .views.calendars import HOLIDAYS_CACHE_NAMESPACE
+
+    invalidate(HOLIDAYS_CACHE_NAMESPACE)
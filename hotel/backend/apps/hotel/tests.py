@@ -1,12 +1,13 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, datetime, timedelta
 
 from .models import (
-    Complaint, HousekeepingTask, Room, RoomType, Guest, Reservation, Payment, Voucher
+    Complaint, HousekeepingTask, Room, RoomType, Guest, Reservation, Payment, Voucher, RoomNight,
+    DailyKPISnapshot
 )
 from unittest.mock import patch, MagicMock
 import base64
@@ -971,3 +972,1021 @@ class ResendInvoiceTests(APITestCase):
         # The endpoint may allow unauthenticated access or require auth - both are valid depending on business logic
         # If it allows access, it should work (200) or if it requires auth, return 401/403
         self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+class OccupancyLedgerTests(APITestCase):
+    """Test suite for the room-night occupancy ledger and occupancy analytics"""
+
+    def setUp(self):
+        """Set up rooms and a confirmed reservation"""
+        self.room_type = RoomType.objects.create(
+            name='Standard Room',
+            base_price=500000,
+            max_occupancy=2
+        )
+        self.room = Room.objects.create(number='201', floor=2, room_type=self.room_type)
+        Room.objects.create(number='202', floor=2, room_type=self.room_type)
+
+        self.guest = Guest.objects.create(
+            first_name='Ledger',
+            last_name='Guest',
+            email='ledger.guest@example.com',
+            phone='+6281234567891'
+        )
+
+        self.today = timezone.now().date()
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=3),
+            status='CONFIRMED'
+        )
+        self.client = APIClient()
+
+    def test_confirmed_reservation_writes_room_nights(self):
+        """Test a confirmed reservation creates one row per night"""
+        nights = list(RoomNight.objects.filter(reservation=self.reservation).values_list('date', flat=True))
+        self.assertEqual(nights, [self.today + timedelta(days=i) for i in range(3)])
+
+    def test_date_change_rewrites_room_nights(self):
+        """Test changing the stay dates rewrites the ledger"""
+        self.reservation.check_out_date = self.today + timedelta(days=1)
+        self.reservation.save()
+        self.assertEqual(RoomNight.objects.filter(reservation=self.reservation).count(), 1)
+
+    def test_cancel_removes_room_nights(self):
+        """Test cancelling a reservation removes its ledger rows"""
+        self.reservation.status = 'CANCELLED'
+        self.reservation.save(update_fields=['status', 'updated_at'])
+        self.assertFalse(RoomNight.objects.filter(reservation=self.reservation).exists())
+
+    def test_reservation_without_room_has_no_room_nights(self):
+        """Test unassigned reservations stay out of the ledger until a room is assigned"""
+        reservation = Reservation.objects.create(
+            guest=self.guest,
+            room_type=self.room_type,
+            check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=2),
+            status='CONFIRMED'
+        )
+        self.assertFalse(RoomNight.objects.filter(reservation=reservation).exists())
+
+        reservation.room = Room.objects.get(number='202')
+        reservation.save()
+        self.assertEqual(RoomNight.objects.filter(reservation=reservation).count(), 2)
+
+    def test_rebuild_command_backfills_ledger(self):
+        """Test the backfill command rebuilds missing ledger rows"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        RoomNight.objects.all().delete()
+        call_command('rebuild_occupancy_ledger', stdout=StringIO())
+        self.assertEqual(RoomNight.objects.filter(reservation=self.reservation).count(), 3)
+
+    def test_occupancy_analytics_reads_ledger(self):
+        """Test occupancy analytics reports ledger occupancy per day and room type"""
+        start = self.today.isoformat()
+        end = (self.today + timedelta(days=3)).isoformat()
+        response = self.client.get(
+            f'/api/hotel/analytics/occupancy/?period=custom&start_date={start}&end_date={end}'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        daily = response.data['daily_data']
+        self.assertEqual([day['occupied_rooms'] for day in daily], [1, 1, 1, 0])
+        self.assertEqual(daily[0]['occupancy_rate'], 50.0)
+        self.assertEqual(daily[0]['checkins'], 1)
+        self.assertEqual(daily[3]['checkouts'], 1)
+        self.assertEqual(daily[0]['room_type_occupancy']['Standard Room']['occupied'], 1)
+        self.assertEqual(response.data['summary']['total_room_nights_sold'], 3)
+        self.assertEqual(response.data['room_type_summary'][0]['average_occupancy'], 37.5)
+
+
+class RoomAvailabilityTests(APITestCase):
+    """Test suite for the date-range availability index and search endpoint"""
+
+    def setUp(self):
+        """Set up two room types with one booked room"""
+        self.standard = RoomType.objects.create(name='Standard', base_price=500000, max_occupancy=2)
+        self.suite = RoomType.objects.create(name='Suite', base_price=1500000, max_occupancy=4)
+        self.room_a = Room.objects.create(number='101', floor=1, room_type=self.standard)
+        self.room_b = Room.objects.create(number='102', floor=1, room_type=self.standard)
+        self.room_c = Room.objects.create(number='301', floor=3, room_type=self.suite)
+
+        self.guest = Guest.objects.create(
+            first_name='Avail',
+            last_name='Guest',
+            email='avail.guest@example.com',
+            phone='+6281234567892'
+        )
+        self.today = timezone.now().date()
+        Reservation.objects.create(
+            guest=self.guest,
+            room=self.room_a,
+            check_in_date=self.today + timedelta(days=2),
+            check_out_date=self.today + timedelta(days=5),
+            status='CONFIRMED'
+        )
+        Reservation.objects.create(
+            guest=self.guest,
+            room=self.room_c,
+            check_in_date=self.today + timedelta(days=2),
+            check_out_date=self.today + timedelta(days=5),
+            status='CANCELLED'
+        )
+        self.client = APIClient()
+
+    def _dates(self, start, end):
+        return (
+            (self.today + timedelta(days=start)).isoformat(),
+            (self.today + timedelta(days=end)).isoformat()
+        )
+
+    def test_index_detects_overlap_and_adjacent_stays(self):
+        """Test overlapping stays are blocked while back-to-back stays are free"""
+        from .services.availability import AvailabilityIndex
+
+        start = self.today
+        index = AvailabilityIndex(start, start + timedelta(days=10))
+        self.assertFalse(index.is_room_free(self.room_a.id, start + timedelta(days=4), start + timedelta(days=6)))
+        self.assertTrue(index.is_room_free(self.room_a.id, start, start + timedelta(days=2)))
+        self.assertTrue(index.is_room_free(self.room_a.id, start + timedelta(days=5), start + timedelta(days=7)))
+        self.assertTrue(index.is_room_free(self.room_c.id, start + timedelta(days=3), start + timedelta(days=4)))
+
+    def test_availability_endpoint_returns_counts_and_room_ids(self):
+        """Test the bulk availability endpoint returns per-type counts and free room IDs"""
+        check_in, check_out = self._dates(1, 3)
+        response = self.client.get(f'/api/public/availability/?check_in={check_in}&check_out={check_out}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_name = {row['name']: row for row in response.data['room_types']}
+        self.assertEqual(by_name['Standard']['available_rooms_count'], 1)
+        self.assertEqual(by_name['Standard']['available_room_ids'], [self.room_b.id])
+        self.assertEqual(by_name['Suite']['available_rooms_count'], 1)
+        self.assertEqual(response.data['total_available'], 2)
+        self.assertEqual(response.data['nights'], 2)
+
+    def test_availability_endpoint_validates_dates(self):
+        """Test missing or inverted stay dates are rejected"""
+        response = self.client.get('/api/public/availability/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        check_in, check_out = self._dates(3, 1)
+        response = self.client.get(f'/api/public/availability/?check_in={check_in}&check_out={check_out}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_room_type_list_uses_date_range(self):
+        """Test room type availability counts honour the requested stay"""
+        check_in, check_out = self._dates(1, 3)
+        response = self.client.get(f'/api/hotel/room-types/?check_in={check_in}&check_out={check_out}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results'] if 'results' in response.data else response.data
+        by_name = {row['name']: row for row in results}
+        self.assertEqual(by_name['Standard']['available_rooms_count'], 1)
+
+    def test_available_rooms_for_stay(self):
+        """Test the rooms available action filters by stay dates"""
+        check_in, check_out = self._dates(1, 3)
+        response = self.client.get(f'/api/hotel/rooms/available/?check_in={check_in}&check_out={check_out}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(room['number'] for room in response.data), ['102', '301'])
+
+
+class HotelDashboardTests(APITestCase):
+    """Test suite for the aggregated and cached hotel dashboard"""
+
+    def setUp(self):
+        """Set up one checked-in reservation"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.room_type = RoomType.objects.create(name='Dashboard Room', base_price=400000, max_occupancy=2)
+        self.room = Room.objects.create(number='401', floor=4, room_type=self.room_type)
+        Room.objects.create(number='402', floor=4, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Dash',
+            last_name='Board',
+            email='dash.board@example.com',
+            phone='+6281234567893'
+        )
+        self.today = date.today()
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=2),
+            status='CHECKED_IN',
+            total_amount=Decimal('800000.00')
+        )
+        self.client = APIClient()
+
+    def test_dashboard_metrics(self):
+        """Test weekly occupancy and ADR/RevPAR computed in the database"""
+        response = self.client.get('/api/hotel/main/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.data['basic_metrics']
+        self.assertEqual(metrics['occupancy_rate'], 50.0)
+        self.assertEqual(metrics['adr'], 400000)
+        self.assertEqual(metrics['revpar'], round(800000 / 60))
+
+        week = response.data['weekly_comparison']['current_week']['data']
+        today_row = next(row for row in week if row['date'] == self.today.isoformat())
+        self.assertEqual(today_row['occupied_rooms'], 1)
+        self.assertEqual(today_row['occupancy'], 50.0)
+
+    def test_dashboard_is_cached_and_invalidated(self):
+        """Test the payload is served from cache until a reservation changes"""
+        self.client.get('/api/hotel/main/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/hotel/main/')
+
+        self.reservation.status = 'CHECKED_OUT'
+        self.reservation.save(update_fields=['status', 'updated_at'])
+
+        response = self.client.get('/api/hotel/main/')
+        self.assertEqual(response.data['basic_metrics']['occupancy_rate'], 0)
+
+
+class SidebarCountsTests(APITestCase):
+    """Test suite for the cached sidebar badge counters"""
+
+    def setUp(self):
+        """Set up an authenticated client and one pending arrival"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            email='sidebar@hotel.com',
+            password='testpass123',
+            first_name='Side',
+            last_name='Bar'
+        )
+        self.room_type = RoomType.objects.create(name='Sidebar Room', base_price=300000, max_occupancy=2)
+        self.room = Room.objects.create(number='501', floor=5, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Side',
+            last_name='Guest',
+            email='side.guest@example.com',
+            phone='+6281234567894'
+        )
+        Reservation.objects.create(
+            guest=self.guest,
+            room_type=self.room_type,
+            check_in_date=date.today(),
+            check_out_date=date.today() + timedelta(days=1),
+            status='PENDING'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_counts_are_cached_between_polls(self):
+        """Test a second poll performs no counting queries"""
+        response = self.client.get('/api/hotel/sidebar-counts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['main_sidebar']['pending_bookings'], 1)
+        self.assertEqual(response.data['office_sidebar']['unfinished_housekeeping'], 0)
+
+        from .services.sidebar_counters import get_counts
+        with self.assertNumQueries(0):
+            get_counts()
+
+    def test_model_change_refreshes_only_its_counter(self):
+        """Test saving a housekeeping task recounts the housekeeping badge"""
+        from .services.sidebar_counters import get_counts
+
+        get_counts()
+        HousekeepingTask.objects.create(room=self.room, status='DIRTY')
+
+        with self.assertNumQueries(1):
+            counts = get_counts()
+        self.assertEqual(counts['unfinished_housekeeping'], 1)
+        self.assertEqual(counts['pending_bookings'], 1)
+
+        response = self.client.get('/api/hotel/sidebar-counts/')
+        self.assertEqual(response.data['support_sidebar']['unfinished_housekeeping'], 1)
+
+
+class LiveUpdatesStreamTests(TestCase):
+    """Test suite for the Server-Sent Events live update stream"""
+
+    def setUp(self):
+        """Set up a staff user and an empty counter cache"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            email='stream@hotel.com',
+            password='testpass123',
+            first_name='Live',
+            last_name='Stream'
+        )
+        self.room_type = RoomType.objects.create(name='Stream Room', base_price=300000, max_occupancy=2)
+        self.room = Room.objects.create(number='601', floor=6, room_type=self.room_type)
+
+    def test_broker_delivers_to_channel_subscribers(self):
+        """Test published events reach subscribers of that channel only"""
+        import asyncio
+        from core.events import EventBroker
+
+        async def scenario():
+            broker = EventBroker()
+            sidebar = broker.subscribe(['sidebar'])
+            dashboard = broker.subscribe(['dashboard'])
+            broker.publish('sidebar', {'model': 'Complaint'})
+
+            event = await sidebar.get(timeout=1)
+            missing = await dashboard.get(timeout=0.05)
+            sidebar.close()
+            dashboard.close()
+            return event, missing, broker.subscriber_count
+
+        event, missing, remaining = asyncio.run(scenario())
+        self.assertEqual(event[1:], ('sidebar', {'model': 'Complaint'}))
+        self.assertIsNone(missing)
+        self.assertEqual(remaining, 0)
+
+    async def test_stream_requires_authentication(self):
+        """Test anonymous clients are rejected"""
+        response = await self.async_client.get('/api/hotel/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_sends_snapshot_then_changed_counters(self):
+        """Test the stream opens with full counts and then pushes only changed counters"""
+        from asgiref.sync import sync_to_async
+        from core.events import broker
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/hotel/stream/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = aiter(response.streaming_content)
+        snapshot = (await anext(events)).decode()
+        self.assertIn('event: sidebar_counts', snapshot)
+        self.assertIn('"uncompleted_complaints": 0', snapshot)
+        self.assertIn('event: dashboard', (await anext(events)).decode())
+
+        await sync_to_async(Complaint.objects.create)(
+            category='CLEANLINESS',
+            priority='HIGH',
+            status='OPEN',
+            title='Noisy air conditioner',
+            description='Rattling all night',
+            room=self.room
+        )
+        # on_commit never fires inside a test transaction, so publish directly
+        broker.publish('sidebar', {'model': 'Complaint'})
+
+        update = (await anext(events)).decode()
+        self.assertIn('event: sidebar_counts', update)
+        self.assertIn('data: {"uncompleted_complaints": 1}', update)
+        await events.aclose()
+
+    def test_stream_under_wsgi_sends_snapshot_and_closes(self):
+        """Test a WSGI-served stream returns the snapshot with a retry hint instead of hanging"""
+        self.client.force_login(self.user)
+        response = self.client.get('/api/hotel/stream/')
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('retry: 15000'))
+        self.assertIn('event: sidebar_counts', body)
+        self.assertIn('event: dashboard', body)
+
+
+class DailySeriesReportTests(APITestCase):
+    """Test suite for the grouped per-day series behind the period reports"""
+
+    def setUp(self):
+        """Set up an in-house reservation and complaints created today"""
+        self.room_type = RoomType.objects.create(name='Report Room', base_price=300000, max_occupancy=2)
+        self.room = Room.objects.create(number='601', floor=6, room_type=self.room_type)
+        Room.objects.create(number='602', floor=6, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Daily',
+            last_name='Series',
+            email='daily.series@example.com',
+            phone='+6281234567895'
+        )
+        self.today = timezone.localdate()
+        self.period = self.today.strftime('%Y-%m')
+        Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=2),
+            status='CHECKED_IN'
+        )
+        Complaint.objects.create(guest=self.guest, category='ROOM', title='Noise', description='Loud', status='OPEN')
+        Complaint.objects.create(guest=self.guest, category='ROOM', title='Light', description='Dim', status='RESOLVED')
+        self.client = APIClient()
+
+    def _day(self, rows, key='date'):
+        return next(row for row in rows if row[key] == self.today.isoformat())
+
+    def test_occupancy_report_counts_in_house_reservations(self):
+        """Test the occupancy series counts the stay on its first night and zero-fills other days"""
+        response = self.client.get(f'/api/hotel/reports/occupancy/?period={self.period}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        daily = response.data['daily_data']
+        self.assertEqual(daily[-1]['date'], self.today.isoformat())
+        self.assertEqual(self._day(daily)['occupied_rooms'], 1)
+        self.assertEqual(self._day(daily)['occupancy_rate'], 50.0)
+        self.assertEqual(sum(day['occupied_rooms'] for day in daily), 1)
+
+    def test_satisfaction_and_guest_series(self):
+        """Test complaint and guest daily rows come from the grouped queries"""
+        satisfaction = self.client.get(f'/api/hotel/reports/satisfaction/?period={self.period}')
+        today_row = self._day(satisfaction.data['daily_data'])
+        self.assertEqual(today_row['total_complaints'], 2)
+        self.assertEqual(today_row['resolved'], 1)
+        self.assertEqual(today_row['pending'], 1)
+
+        guests = self.client.get(f'/api/hotel/reports/guest-analytics/?period={self.period}')
+        today_row = self._day(guests.data['daily_data'])
+        self.assertEqual(today_row['new_guests'], 1)
+        self.assertEqual(today_row['new_reservations'], 1)
+        self.assertEqual(today_row['check_ins'], 1)
+
+    def test_query_count_does_not_grow_with_days(self):
+        """Test a full past month costs the same number of queries as the current partial month"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        last_month = self.today.replace(day=1) - timedelta(days=1)
+        for url in ('occupancy', 'satisfaction', 'maintenance', 'guest-analytics', 'tax'):
+            query_counts = []
+            for period in (last_month.strftime('%Y-%m'), self.period):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(f'/api/hotel/reports/{url}/?period={period}')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                query_counts.append(len(context.captured_queries))
+            self.assertEqual(query_counts[0], query_counts[1], url)
+
+
+class DailyKPISnapshotTests(APITestCase):
+    """Test suite for nightly KPI snapshots and the views reading them"""
+
+    def setUp(self):
+        """Set up a past two-night stay paid in full"""
+        self.room_type = RoomType.objects.create(name='KPI Room', base_price=500000, max_occupancy=2)
+        self.room = Room.objects.create(number='701', floor=7, room_type=self.room_type)
+        Room.objects.create(number='702', floor=7, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Kpi',
+            last_name='Snapshot',
+            email='kpi.snapshot@example.com',
+            phone='+6281234567896'
+        )
+        self.today = timezone.localdate()
+        self.check_in = self.today - timedelta(days=4)
+        self.reservation = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.check_in,
+            check_out_date=self.check_in + timedelta(days=2),
+            status='CHECKED_OUT',
+            total_amount=Decimal('1000000.00')
+        )
+        self.payment_day = self.check_in + timedelta(days=1)
+        self._pay(self.payment_day, Decimal('1000000.00'))
+
+        self.user = User.objects.create_user(email='kpi.manager@hotel.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _pay(self, day, amount):
+        return Payment.objects.create(
+            reservation=self.reservation,
+            amount=amount,
+            payment_method='CASH',
+            status='COMPLETED',
+            payment_date=timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=12))
+        )
+
+    def test_command_builds_snapshots_up_to_yesterday(self):
+        """Test the nightly command snapshots past days with occupancy, ADR and RevPAR"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command('build_kpi_snapshots', days=7, stdout=StringIO())
+
+        self.assertEqual(DailyKPISnapshot.objects.count(), 7)
+        self.assertFalse(DailyKPISnapshot.objects.filter(date=self.today).exists())
+
+        first_night = DailyKPISnapshot.objects.get(date=self.check_in)
+        self.assertEqual(first_night.occupied_rooms, 1)
+        self.assertEqual(first_night.total_rooms, 2)
+        self.assertEqual(first_night.occupancy_rate, Decimal('50.00'))
+        self.assertEqual(first_night.adr, Decimal('500000.00'))
+        self.assertEqual(first_night.revpar, Decimal('250000.00'))
+        self.assertEqual(first_night.check_ins, 1)
+        self.assertEqual(DailyKPISnapshot.objects.get(date=self.payment_day).revenue, Decimal('1000000.00'))
+
+    def test_past_days_read_snapshots_and_today_is_live(self):
+        """Test historical totals come from snapshots while today is computed from payments"""
+        from apps.hotel.services.kpi_snapshots import rebuild_snapshots, get_kpi_totals
+
+        rebuild_snapshots(self.check_in, self.today)
+
+        # Late edits to past days are not seen until the snapshot is rebuilt
+        self._pay(self.payment_day, Decimal('200000.00'))
+        self._pay(self.today, Decimal('300000.00'))
+
+        totals = get_kpi_totals(self.check_in, self.today)
+        self.assertEqual(totals['revenue'], Decimal('1300000.00'))
+        self.assertEqual(totals['occupied_rooms'], 2)
+        self.assertEqual(totals['adr'], Decimal('500000.00'))
+
+        rebuild_snapshots(self.payment_day, self.payment_day)
+        self.assertEqual(get_kpi_totals(self.check_in, self.today)['revenue'], Decimal('1500000.00'))
+
+    def test_dashboard_analytics_charts_from_snapshots(self):
+        """Test dashboard analytics revenue and occupancy charts use the KPI series"""
+        from apps.hotel.services.kpi_snapshots import rebuild_snapshots
+
+        rebuild_snapshots(self.today - timedelta(days=30), self.today)
+        response = self.client.get('/api/hotel/analytics/dashboard/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        charts = response.data['charts']
+        revenue_day = next(row for row in charts['daily_revenue'] if row['date'] == self.payment_day.isoformat())
+        self.assertEqual(revenue_day['revenue'], 1000000.0)
+        self.assertEqual(revenue_day['transactions'], 1)
+        occupancy_day = next(row for row in charts['occupancy'] if row['date'] == self.check_in.isoformat())
+        self.assertEqual(occupancy_day['occupied'], 1)
+        self.assertEqual(occupancy_day['occupancy_rate'], 50.0)
+        self.assertEqual(response.data['revenue']['last_30_days'], 1000000.0)
+
+
+class GuestStatsTests(APITestCase):
+    """Test suite for the annotated guest statistics"""
+
+    def setUp(self):
+        """Set up a guest with one completed and one upcoming stay"""
+        self.room_type = RoomType.objects.create(name='Guest Stats Room', base_price=400000, max_occupancy=2)
+        self.room = Room.objects.create(number='801', floor=8, room_type=self.room_type)
+        self.guest = self._create_guest(0)
+        self.today = timezone.localdate()
+
+        stay = Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today - timedelta(days=10),
+            check_out_date=self.today - timedelta(days=7),
+            status='CHECKED_OUT'
+        )
+        Payment.objects.create(
+            reservation=stay,
+            amount=Decimal('1200000.00'),
+            payment_method='CASH',
+            status='COMPLETED',
+            payment_date=timezone.now()
+        )
+        Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today + timedelta(days=5),
+            check_out_date=self.today + timedelta(days=6),
+            status='CONFIRMED'
+        )
+
+        self.user = User.objects.create_user(email='guest.stats@hotel.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_guest(self, index):
+        return Guest.objects.create(
+            first_name=f'Stats{index}',
+            last_name='Guest',
+            email=f'stats{index}@example.com',
+            phone=f'+62812000{index:04d}'
+        )
+
+    def test_detail_reads_annotated_statistics(self):
+        """Test the detail serializer values match the guest's reservation history"""
+        response = self.client.get(f'/api/hotel/guests/{self.guest.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_stays'], 1)
+        self.assertEqual(response.data['total_nights'], 3)
+        self.assertEqual(response.data['total_spent'], 1200000.0)
+        self.assertEqual(response.data['last_stay_date'], self.today - timedelta(days=7))
+        self.assertEqual(response.data['upcoming_stays'], 1)
+        self.assertEqual(len(response.data['reservations']), 2)
+        self.assertEqual(response.data['reservations'][0]['check_in_date'], self.today + timedelta(days=5))
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        """Test the guest list runs the same number of queries for 1 or 20 guests"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.get('/api/hotel/guests/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for index in range(1, 20):
+            self._create_guest(index)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/hotel/guests/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(many.captured_queries), len(single.captured_queries))
+
+
+class ReservationFolioTotalsTests(APITestCase):
+    """Test suite for folio totals computed from prefetched payments and charges"""
+
+    def setUp(self):
+        """Set up a two-night reservation with a charge and a partial payment"""
+        from .models import AdditionalCharge
+
+        self.room_type = RoomType.objects.create(name='Folio Room', base_price=Decimal('500000.00'), max_occupancy=2)
+        self.room = Room.objects.create(number='901', floor=9, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Folio',
+            last_name='Guest',
+            email='folio.guest@example.com',
+            phone='+6281234567897'
+        )
+        self.today = timezone.localdate()
+        self.reservation = self._create_reservation()
+        AdditionalCharge.objects.create(
+            reservation=self.reservation,
+            charge_type='MINIBAR',
+            description='Minibar',
+            amount=Decimal('50000.00'),
+            quantity=2
+        )
+        Payment.objects.create(
+            reservation=self.reservation,
+            amount=Decimal('600000.00'),
+            payment_method='CASH',
+            status='COMPLETED',
+            payment_date=timezone.now()
+        )
+
+        self.user = User.objects.create_user(email='folio@hotel.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_reservation(self):
+        return Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=self.today + timedelta(days=1),
+            check_out_date=self.today + timedelta(days=3),
+            status='CONFIRMED'
+        )
+
+    def test_folio_totals_match_model_methods(self):
+        """Test prefetched folio totals equal the single-object aggregate methods"""
+        prefetched = Reservation.objects.select_related('room__room_type').prefetch_related(
+            'payments', 'additional_charges'
+        ).get(pk=self.reservation.pk)
+
+        with self.assertNumQueries(0):
+            folio = prefetched.get_folio_totals()
+            self.assertEqual(prefetched.get_total_paid(), Decimal('600000.00'))
+
+        self.assertEqual(folio['additional_charges_total'], self.reservation.get_additional_charges_total())
+        self.assertEqual(folio['total_paid'], self.reservation.get_total_paid())
+        self.assertEqual(folio['grand_total'], self.reservation.get_grand_total())
+        self.assertEqual(folio['expected_payment'], self.reservation.get_expected_payment_amount())
+        self.assertEqual(folio['is_fully_paid'], self.reservation.is_fully_paid())
+        self.assertFalse(folio['is_fully_paid'])
+
+    def test_charges_prefetch_alone_needs_no_payment_query(self):
+        """Test the additional charges total reads only the prefetched charges"""
+        prefetched = Reservation.objects.prefetch_related('additional_charges').get(pk=self.reservation.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetched.get_additional_charges_total(), Decimal('100000.00'))
+
+    def test_detail_money_fields(self):
+        """Test the reservation detail money fields"""
+        response = self.client.get(f'/api/hotel/reservations/{self.reservation.reservation_number}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['subtotal'], 1000000.0)
+        self.assertEqual(response.data['additional_charges_total'], 100000.0)
+        self.assertEqual(response.data['grand_total'], 1210000.0)
+        self.assertEqual(response.data['total_paid'], 600000.0)
+        self.assertEqual(response.data['balance_due'], 610000.0)
+        self.assertFalse(response.data['is_fully_paid'])
+
+    def test_list_query_count_is_independent_of_reservations(self):
+        """Test listing reservations does not add folio queries per reservation"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as single:
+            self.client.get('/api/hotel/reservations/')
+
+        for _ in range(5):
+            self._create_reservation()
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/hotel/reservations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(many.captured_queries), len(single.captured_queries))
+
+
+class OccupancyForecastTests(APITestCase):
+    """Test suite for the occupancy forecast over the booking pipeline"""
+
+    def setUp(self):
+        """Set up one room type with history: three stays and one cancellation"""
+        self.room_type = RoomType.objects.create(name='Forecast Room', base_price=400000, max_occupancy=2)
+        self.room = Room.objects.create(number='1001', floor=10, room_type=self.room_type)
+        Room.objects.create(number='1002', floor=10, room_type=self.room_type)
+        self.guest = Guest.objects.create(
+            first_name='Fore',
+            last_name='Cast',
+            email='fore.cast@example.com',
+            phone='+6281234567898'
+        )
+        self.today = timezone.localdate()
+
+        for offset, reservation_status in [(60, 'CHECKED_OUT'), (50, 'CHECKED_OUT'), (40, 'CHECKED_OUT'), (30, 'CANCELLED')]:
+            self._book(self.today - timedelta(days=offset), 1, reservation_status)
+
+        # On the books: two nights starting tomorrow
+        self._book(self.today + timedelta(days=1), 2, 'CONFIRMED')
+        self.client = APIClient()
+
+    def _book(self, check_in, nights, reservation_status):
+        return Reservation.objects.create(
+            guest=self.guest,
+            room=self.room,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=nights),
+            status=reservation_status,
+            booking_source='DIRECT'
+        )
+
+    def test_on_the_books_weighted_by_cancellation_rate(self):
+        """Test confirmed nights are discounted by the source's cancellation rate"""
+        response = self.client.get('/api/hotel/occupancy/forecast/?days=5&lookback=7')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assumptions']['cancellation_rates'], {'DIRECT': 0.25})
+        daily = response.data['daily_data']
+        self.assertEqual(len(daily), 5)
+        self.assertEqual([day['on_the_books'] for day in daily], [0, 1, 1, 0, 0])
+        self.assertEqual([day['forecast_occupied'] for day in daily], [0, 0.75, 0.75, 0, 0])
+        self.assertEqual(daily[1]['occupancy_rate'], 37.5)
+        self.assertEqual(daily[1]['room_types']['Forecast Room']['forecast_occupied'], 0.75)
+
+    def test_pickup_curve_adds_expected_bookings(self):
+        """Test room nights booked at short lead in the lookback window add pickup to future days"""
+        from apps.hotel.services.occupancy_forecast import forecast_occupancy
+
+        # Stayed yesterday, booked (created) today: a lead-0 room night in the window
+        self._book(self.today - timedelta(days=1), 1, 'CHECKED_OUT')
+
+        forecast = forecast_occupancy(days=3, lookback_days=1)
+        daily = forecast['daily_data']
+        self.assertEqual(daily[0]['expected_pickup'], 0)
+        self.assertEqual(daily[2]['expected_pickup'], 1.0)
+        # The extra stay also lowers the DIRECT cancellation rate to 1/5
+        self.assertEqual(daily[2]['forecast_occupied'], 1.8)
+
+    def test_full_year_horizon_and_validation(self):
+        """Test a 365-day forecast is served and out-of-range horizons are rejected"""
+        response = self.client.get('/api/hotel/occupancy/forecast/?days=365')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['daily_data']), 365)
+
+        response = self.client.get('/api/hotel/occupancy/forecast/?days=400')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SQLiteTuningTests(TestCase):
+    """Test SQLite connections are tuned from settings.SQLITE_PRAGMAS"""
+
+    def test_pragmas_applied_to_connection(self):
+        """Test busy timeout, synchronous, cache and temp store PRAGMAs are set"""
+        from django.conf import settings
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['cache_size'])
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+    def test_benchmark_reports_throughput(self):
+        """Test the benchmark's tuned run writes without lock errors"""
+        from core.sqlite import DEFAULT_PRAGMAS, benchmark
+
+        result = benchmark(DEFAULT_PRAGMAS, writers=2, transactions=10, rows_per_transaction=2)
+        self.assertEqual(result['lock_errors'], 0)
+        self.assertGreater(result['rows_per_second'], 0)
+
+
+class ReportIndexQueryPlanTests(TestCase):
+    """Test report filters on Reservation and Payment are answered from their composite indexes"""
+
+    def assertUsesIndex(self, queryset, model, fields):
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN is SQLite syntax')
+        name = next(index.name for index in model._meta.indexes if index.fields == fields)
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {name}', plan)
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.start = timezone.now() - timedelta(days=30)
+        self.end = timezone.now()
+
+    def test_check_ins_and_check_outs_by_date(self):
+        """Test arrival/departure filters (occupancy snapshot, period reports) use the date indexes"""
+        self.assertUsesIndex(
+            Reservation.objects.filter(check_in_date__range=[self.start, self.end], status__in=['CHECKED_IN', 'CHECKED_OUT']),
+            Reservation, ['check_in_date', 'status']
+        )
+        self.assertUsesIndex(Reservation.objects.filter(check_in_date=self.today), Reservation, ['check_in_date', 'status'])
+        self.assertUsesIndex(
+            Reservation.objects.filter(check_out_date__range=[self.start, self.end], status='CHECKED_OUT'),
+            Reservation, ['check_out_date', 'status']
+        )
+        self.assertUsesIndex(Reservation.objects.filter(check_out_date=self.today), Reservation, ['check_out_date', 'status'])
+
+    def test_bookings_by_created_date(self):
+        """Test booking counts over a period use the created_at index"""
+        self.assertUsesIndex(
+            Reservation.objects.filter(created_at__range=[self.start, self.end]),
+            Reservation, ['created_at']
+        )
+
+    def test_completed_payments_by_date(self):
+        """Test revenue filters use the (status, payment_date) index"""
+        self.assertUsesIndex(
+            Payment.objects.filter(payment_date__range=[self.start, self.end], status='COMPLETED'),
+            Payment, ['status', 'payment_date']
+        )
+        self.assertUsesIndex(
+            Payment.objects.filter(payment_date__range=[self.start, self.end], status='COMPLETED', reservation__isnull=False),
+            Payment, ['status', 'payment_date']
+        )
+
+
+class QueryBudgetTests(APITestCase):
+    """Test the per-request query budget middleware and assert_max_queries"""
+
+    # The room list repeats per-room lookups; keep those out of the header/budget tests
+    ENABLED = {'ENABLED': True, 'MAX_QUERIES': 1000, 'MAX_DB_MS': 10000, 'REPEAT_THRESHOLD': 1000}
+
+    def setUp(self):
+        """Set up a dozen rooms"""
+        self.room_type = RoomType.objects.create(name='Budget Room', base_price=300000, max_occupancy=2)
+        self.rooms = [
+            Room.objects.create(number=f'9{number:02d}', floor=9, room_type=self.room_type)
+            for number in range(12)
+        ]
+        self.client = APIClient()
+
+    def test_disabled_middleware_is_skipped(self):
+        """Test the middleware is dropped from the chain when not enabled"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET={**self.ENABLED, 'ENABLED': False}):
+            response = self.client.get('/api/hotel/rooms/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_server_timing_header(self):
+        """Test the query count and database time are reported in Server-Timing"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET=self.ENABLED):
+            response = self.client.get('/api/hotel/rooms/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    def test_over_budget_request_is_logged(self):
+        """Test a request over MAX_QUERIES logs a warning naming the endpoint"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET={**self.ENABLED, 'MAX_QUERIES': 0}):
+            with self.assertLogs('core.querybudget', level='WARNING') as logs:
+                self.client.get('/api/hotel/rooms/')
+
+        self.assertIn('GET /api/hotel/rooms/', logs.output[0])
+
+    def test_repeated_queries_are_grouped_with_stack_sample(self):
+        """Test an N+1 loop is reported as one shape with the calling code"""
+        from core.querybudget import QueryRecorder
+
+        recorder = QueryRecorder(repeat_threshold=10)
+        with recorder.record():
+            for room in self.rooms:
+                Room.objects.get(id=room.id)
+
+        (shape, count), = recorder.repeated()
+        self.assertEqual(count, 12)
+        self.assertIn('FROM "hotel_room"', shape)
+        self.assertIn('tests.py', recorder.samples[shape])
+
+    def test_sql_shape_collapses_literals_and_in_lists(self):
+        """Test statements differing only in literals or IN-list length share a shape"""
+        from core.querybudget import sql_shape
+
+        self.assertEqual(
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s) AND name = \'a\''),
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s, %s)  AND name = \'bb\'')
+        )
+        self.assertNotEqual(sql_shape('SELECT * FROM t WHERE id = %s'), sql_shape('SELECT * FROM u WHERE id = %s'))
+
+    def test_assert_max_queries(self):
+        """Test assert_max_queries passes within the limit and fails above it"""
+        from core.querybudget import assert_max_queries
+
+        with assert_max_queries(1):
+            list(Room.objects.all())
+        with self.assertRaises(AssertionError):
+            with assert_max_queries(1):
+                list(Room.objects.all())
+                list(RoomType.objects.all())
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'caching-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedEndpointTests(APITestCase):
+    """Test namespaced cache versions and the @cached_endpoint decorator"""
+
+    def setUp(self):
+        """Set up a room type with one room, on a private in-memory cache"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.room_type = RoomType.objects.create(name='Cached Room', base_price=350000, max_occupancy=2)
+        Room.objects.create(number='701', floor=7, room_type=self.room_type)
+        self.client = APIClient()
+
+    def test_invalidate_bumps_namespace_and_scope_versions(self):
+        """Test a scope can be dropped alone, and the namespace drops every scope"""
+        from core.caching import namespaced_key, invalidate
+
+        branch_1 = namespaced_key('test:menu', 'list', scope=1)
+        branch_2 = namespaced_key('test:menu', 'list', scope=2)
+        self.assertEqual(namespaced_key('test:menu', 'list', scope=1), branch_1)
+
+        invalidate('test:menu', scope=1)
+        self.assertNotEqual(namespaced_key('test:menu', 'list', scope=1), branch_1)
+        self.assertEqual(namespaced_key('test:menu', 'list', scope=2), branch_2)
+
+        invalidate('test:menu')
+        self.assertNotEqual(namespaced_key('test:menu', 'list', scope=2), branch_2)
+
+    def test_room_types_cached_until_rooms_change(self):
+        """Test room types are served without queries until a room is added"""
+        response = self.client.get('/api/room-types/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/room-types/')
+        self.assertEqual(cached.data, response.data)
+
+        Room.objects.create(number='702', floor=7, room_type=self.room_type)
+        response = self.client.get('/api/room-types/')
+        row = next(row for row in response.data['results'] if row['id'] == self.room_type.id)
+        self.assertEqual(row['total_rooms'], 2)
+
+    def test_room_types_vary_on_query_parameters(self):
+        """Test listed query parameters get their own cache entries"""
+        self.client.get('/api/room-types/')
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/room-types/?unrelated=1')
+        response = self.client.get('/api/room-types/?page_size=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_holidays_this_month_invalidated_by_holiday_changes(self):
+        """Test this_month is cached and a new holiday shows up immediately"""
+        from .models import Holiday
+
+        response = self.client.get('/api/hotel/holidays/this_month/')
+        self.assertEqual(response.data['holidays'], [])
+        with self.assertNumQueries(0):
+            self.client.get('/api/hotel/holidays/this_month/')
+
+        Holiday.objects.create(name='Test Day', name_id='Hari Uji', date=timezone.now().date())
+        response = self.client.get('/api/hotel/holidays/this_month/')
+        self.assertEqual(len(response.data['holidays']), 1)
@@ -22,6 +22,7 @@ try:
     from .views.maintenance import MaintenanceRequestViewSet, MaintenanceTechnicianViewSet, WarehouseItemViewSet, MaintenancePartUsedViewSet
     from .views.settings import HotelSettingsViewSet
     from .views.sidebar_counts import sidebar_counts
+    from .views.stream import live_updates
     from .views.support_reports import support_analytics
     from .views.promotions import (
         VoucherViewSet, DiscountViewSet, LoyaltyProgramViewSet,
@@ -35,7 +36,7 @@ try:
     )
     from .views.analytics import dashboard_analytics, monthly_comparison
     from .views.financial import financial_overview, financial_transactions, financial_invoices
-    from .views.occupancy import occupancy_analytics
+    from .views.occupancy import occupancy_analytics, occupancy_forecast
     from .views.lost_found import LostAndFoundViewSet
     from .views.wake_up_call import WakeUpCallViewSet
     from .views.department_inventory import DepartmentInventoryViewSet
@@ -119,6 +120,7 @@ if LEGACY_VIEWS:
     urlpatterns += [
         path('main/', hotel_dashboard, name='hotel-dashboard'),
         path('sidebar-counts/', sidebar_counts, name='sidebar-counts'),
+        path('stream/', live_updates, name='live-updates'),
         path('support/analytics/', support_analytics, name='support-analytics'),
         path('reports/daily/', daily_reports, name='daily-reports'),
         path('reports/daily-range/', daily_reports_range, name='daily-reports-range'),
@@ -136,6 +138,7 @@ if LEGACY_VIEWS:
         path('analytics/dashboard/', dashboard_analytics, name='dashboard-analytics'),
         path('analytics/monthly-comparison/', monthly_comparison, name='monthly-comparison'),
         path('analytics/occupancy/', occupancy_analytics, name='occupancy-analytics'),
+        path('occupancy/forecast/', occupancy_forecast, name='occupancy-forecast'),
         path('financial/overview/', financial_overview, name='financial-overview'),
         path('financial/transactions/', financial_transactions, name='financial-transactions'),
         path('financial/invoices/', financial_invoices, name='financial-invoices'),
@@ -15,7 +15,8 @@ from .views.bookings_api import (
     guest_detail_api,
     room_types_api,
     room_type_detail_api,
-    complaints_api
+    complaints_api,
+    availability_api
 )
 
 urlpatterns = [
@@ -24,6 +25,7 @@ urlpatterns = [
     path('rooms/', rooms_api, name='public-rooms-list'),
     path('room-types/', room_types_api, name='public-room-types-list'),
     path('guests/', guests_api, name='public-guests-list'),
+    path('public/availability/', availability_api, name='public-availability'),
     
     # Detail endpoints for individual records
     path('reservations/<int:reservation_id>/', reservation_detail_api, name='public-reservation-detail'),
@@ -0,0 +1,81 @@
+"""
+Daily Series Helpers
+Build per-day report metrics for a whole date range with one grouped query per table,
+zero-filling days that have no rows
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db.models import DateTimeField, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def date_spine(start_date, end_date):
+    """Every date from start_date to end_date inclusive"""
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+
+def daily_series(queryset, date_field, start_date, end_date, **aggregates):
+    """
+    Aggregate a queryset per day in a single grouped query
+
+    date_field may be a DateField or a DateTimeField; datetimes are bucketed
+    by their date in the current timezone.
+
+    Usage:
+        series = daily_series(Complaint.objects.all(), 'created_at', start, end,
+                              total=Count('id'), resolved=Count('id', filter=Q(status='RESOLVED')))
+        series[some_date]['total']
+
+    Returns: {date: {metric: value}} for every day in the range, 0 for days without rows
+    """
+    field = queryset.model._meta.get_field(date_field)
+    if isinstance(field, DateTimeField):
+        # Range filter on the raw column so an index on it can still be used
+        range_start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+        queryset = queryset.filter(**{
+            f'{date_field}__gte': range_start,
+            f'{date_field}__lt': range_end,
+        }).annotate(series_day=TruncDate(date_field))
+    else:
+        queryset = queryset.filter(**{
+            f'{date_field}__range': [start_date, end_date],
+        }).annotate(series_day=F(date_field))
+
+    series = {day: dict.fromkeys(aggregates, 0) for day in date_spine(start_date, end_date)}
+    rows = queryset.values('series_day').annotate(**aggregates).order_by('series_day')
+    for row in rows:
+        day = row.pop('series_day')
+        if day in series:
+            series[day].update({name: value if value is not None else 0 for name, value in row.items()})
+    return series
+
+
+def daily_overlap_counts(queryset, start_field, end_field, start_date, end_date):
+    """
+    Count rows whose [start, end) date interval covers each day of the range,
+    e.g. reservations in house per night
+
+    Loads the overlapping intervals in one query and sweeps them once.
+    Returns: {date: count} for every day in the range
+    """
+    intervals = queryset.filter(**{
+        f'{start_field}__lte': end_date,
+        f'{end_field}__gt': start_date,
+    }).values_list(start_field, end_field)
+
+    changes = defaultdict(int)
+    for interval_start, interval_end in intervals:
+        if interval_end <= interval_start:
+            continue
+        changes[max(interval_start, start_date)] += 1
+        changes[interval_end] -= 1
+
+    counts = {}
+    running = 0
+    for day in date_spine(start_date, end_date):
+        running += changes.get(day, 0)
+        counts[day] = running
+    return counts
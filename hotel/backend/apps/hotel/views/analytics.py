@@ -2,13 +2,13 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db.models import Sum, Count, Avg, Q, F
-from django.db.models.functions import TruncDate
 from datetime import timedelta, datetime
 from decimal import Decimal
 
 from ..models import (
     Reservation, Payment, Room, Guest, Complaint, CheckIn
 )
+from ..services.kpi_snapshots import get_daily_kpis, get_kpi_totals
 
 
 @api_view(['GET'])
@@ -42,67 +42,40 @@ def dashboard_analytics(request):
     occupancy_rate = (occupied_today / total_rooms * 100) if total_rooms > 0 else 0
 
     # === REVENUE METRICS ===
+    # Past days come from the nightly KPI snapshots, only today is computed live
+    daily_kpis = get_daily_kpis(min(start_of_month, last_30_days), today)
+
     # This month revenue
-    month_revenue = Payment.objects.filter(
-        payment_date__date__gte=start_of_month,
-        payment_date__date__lte=today,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    month_revenue = sum(kpi['revenue'] for day, kpi in daily_kpis.items() if day >= start_of_month)
 
     # Last 30 days revenue
-    revenue_30_days = Payment.objects.filter(
-        payment_date__date__gte=last_30_days,
-        payment_date__date__lte=today,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    revenue_30_days = sum(kpi['revenue'] for day, kpi in daily_kpis.items() if day >= last_30_days)
 
     # Average daily revenue (last 30 days)
     avg_daily_revenue = float(revenue_30_days) / 30 if revenue_30_days else 0
 
     # === DAILY REVENUE CHART (Last 7 days) ===
-    daily_revenue = Payment.objects.filter(
-        payment_date__date__gte=last_7_days,
-        payment_date__date__lte=today,
-        status='COMPLETED'
-    ).annotate(
-        date=TruncDate('payment_date')
-    ).values('date').annotate(
-        revenue=Sum('amount'),
-        transactions=Count('id')
-    ).order_by('date')
-
-    # Fill missing dates with zero
-    revenue_chart = []
-    current_date = last_7_days
-    daily_revenue_dict = {item['date']: item for item in daily_revenue}
-
-    while current_date <= today:
-        data = daily_revenue_dict.get(current_date, {'revenue': 0, 'transactions': 0})
-        revenue_chart.append({
-            'date': current_date.isoformat(),
-            'revenue': float(data['revenue']) if data['revenue'] else 0,
-            'transactions': data['transactions']
-        })
-        current_date += timedelta(days=1)
+    last_7_kpis = [(day, kpi) for day, kpi in daily_kpis.items() if day >= last_7_days]
+
+    revenue_chart = [
+        {
+            'date': day.isoformat(),
+            'revenue': float(kpi['revenue']),
+            'transactions': kpi['payment_count']
+        }
+        for day, kpi in last_7_kpis
+    ]
 
     # === OCCUPANCY CHART (Last 7 days) ===
-    occupancy_chart = []
-    current_date = last_7_days
-
-    while current_date <= today:
-        occupied = Reservation.objects.filter(
-            check_in_date__lte=current_date,
-            check_out_date__gt=current_date,
-            status__in=['CHECKED_IN', 'CHECKED_OUT', 'CONFIRMED']
-        ).count()
-
-        occupancy_chart.append({
-            'date': current_date.isoformat(),
-            'occupied': occupied,
-            'available': total_rooms - occupied,
-            'occupancy_rate': round((occupied / total_rooms * 100) if total_rooms > 0 else 0, 2)
-        })
-        current_date += timedelta(days=1)
+    occupancy_chart = [
+        {
+            'date': day.isoformat(),
+            'occupied': kpi['occupied_rooms'],
+            'available': kpi['total_rooms'] - kpi['occupied_rooms'],
+            'occupancy_rate': float(kpi['occupancy_rate'])
+        }
+        for day, kpi in last_7_kpis
+    ]
 
     # === PAYMENT METHOD BREAKDOWN (Last 30 days) ===
     payment_methods = Payment.objects.filter(
@@ -290,28 +263,14 @@ def monthly_comparison(request):
         prev_month_end = current_month_start - timedelta(days=1)
 
     # Current month metrics
-    current_revenue = Payment.objects.filter(
-        payment_date__date__gte=current_month_start,
-        payment_date__date__lte=today,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    current_bookings = Reservation.objects.filter(
-        check_in_date__gte=current_month_start,
-        check_in_date__lte=today
-    ).count()
-
-    # Previous month metrics (full month)
-    prev_revenue = Payment.objects.filter(
-        payment_date__date__gte=prev_month_start,
-        payment_date__date__lte=prev_month_end,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    prev_bookings = Reservation.objects.filter(
-        check_in_date__gte=prev_month_start,
-        check_in_date__lte=prev_month_end
-    ).count()
+    current_kpis = get_kpi_totals(current_month_start, today)
+    current_revenue = current_kpis['revenue']
+    current_bookings = current_kpis['check_ins']
+
+    # Previous month metrics (full month, served from KPI snapshots)
+    prev_kpis = get_kpi_totals(prev_month_start, prev_month_end)
+    prev_revenue = prev_kpis['revenue']
+    prev_bookings = prev_kpis['check_ins']
 
     # Calculate percentage changes
     revenue_change = ((float(current_revenue) - float(prev_revenue)) / float(prev_revenue) * 100) if prev_revenue else 0
@@ -15,6 +15,23 @@ import json
 from ..models import (
     Reservation, Room, Guest, RoomType, CheckIn, Complaint
 )
+from ..services.availability import AvailabilityIndex, parse_stay_dates
+from core.caching import cached_endpoint
+
+
+ROOM_TYPES_CACHE_NAMESPACE = 'hotel:room-types'
+
+
+def _get_stay_dates(request):
+    """Return (check_in, check_out) dates from the query string, or None if absent/invalid"""
+    check_in = request.GET.get('check_in')
+    check_out = request.GET.get('check_out')
+    if not (check_in and check_out):
+        return None
+    try:
+        return parse_stay_dates(check_in, check_out)
+    except ValueError:
+        return None
 
 
 @api_view(['GET', 'POST'])
@@ -741,34 +758,38 @@ def guest_detail_api(request, guest_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_endpoint(60, ROOM_TYPES_CACHE_NAMESPACE, vary_on=['page', 'page_size', 'check_in', 'check_out'])
 def room_types_api(request):
     """
     Get room types list with availability information
     Frontend endpoint: /api/room-types/
+    Cached for 60 seconds; room type, room and reservation changes invalidate it
     """
     try:
         # Get query parameters
         page = int(request.GET.get('page', 1))
         page_size = int(request.GET.get('page_size', 50))
         
+        # Optional stay dates switch availability from current room status to the date range
+        stay_dates = _get_stay_dates(request)
+
         # Get all active room types
         room_types = RoomType.objects.filter(is_active=True).order_by('name')
-        
+
+        # Load rooms (and booked intervals for the stay) once for every room type
+        availability = AvailabilityIndex(*stay_dates) if stay_dates else AvailabilityIndex()
+
         # Add room count and availability for each room type
         room_types_data = []
         for room_type in room_types:
             # Count total rooms, available rooms, and occupied rooms for this type
-            total_rooms = Room.objects.filter(room_type=room_type, is_active=True).count()
-            available_rooms = Room.objects.filter(
-                room_type=room_type,
-                is_active=True,
-                status='AVAILABLE'
-            ).count()
-            occupied_rooms = Room.objects.filter(
-                room_type=room_type,
-                is_active=True,
-                status='OCCUPIED'
-            ).count()
+            counts = availability.status_counts(room_type.id)
+            total_rooms = counts['total']
+            occupied_rooms = counts['occupied']
+            if stay_dates:
+                available_rooms = availability.available_count(room_type.id, *stay_dates)
+            else:
+                available_rooms = counts['available']
 
             # Calculate occupancy percentage
             occupancy_percentage = 0
@@ -844,19 +865,17 @@ def room_type_detail_api(request, room_type_id):
     """
     try:
         room_type = RoomType.objects.get(id=room_type_id, is_active=True)
-        
+        stay_dates = _get_stay_dates(request)
+        availability = AvailabilityIndex(*stay_dates) if stay_dates else AvailabilityIndex()
+
         # Count total rooms, available rooms, and occupied rooms for this type
-        total_rooms = Room.objects.filter(room_type=room_type, is_active=True).count()
-        available_rooms = Room.objects.filter(
-            room_type=room_type,
-            is_active=True,
-            status='AVAILABLE'
-        ).count()
-        occupied_rooms = Room.objects.filter(
-            room_type=room_type,
-            is_active=True,
-            status='OCCUPIED'
-        ).count()
+        counts = availability.status_counts(room_type.id)
+        total_rooms = counts['total']
+        occupied_rooms = counts['occupied']
+        if stay_dates:
+            available_rooms = availability.available_count(room_type.id, *stay_dates)
+        else:
+            available_rooms = counts['available']
 
         # Calculate occupancy percentage
         occupancy_percentage = 0
@@ -1073,4 +1092,50 @@ def complaints_api(request):
         return Response({
             'error': 'Failed to fetch complaints',
             'detail': str(e)
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def availability_api(request):
+    """
+    Bulk availability search for a stay across all room types
+    Frontend endpoint: /api/public/availability/?check_in=YYYY-MM-DD&check_out=YYYY-MM-DD
+    """
+    check_in = request.GET.get('check_in')
+    check_out = request.GET.get('check_out')
+    if not (check_in and check_out):
+        return Response({'error': 'check_in and check_out are required'}, status=400)
+
+    try:
+        check_in_date, check_out_date = parse_stay_dates(check_in, check_out)
+    except ValueError as e:
+        return Response({'error': 'Invalid stay dates', 'detail': str(e)}, status=400)
+
+    availability = AvailabilityIndex(check_in_date, check_out_date)
+    free_rooms_by_type = availability.summary(check_in_date, check_out_date)
+
+    room_types_data = []
+    available_room_ids = []
+    for room_type in RoomType.objects.filter(is_active=True).order_by('name'):
+        free_room_ids = free_rooms_by_type.get(room_type.id, [])
+        available_room_ids.extend(free_room_ids)
+        room_types_data.append({
+            'id': room_type.id,
+            'name': room_type.name,
+            'room_category': room_type.room_category,
+            'base_price': str(room_type.base_price),
+            'max_occupancy': room_type.max_occupancy,
+            'total_rooms': availability.status_counts(room_type.id)['total'],
+            'available_rooms_count': len(free_room_ids),
+            'available_room_ids': free_room_ids,
+        })
+
+    return Response({
+        'check_in': check_in_date.isoformat(),
+        'check_out': check_out_date.isoformat(),
+        'nights': (check_out_date - check_in_date).days,
+        'total_available': len(available_room_ids),
+        'available_room_ids': available_room_ids,
+        'room_types': room_types_data,
+    })
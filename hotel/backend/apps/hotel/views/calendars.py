@@ -5,10 +5,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from datetime import timedelta
 
+from core.caching import cached_endpoint
 from ..models import Holiday
 from ..serializers import HolidaySerializer, HolidayListSerializer
 
 
+HOLIDAYS_CACHE_NAMESPACE = 'hotel:holidays'
+
+
 class HolidayViewSet(viewsets.ModelViewSet):
     """ViewSet for managing holidays"""
     queryset = Holiday.objects.all()
@@ -25,6 +29,7 @@ class HolidayViewSet(viewsets.ModelViewSet):
         return HolidaySerializer
 
     @action(detail=False, methods=['get'])
+    @cached_endpoint(3600, HOLIDAYS_CACHE_NAMESPACE)
     def current_year(self, request):
         """Get holidays for current year"""
         current_year = timezone.now().year
@@ -37,6 +42,7 @@ class HolidayViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @cached_endpoint(3600, HOLIDAYS_CACHE_NAMESPACE)
     def upcoming(self, request):
         """Get upcoming holidays (next 3 months)"""
         today = timezone.now().date()
@@ -55,6 +61,7 @@ class HolidayViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @cached_endpoint(3600, HOLIDAYS_CACHE_NAMESPACE)
     def this_month(self, request):
         """Get holidays for current month"""
         today = timezone.now().date()
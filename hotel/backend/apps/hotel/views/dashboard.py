@@ -1,21 +1,46 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Count, Q, Avg
+from django.db.models import Count, Q, Sum, F, DurationField
 from datetime import date, timedelta
 from ..models import (
     Room, Reservation, Guest, CheckIn, CalendarEvent, Holiday
 )
 
 
+DASHBOARD_CACHE_KEY = 'hotel:dashboard'
+
+
+def invalidate_dashboard_cache():
+    """Drop the cached dashboard payload (called when reservations or check-ins change)"""
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def hotel_dashboard(request):
     """
     Hotel main dashboard API endpoint
     Provides comprehensive data for hotel homepage dashboard
+    Payload is cached for HOTEL_DASHBOARD_CACHE_TTL seconds
     """
+    return Response(get_dashboard_data())
+
+
+def get_dashboard_data():
+    """Return the cached dashboard payload, rebuilding it on a miss"""
+    dashboard_data = cache.get(DASHBOARD_CACHE_KEY)
+    if dashboard_data is None:
+        dashboard_data = build_dashboard_data()
+        cache.set(DASHBOARD_CACHE_KEY, dashboard_data, getattr(settings, 'HOTEL_DASHBOARD_CACHE_TTL', 30))
+    return dashboard_data
+
+
+def build_dashboard_data():
+    """Compute the dashboard payload"""
     today = date.today()
     now = timezone.now()
     
@@ -72,43 +97,36 @@ def hotel_dashboard(request):
     prev_month_start = week_start - timedelta(days=30)
     prev_month_end = week_end - timedelta(days=30)
     
-    # Calculate daily occupancy for current week
-    current_week_data = []
-    prev_week_data = []
-    
-    for i in range(7):
-        # Current week
-        current_day = week_start + timedelta(days=i)
-        current_occupied = Reservation.objects.filter(
-            check_in_date__lte=current_day,
-            check_out_date__gt=current_day,
-            status__in=['CHECKED_IN', 'CHECKED_OUT']
-        ).values('room').distinct().count()
-        current_occupancy = (current_occupied / total_rooms * 100) if total_rooms > 0 else 0
-        
-        # Previous month same week
-        prev_day = prev_month_start + timedelta(days=i)
-        prev_occupied = Reservation.objects.filter(
-            check_in_date__lte=prev_day,
-            check_out_date__gt=prev_day,
-            status__in=['CHECKED_IN', 'CHECKED_OUT']
-        ).values('room').distinct().count()
-        prev_occupancy = (prev_occupied / total_rooms * 100) if total_rooms > 0 else 0
-        
-        current_week_data.append({
-            'day': current_day.strftime('%A'),
-            'date': current_day.strftime('%Y-%m-%d'),
-            'occupancy': round(current_occupancy, 1),
-            'occupied_rooms': current_occupied
-        })
-        
-        prev_week_data.append({
-            'day': prev_day.strftime('%A'),
-            'date': prev_day.strftime('%Y-%m-%d'),
-            'occupancy': round(prev_occupancy, 1),
-            'occupied_rooms': prev_occupied
-        })
-    
+    # Calculate daily occupancy for both weeks in a single query, one
+    # conditional distinct-room count per day of the generated date series
+    current_days = [week_start + timedelta(days=i) for i in range(7)]
+    prev_days = [prev_month_start + timedelta(days=i) for i in range(7)]
+    occupied_by_day = Reservation.objects.filter(
+        check_in_date__lte=max(current_days[-1], prev_days[-1]),
+        check_out_date__gt=min(current_days[0], prev_days[0]),
+        status__in=['CHECKED_IN', 'CHECKED_OUT']
+    ).aggregate(**{
+        day.strftime('occupied_%Y%m%d'): Count(
+            'room',
+            distinct=True,
+            filter=Q(check_in_date__lte=day, check_out_date__gt=day)
+        )
+        for day in current_days + prev_days
+    })
+
+    def day_occupancy(day):
+        occupied = occupied_by_day[day.strftime('occupied_%Y%m%d')]
+        occupancy = (occupied / total_rooms * 100) if total_rooms > 0 else 0
+        return {
+            'day': day.strftime('%A'),
+            'date': day.strftime('%Y-%m-%d'),
+            'occupancy': round(occupancy, 1),
+            'occupied_rooms': occupied
+        }
+
+    current_week_data = [day_occupancy(day) for day in current_days]
+    prev_week_data = [day_occupancy(day) for day in prev_days]
+
     # Latest news (using calendar events as news)
     latest_news = []
     recent_events = CalendarEvent.objects.filter(
@@ -170,25 +188,25 @@ def hotel_dashboard(request):
         })
     
     # Additional metrics
-    # Average daily rate (ADR)
-    recent_reservations = Reservation.objects.filter(
+    # Average daily rate (ADR) and revenue per available room (RevPAR), summed in the database
+    recent_totals = Reservation.objects.filter(
         check_in_date__gte=recent_date,
         status__in=['CHECKED_IN', 'CHECKED_OUT']
+    ).aggregate(
+        reservations=Count('id'),
+        total_revenue=Sum('total_amount'),
+        total_stay=Sum(F('check_out_date') - F('check_in_date'), output_field=DurationField())
     )
-    
-    if recent_reservations.exists():
-        total_revenue = sum(float(res.total_amount) if res.total_amount else 0 for res in recent_reservations)
-        total_room_nights = sum(res.nights for res in recent_reservations)
-        adr = total_revenue / total_room_nights if total_room_nights > 0 else 0
-    else:
-        adr = 0
-        total_revenue = 0
-    
+
+    total_revenue = float(recent_totals['total_revenue'] or 0)
+    total_room_nights = recent_totals['total_stay'].days if recent_totals['total_stay'] else 0
+    adr = total_revenue / total_room_nights if total_room_nights > 0 else 0
+
     # Revenue per available room (RevPAR)
     days_in_period = 30
     total_available_room_nights = total_rooms * days_in_period
-    revpar = (total_revenue / total_available_room_nights) if total_available_room_nights > 0 and recent_reservations.exists() else 0
-    
+    revpar = (total_revenue / total_available_room_nights) if total_available_room_nights > 0 and recent_totals['reservations'] else 0
+
     # Prepare response data
     dashboard_data = {
         'basic_metrics': {
@@ -218,5 +236,5 @@ def hotel_dashboard(request):
         'holidays_this_month': holidays_data,
         'last_updated': now.strftime('%Y-%m-%d %H:%M:%S')
     }
-    
-    return Response(dashboard_data)
\ No newline at end of file
+
+    return dashboard_data
\ No newline at end of file
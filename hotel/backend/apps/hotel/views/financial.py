@@ -5,6 +5,7 @@ from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 from apps.hotel.models import Payment, Expense, Reservation, Invoice
+from apps.hotel.services.kpi_snapshots import get_kpi_totals
 
 
 @api_view(['GET'])
@@ -50,18 +51,9 @@ def financial_overview(request):
         last_month_end = start_date - timedelta(days=1)
         last_month_start = last_month_end.replace(day=1)
 
-    # Calculate revenue from completed payments
-    current_revenue = Payment.objects.filter(
-        payment_date__date__gte=start_date,
-        payment_date__date__lte=end_date,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-    last_revenue = Payment.objects.filter(
-        payment_date__date__gte=last_month_start,
-        payment_date__date__lte=last_month_end,
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    # Calculate revenue from completed payments (past days served from KPI snapshots)
+    current_revenue = get_kpi_totals(start_date, end_date)['revenue']
+    last_revenue = get_kpi_totals(last_month_start, last_month_end)['revenue']
 
     # Calculate growth percentage
     if last_revenue > 0:
@@ -12,6 +12,7 @@ from ..models import (
 from ..serializers import (
     FinancialTransactionSerializer, InvoiceSerializer, InvoiceItemSerializer
 )
+from ..services.kpi_snapshots import get_kpi_totals
 
 
 class FinancialViewSet(viewsets.ViewSet):
@@ -75,19 +76,11 @@ class FinancialViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get revenue data from Payment model (current period)
-        total_revenue = Payment.objects.filter(
-            payment_date__date__gte=start_date,
-            payment_date__date__lte=end_date,
-            status='COMPLETED'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        # Get revenue from completed payments (past days served from KPI snapshots)
+        total_revenue = get_kpi_totals(start_date, end_date)['revenue']
 
         # Get revenue from last period for growth calculation
-        last_revenue = Payment.objects.filter(
-            payment_date__date__gte=last_start,
-            payment_date__date__lte=last_end,
-            status='COMPLETED'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        last_revenue = get_kpi_totals(last_start, last_end)['revenue']
 
         # Calculate growth percentage
         if last_revenue > 0:
@@ -5,6 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from ..models import Guest
 from ..serializers import GuestSerializer, GuestListSerializer
+from ..services.guest_stats import with_guest_stats
 
 
 class GuestViewSet(viewsets.ModelViewSet):
@@ -17,6 +18,13 @@ class GuestViewSet(viewsets.ModelViewSet):
     ordering_fields = ['first_name', 'last_name', 'created_at']
     ordering = ['first_name', 'last_name']
 
+    def get_queryset(self):
+        """Annotate stay statistics; only the detail serializer needs reservation history"""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'vip', 'search_by_phone'):
+            return with_guest_stats(queryset, reservations=False)
+        return with_guest_stats(queryset)
+
     def get_serializer_class(self):
         if self.action == 'list':
             return GuestListSerializer
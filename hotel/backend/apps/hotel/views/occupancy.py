@@ -2,11 +2,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.utils import timezone
-from django.db.models import Count, Q, Avg
+from django.db.models import Count
 from datetime import timedelta, date
 from collections import defaultdict
 
-from ..models import Reservation, Room, RoomType
+from ..models import Reservation, Room, RoomType, RoomNight
 
 
 @api_view(['GET'])
@@ -56,29 +56,49 @@ def occupancy_analytics(request):
 
     # Get total active rooms
     total_rooms = Room.objects.filter(is_active=True).count()
-    room_types = RoomType.objects.all()
+    room_types = list(RoomType.objects.all())
+    type_totals = dict(
+        Room.objects.filter(is_active=True).values('room_type').annotate(
+            total=Count('id')
+        ).values_list('room_type', 'total')
+    )
+
+    # Occupied rooms per day and per (day, room type), one grouped query each over the ledger
+    room_nights = RoomNight.objects.filter(date__gte=start_date, date__lte=end_date)
+    occupied_by_day = dict(
+        room_nights.values('date').annotate(
+            occupied=Count('room', distinct=True)
+        ).values_list('date', 'occupied')
+    )
+    occupied_by_day_and_type = defaultdict(dict)
+    for row in room_nights.values('date', 'room__room_type').annotate(occupied=Count('room', distinct=True)):
+        occupied_by_day_and_type[row['date']][row['room__room_type']] = row['occupied']
+
+    # Arrivals and departures per day
+    checkins_by_day = dict(
+        Reservation.objects.filter(check_in_date__gte=start_date, check_in_date__lte=end_date).values(
+            'check_in_date'
+        ).annotate(total=Count('id')).values_list('check_in_date', 'total')
+    )
+    checkouts_by_day = dict(
+        Reservation.objects.filter(check_out_date__gte=start_date, check_out_date__lte=end_date).values(
+            'check_out_date'
+        ).annotate(total=Count('id')).values_list('check_out_date', 'total')
+    )
 
     # === DAILY OCCUPANCY DATA ===
     daily_data = []
+    type_occupied_totals = defaultdict(int)
     current_date = start_date
     while current_date <= end_date:
-        # Get reservations that overlap with current_date
-        occupied_rooms = Reservation.objects.filter(
-            check_in_date__lte=current_date,
-            check_out_date__gt=current_date,
-            status__in=['CHECKED_IN', 'CONFIRMED', 'CHECKED_OUT']
-        ).select_related('room', 'room__room_type').values_list('room', flat=True).distinct().count()
+        occupied_rooms = occupied_by_day.get(current_date, 0)
 
         # Count by room type
         room_type_occupancy = {}
         for room_type in room_types:
-            type_total = Room.objects.filter(room_type=room_type, is_active=True).count()
-            type_occupied = Reservation.objects.filter(
-                check_in_date__lte=current_date,
-                check_out_date__gt=current_date,
-                status__in=['CHECKED_IN', 'CONFIRMED', 'CHECKED_OUT'],
-                room__room_type=room_type
-            ).values_list('room', flat=True).distinct().count()
+            type_total = type_totals.get(room_type.id, 0)
+            type_occupied = occupied_by_day_and_type[current_date].get(room_type.id, 0)
+            type_occupied_totals[room_type.id] += type_occupied
 
             room_type_occupancy[room_type.name] = {
                 'occupied': type_occupied,
@@ -88,17 +108,6 @@ def occupancy_analytics(request):
 
         occupancy_rate = round((occupied_rooms / total_rooms * 100), 1) if total_rooms > 0 else 0
 
-        # Count check-ins and check-outs for this day
-        checkins = Reservation.objects.filter(check_in_date=current_date).count()
-        checkouts = Reservation.objects.filter(check_out_date=current_date).count()
-
-        # Calculate revenue for this day (if needed)
-        from ..models import Payment
-        daily_revenue = Payment.objects.filter(
-            payment_date__date=current_date,
-            status='COMPLETED'
-        ).aggregate(total=Count('amount'))
-
         daily_data.append({
             'date': current_date.isoformat(),
             'day_name': current_date.strftime('%A'),
@@ -106,8 +115,8 @@ def occupancy_analytics(request):
             'available_rooms': total_rooms - occupied_rooms,
             'total_rooms': total_rooms,
             'occupancy_rate': occupancy_rate,
-            'checkins': checkins,
-            'checkouts': checkouts,
+            'checkins': checkins_by_day.get(current_date, 0),
+            'checkouts': checkouts_by_day.get(current_date, 0),
             'room_type_occupancy': room_type_occupancy
         })
 
@@ -128,74 +137,40 @@ def occupancy_analytics(request):
     total_room_nights_available = total_rooms * total_days
 
     # === MONTHLY COMPARISON (for yearly view) ===
+    # The yearly periods already cover the whole year up to today, so months are
+    # folded from the grouped daily series instead of being queried again.
     monthly_data = []
     if period in ['thisYear', 'lastYear']:
         year = start_date.year
-        for month_num in range(1, 13):
-            if month_num > end_date.month and year == end_date.year:
-                break
-
-            month_start = date(year, month_num, 1)
-            if month_num == 12:
-                month_end = date(year, 12, 31)
-            else:
-                month_end = date(year, month_num + 1, 1) - timedelta(days=1)
-
-            # Don't include future months
-            if month_start > today:
-                break
-            if month_end > today:
-                month_end = today
-
-            # Calculate monthly occupancy
-            month_days = []
-            current = month_start
-            while current <= month_end:
-                occupied = Reservation.objects.filter(
-                    check_in_date__lte=current,
-                    check_out_date__gt=current,
-                    status__in=['CHECKED_IN', 'CONFIRMED', 'CHECKED_OUT']
-                ).values_list('room', flat=True).distinct().count()
-
-                month_days.append({
-                    'occupied': occupied,
-                    'rate': (occupied / total_rooms * 100) if total_rooms > 0 else 0
-                })
-                current += timedelta(days=1)
-
-            avg_monthly_occupancy = sum(d['rate'] for d in month_days) / len(month_days) if month_days else 0
-            total_monthly_room_nights = sum(d['occupied'] for d in month_days)
+        month_days = defaultdict(list)
+        current = start_date
+        while current <= min(end_date, today):
+            month_days[current.month].append(occupied_by_day.get(current, 0))
+            current += timedelta(days=1)
+
+        for month_num in sorted(month_days):
+            occupied_days = month_days[month_num]
+            rates = [(occupied / total_rooms * 100) if total_rooms > 0 else 0 for occupied in occupied_days]
 
             monthly_data.append({
                 'month': month_num,
                 'month_name': date(year, month_num, 1).strftime('%B'),
                 'year': year,
-                'average_occupancy': round(avg_monthly_occupancy, 1),
-                'total_room_nights': total_monthly_room_nights,
-                'days_in_month': len(month_days)
+                'average_occupancy': round(sum(rates) / len(rates), 1) if rates else 0,
+                'total_room_nights': sum(occupied_days),
+                'days_in_month': len(occupied_days)
             })
 
     # === ROOM TYPE SUMMARY ===
     room_type_summary = []
     for room_type in room_types:
-        type_total = Room.objects.filter(room_type=room_type, is_active=True).count()
-
-        # Calculate average occupancy for this room type across the period
-        type_occupancy_rates = []
-        current = start_date
-        while current <= end_date:
-            type_occupied = Reservation.objects.filter(
-                check_in_date__lte=current,
-                check_out_date__gt=current,
-                status__in=['CHECKED_IN', 'CONFIRMED', 'CHECKED_OUT'],
-                room__room_type=room_type
-            ).values_list('room', flat=True).distinct().count()
-
-            rate = (type_occupied / type_total * 100) if type_total > 0 else 0
-            type_occupancy_rates.append(rate)
-            current += timedelta(days=1)
+        type_total = type_totals.get(room_type.id, 0)
 
-        avg_type_occupancy = sum(type_occupancy_rates) / len(type_occupancy_rates) if type_occupancy_rates else 0
+        # Average occupancy for this room type across the period
+        if type_total > 0 and total_days > 0:
+            avg_type_occupancy = type_occupied_totals[room_type.id] / type_total * 100 / total_days
+        else:
+            avg_type_occupancy = 0
 
         room_type_summary.append({
             'room_type': room_type.name,
@@ -243,3 +218,34 @@ def occupancy_analytics(request):
         'monthly_data': monthly_data,
         'room_type_summary': room_type_summary
     })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def occupancy_forecast(request):
+    """
+    Forecast occupancy for the next N days per room type
+
+    Query params:
+    - days: forecast horizon, 1-365 (default 30)
+    - room_type: room type ID (optional, default all)
+    - lookback: days of history used for the pickup curve, 1-365 (default 90)
+    """
+    from rest_framework import status
+    from ..services.occupancy_forecast import forecast_occupancy, MAX_HORIZON_DAYS
+
+    try:
+        days = int(request.GET.get('days', 30))
+        lookback = int(request.GET.get('lookback', 90))
+        room_type_id = request.GET.get('room_type')
+        room_type_id = int(room_type_id) if room_type_id else None
+    except ValueError:
+        return Response({'error': 'days, lookback and room_type must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not 1 <= days <= MAX_HORIZON_DAYS or not 1 <= lookback <= 365:
+        return Response(
+            {'error': f'days must be between 1 and {MAX_HORIZON_DAYS}, lookback between 1 and 365'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(forecast_occupancy(days=days, room_type_id=room_type_id, lookback_days=lookback))
@@ -13,6 +13,8 @@ from ..models import (
     InventoryItem, Expense, Complaint
 )
 from ..utils.report_formatters import get_formatter
+from ..utils.daily_series import daily_series, daily_overlap_counts
+from ..services.kpi_snapshots import get_kpi_totals
 
 
 def parse_period_to_date_range(period):
@@ -443,11 +445,8 @@ def report_summary(request):
     ).count()
     occupancy_rate = round((occupied_rooms / total_rooms * 100), 1) if total_rooms > 0 else 0
 
-    # Calculate average revenue
-    total_revenue = Payment.objects.filter(
-        payment_date__range=[start_datetime, end_datetime],
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    # Calculate average revenue (past days served from KPI snapshots)
+    total_revenue = get_kpi_totals(start_date, end_date)['revenue']
 
     days_in_period = (end_date - start_date).days + 1
     average_revenue = float(total_revenue / days_in_period) if days_in_period > 0 else 0
@@ -554,15 +553,13 @@ def occupancy_report(request):
     total_rooms = Room.objects.filter(is_active=True).count()
 
     # Daily occupancy data
-    daily_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        occupied = Reservation.objects.filter(
-            check_in_date__lte=current_date,
-            check_out_date__gt=current_date,
-            status__in=['CHECKED_IN', 'CHECKED_OUT']
-        ).count()
+    occupied_by_day = daily_overlap_counts(
+        Reservation.objects.filter(status__in=['CHECKED_IN', 'CHECKED_OUT']),
+        'check_in_date', 'check_out_date', start_date, end_date
+    )
 
+    daily_data = []
+    for current_date, occupied in occupied_by_day.items():
         occupancy_rate = round((occupied / total_rooms * 100), 1) if total_rooms > 0 else 0
 
         daily_data.append({
@@ -572,8 +569,6 @@ def occupancy_report(request):
             'occupancy_rate': occupancy_rate
         })
 
-        current_date += timedelta(days=1)
-
     # Calculate average occupancy
     avg_occupancy = sum(day['occupancy_rate'] for day in daily_data) / len(daily_data) if daily_data else 0
 
@@ -624,23 +619,18 @@ def revenue_report(request):
     other_revenue = total_revenue - room_revenue
 
     # Daily revenue trend
-    daily_revenue = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_start = datetime.combine(current_date, datetime.min.time())
-        day_end = datetime.combine(current_date, datetime.max.time())
-
-        day_total = Payment.objects.filter(
-            payment_date__range=[day_start, day_end],
-            status='COMPLETED'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    revenue_by_day = daily_series(
+        Payment.objects.filter(status='COMPLETED'), 'payment_date', start_date, end_date,
+        total=Sum('amount')
+    )
 
-        daily_revenue.append({
+    daily_revenue = [
+        {
             'date': current_date.strftime('%Y-%m-%d'),
-            'revenue': float(day_total)
-        })
-
-        current_date += timedelta(days=1)
+            'revenue': float(day['total'])
+        }
+        for current_date, day in revenue_by_day.items()
+    ]
 
     data = {
         'period': period,
@@ -718,43 +708,30 @@ def guest_analytics_report(request):
         avg_stay = 0
 
     # Daily breakdown
-    daily_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_start = datetime.combine(current_date, datetime.min.time())
-        day_end = datetime.combine(current_date, datetime.max.time())
-
-        # New guests registered on this day
-        day_guests = Guest.objects.filter(
-            created_at__range=[day_start, day_end]
-        ).count()
-
-        # New reservations created on this day
-        day_reservations = Reservation.objects.filter(
-            created_at__range=[day_start, day_end]
-        ).count()
-
-        # Check-ins on this day
-        day_checkins = Reservation.objects.filter(
-            check_in_date=current_date,
-            status__in=['CHECKED_IN', 'CHECKED_OUT']
-        ).count()
-
-        # Check-outs on this day
-        day_checkouts = Reservation.objects.filter(
-            check_out_date=current_date,
-            status='CHECKED_OUT'
-        ).count()
+    # New guests and reservations by creation day
+    guests_by_day = daily_series(Guest.objects.all(), 'created_at', start_date, end_date, count=Count('id'))
+    reservations_by_day = daily_series(Reservation.objects.all(), 'created_at', start_date, end_date, count=Count('id'))
+
+    # Check-ins and check-outs by stay dates
+    checkins_by_day = daily_series(
+        Reservation.objects.filter(status__in=['CHECKED_IN', 'CHECKED_OUT']),
+        'check_in_date', start_date, end_date, count=Count('id')
+    )
+    checkouts_by_day = daily_series(
+        Reservation.objects.filter(status='CHECKED_OUT'),
+        'check_out_date', start_date, end_date, count=Count('id')
+    )
 
-        daily_data.append({
+    daily_data = [
+        {
             'date': current_date.strftime('%Y-%m-%d'),
-            'new_guests': day_guests,
-            'new_reservations': day_reservations,
-            'check_ins': day_checkins,
-            'check_outs': day_checkouts
-        })
-
-        current_date += timedelta(days=1)
+            'new_guests': guests_by_day[current_date]['count'],
+            'new_reservations': reservations_by_day[current_date]['count'],
+            'check_ins': checkins_by_day[current_date]['count'],
+            'check_outs': checkouts_by_day[current_date]['count']
+        }
+        for current_date in guests_by_day
+    ]
 
     data = {
         'period': period,
@@ -900,27 +877,22 @@ def satisfaction_report(request):
     complaint_rate_per_100 = round((total_complaints / total_reservations * 100), 1) if total_reservations > 0 else 0
 
     # Daily breakdown
-    daily_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_start = datetime.combine(current_date, datetime.min.time())
-        day_end = datetime.combine(current_date, datetime.max.time())
-
-        day_complaints = Complaint.objects.filter(
-            created_at__range=[day_start, day_end]
-        )
-
-        day_resolved = day_complaints.filter(status='RESOLVED').count()
-        day_total = day_complaints.count()
+    complaints_by_day = daily_series(
+        Complaint.objects.all(), 'created_at', start_date, end_date,
+        total=Count('id'),
+        resolved=Count('id', filter=Q(status='RESOLVED')),
+        pending=Count('id', filter=Q(status__in=['OPEN', 'IN_PROGRESS']))
+    )
 
-        daily_data.append({
+    daily_data = [
+        {
             'date': current_date.strftime('%Y-%m-%d'),
-            'total_complaints': day_total,
-            'resolved': day_resolved,
-            'pending': day_complaints.filter(status__in=['OPEN', 'IN_PROGRESS']).count()
-        })
-
-        current_date += timedelta(days=1)
+            'total_complaints': day['total'],
+            'resolved': day['resolved'],
+            'pending': day['pending']
+        }
+        for current_date, day in complaints_by_day.items()
+    ]
 
     data = {
         'period': period,
@@ -1091,30 +1063,26 @@ def maintenance_report(request):
     avg_cost_per_request = float(total_cost / total_requests) if total_requests > 0 else 0
 
     # Daily breakdown
-    daily_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_start = datetime.combine(current_date, datetime.min.time())
-        day_end = datetime.combine(current_date, datetime.max.time())
-
-        day_requests = MaintenanceRequest.objects.filter(
-            requested_date__range=[day_start, day_end]
-        )
-
-        day_completed = day_requests.filter(status='COMPLETED').count()
-        day_total = day_requests.count()
-        day_cost = day_requests.aggregate(total=Sum('actual_cost'))['total'] or Decimal('0')
+    requests_by_day = daily_series(
+        MaintenanceRequest.objects.all(), 'requested_date', start_date, end_date,
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        in_progress=Count('id', filter=Q(status='IN_PROGRESS')),
+        pending=Count('id', filter=Q(status__in=['SUBMITTED', 'ACKNOWLEDGED'])),
+        cost=Sum('actual_cost')
+    )
 
-        daily_data.append({
+    daily_data = [
+        {
             'date': current_date.strftime('%Y-%m-%d'),
-            'total_requests': day_total,
-            'completed': day_completed,
-            'in_progress': day_requests.filter(status='IN_PROGRESS').count(),
-            'pending': day_requests.filter(status__in=['SUBMITTED', 'ACKNOWLEDGED']).count(),
-            'cost': float(day_cost)
-        })
-
-        current_date += timedelta(days=1)
+            'total_requests': day['total'],
+            'completed': day['completed'],
+            'in_progress': day['in_progress'],
+            'pending': day['pending'],
+            'cost': float(day['cost'])
+        }
+        for current_date, day in requests_by_day.items()
+    ]
 
     data = {
         'period': period,
@@ -1297,24 +1265,28 @@ def tax_report(request):
 
     # === 4. DAILY TAX BREAKDOWN ===
     # Use payment_date for consistency (when revenue is actually received)
-    daily_breakdown = []
-    current_date = start_date
-    while current_date <= end_date:
-        # Room revenue by payment date (timezone-aware)
-        day_start = timezone.make_aware(datetime.combine(current_date, datetime.min.time()))
-        day_end = timezone.make_aware(datetime.combine(current_date, datetime.max.time()))
-
-        day_paid_reservation_ids = Payment.objects.filter(
-            payment_date__range=[day_start, day_end],
-            status='COMPLETED'
-        ).values_list('reservation_id', flat=True).distinct()
+    room_payments_by_day = daily_series(
+        Payment.objects.filter(status='COMPLETED', reservation__isnull=False),
+        'payment_date', start_date, end_date,
+        total=Sum('amount')
+    )
 
+    # Event revenue by event date
+    try:
+        events_by_day = daily_series(
+            EventBooking.objects.filter(status__in=['CONFIRMED', 'ONGOING', 'COMPLETED']),
+            'event_date', start_date, end_date,
+            subtotal=Sum('subtotal'),
+            tax_amount=Sum('tax_amount'),
+            grand_total=Sum('grand_total')
+        )
+    except:
+        events_by_day = {}
+
+    daily_breakdown = []
+    for current_date, room_day in room_payments_by_day.items():
         # Use actual payment amounts for this day
-        day_room_payments = Payment.objects.filter(
-            payment_date__range=[day_start, day_end],
-            status='COMPLETED',
-            reservation__isnull=False
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        day_room_payments = Decimal(room_day['total'])
 
         # Back-calculate base amount from payment total
         day_room_subtotal = day_room_payments / Decimal('1.31')
@@ -1322,19 +1294,10 @@ def tax_report(request):
         day_room_service = day_room_subtotal * SERVICE_CHARGE_RATE
         day_room_total = day_room_payments
 
-        # Event revenue by event date
-        try:
-            day_events = EventBooking.objects.filter(
-                event_date=current_date,
-                status__in=['CONFIRMED', 'ONGOING', 'COMPLETED']
-            )
-            day_event_subtotal = day_events.aggregate(total=Sum('subtotal'))['total'] or Decimal('0')
-            day_event_tax = day_events.aggregate(total=Sum('tax_amount'))['total'] or Decimal('0')
-            day_event_total = day_events.aggregate(total=Sum('grand_total'))['total'] or Decimal('0')
-        except:
-            day_event_subtotal = Decimal('0')
-            day_event_tax = Decimal('0')
-            day_event_total = Decimal('0')
+        event_day = events_by_day.get(current_date, {})
+        day_event_subtotal = Decimal(event_day.get('subtotal', 0))
+        day_event_tax = Decimal(event_day.get('tax_amount', 0))
+        day_event_total = Decimal(event_day.get('grand_total', 0))
 
         day_total_subtotal = day_room_subtotal + day_event_subtotal
         day_total_tax = day_room_tax + day_event_tax
@@ -1351,8 +1314,6 @@ def tax_report(request):
             'grand_total': float(day_total_grand)
         })
 
-        current_date += timedelta(days=1)
-
     # === 5. CALCULATE TOTAL TAXES ===
     total_subtotal = room_subtotal + event_subtotal
     total_tax_collected = room_tax_amount + event_tax_amount
@@ -34,7 +34,9 @@ class ReservationFilter(FilterSet):
 
 class ReservationViewSet(viewsets.ModelViewSet):
     """ViewSet for managing reservations"""
-    queryset = Reservation.objects.select_related('guest', 'room', 'room__room_type')
+    queryset = Reservation.objects.select_related(
+        'guest', 'room', 'room__room_type', 'room_type'
+    ).prefetch_related('payments', 'additional_charges')
     serializer_class = ReservationSerializer
     pagination_class = LargeResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -10,6 +10,7 @@ from ..models import RoomType, Room, RoomTypeImage
 from ..serializers import (
     RoomTypeSerializer, RoomSerializer, RoomListSerializer
 )
+from ..services.availability import AvailabilityIndex, parse_stay_dates
 
 
 class RoomTypeViewSet(viewsets.ModelViewSet):
@@ -111,7 +112,24 @@ class RoomViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def available(self, request):
-        """Get available rooms for check-in"""
+        """Get available rooms for check-in, or rooms free for a stay when check_in/check_out are given"""
+        check_in = request.query_params.get('check_in')
+        check_out = request.query_params.get('check_out')
+
+        if check_in and check_out:
+            try:
+                check_in_date, check_out_date = parse_stay_dates(check_in, check_out)
+            except ValueError as e:
+                return Response({'error': 'Invalid stay dates', 'detail': str(e)},
+                              status=status.HTTP_400_BAD_REQUEST)
+
+            availability = AvailabilityIndex(check_in_date, check_out_date)
+            available_rooms = self.get_queryset().filter(
+                id__in=availability.free_room_ids(check_in_date, check_out_date)
+            )
+            serializer = RoomListSerializer(available_rooms, many=True)
+            return Response(serializer.data)
+
         available_rooms = self.get_queryset().filter(
             status='AVAILABLE',
             is_active=True
@@ -199,6 +217,12 @@ class RoomViewSet(viewsets.ModelViewSet):
             # All reservations are paid, proceed with checkout
             checked_in_reservations.update(status='CHECKED_OUT')
 
+            # queryset.update() bypasses post_save, so drop the cached dashboard explicitly
+            from core.events import broker
+            from .dashboard import invalidate_dashboard_cache
+            invalidate_dashboard_cache()
+            broker.publish('dashboard', {'model': 'Reservation'})
+
         room.status = new_status
         room.save(update_fields=['status', 'updated_at'])
 
@@ -0,0 +1,96 @@
+"""
+Server-Sent Events stream replacing sidebar and dashboard polling.
+Served by the ASGI application in core/asgi.py; each message carries only
+the counters or dashboard sections that changed since the previous one.
+Under WSGI the view sends the snapshot and closes (see core.events).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from core.events import broker, format_sse, format_sse_retry, is_asgi_request, SSE_KEEPALIVE
+from ..services.sidebar_counters import get_counts
+from .dashboard import get_dashboard_data
+
+
+STREAM_CHANNELS = ['sidebar', 'dashboard']
+
+
+def _changed(previous, current, ignore=()):
+    """Keys whose values differ between two snapshots"""
+    return {
+        key: value for key, value in current.items()
+        if key not in ignore and previous.get(key) != value
+    }
+
+
+async def _live_update_events(keepalive):
+    subscription = broker.subscribe(STREAM_CHANNELS)
+    try:
+        # Initial snapshot so the client can render without polling first
+        counts = await sync_to_async(get_counts)()
+        dashboard = await sync_to_async(get_dashboard_data)()
+        yield format_sse('sidebar_counts', counts)
+        yield format_sse('dashboard', dashboard)
+
+        while True:
+            event = await subscription.get(timeout=keepalive)
+            if event is None:
+                yield SSE_KEEPALIVE
+                continue
+
+            # Coalesce a burst of change notices into one recount per channel
+            event_id, channel, _ = event
+            channels = {channel}
+            while not subscription.queue.empty():
+                event_id, channel, _ = subscription.queue.get_nowait()
+                channels.add(channel)
+
+            if 'sidebar' in channels:
+                new_counts = await sync_to_async(get_counts)()
+                changed = _changed(counts, new_counts)
+                counts = new_counts
+                if changed:
+                    yield format_sse('sidebar_counts', changed, event_id)
+
+            if 'dashboard' in channels:
+                new_dashboard = await sync_to_async(get_dashboard_data)()
+                changed = _changed(dashboard, new_dashboard, ignore=('last_updated',))
+                dashboard = new_dashboard
+                if changed:
+                    yield format_sse('dashboard', changed, event_id)
+    finally:
+        subscription.close()
+
+
+async def live_updates(request):
+    """
+    Stream sidebar badge counts and dashboard changes as Server-Sent Events
+    Frontend endpoint: /api/hotel/stream/
+
+    Events:
+    - sidebar_counts: full counts on connect, then only changed counters
+    - dashboard: full payload on connect, then only changed sections
+
+    Under WSGI only the full snapshot is sent, with a retry hint, and the
+    connection closes; EventSource reconnects and so polls instead.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    if is_asgi_request(request):
+        keepalive = getattr(settings, 'SSE_KEEPALIVE_SECONDS', 15)
+        response = StreamingHttpResponse(_live_update_events(keepalive), content_type='text/event-stream')
+    else:
+        counts = await sync_to_async(get_counts)()
+        dashboard = await sync_to_async(get_dashboard_data)()
+        response = HttpResponse(
+            format_sse_retry(getattr(settings, 'SSE_WSGI_RETRY_SECONDS', 15))
+            + format_sse('sidebar_counts', counts)
+            + format_sse('dashboard', dashboard),
+            content_type='text/event-stream'
+        )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
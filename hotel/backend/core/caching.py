@@ -0,0 +1,107 @@
+"""
+Namespaced, versioned caching on top of the default cache (settings.CACHES).
+
+Cached entries live under a namespace, optionally narrowed by a scope (a branch
+or hotel id):
+
+    hotel:holidays:*:v1700000000123:<key>
+    resto:products:3:v1700000000123.1700000000456:<key>
+
+The version part comes from counters stored in the cache itself. invalidate()
+bumps a counter, which makes every key built with the old version unreachable.
+Stale entries are never deleted one by one; they simply expire. Invalidating
+a namespace without a scope bumps the namespace counter, which drops every
+scope at once.
+
+Signal receivers call invalidate() when the models behind a namespace change.
+The TTL only bounds staleness for writes that bypass signals, such as
+queryset.update() or raw SQL.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+ALL_SCOPES = '*'
+
+
+def _version_key(namespace, scope=ALL_SCOPES):
+    return f'{namespace}:{scope}:version'
+
+
+def _initial_version():
+    # Time-based, so a version counter that was evicted never comes back as a
+    # number that older (still cached) entries were stored under
+    return int(time.time() * 1000)
+
+
+def namespace_version(namespace, scope=None):
+    """Current version of a namespace (and scope), e.g. '1700000000123.1700000000456'"""
+    keys = [_version_key(namespace)]
+    if scope is not None:
+        keys.append(_version_key(namespace, scope))
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def namespaced_key(namespace, *parts, scope=None):
+    """Cache key for parts under the namespace's current version"""
+    scope_part = ALL_SCOPES if scope is None else scope
+    return ':'.join([namespace, str(scope_part), f'v{namespace_version(namespace, scope)}', *map(str, parts)])
+
+
+def invalidate(namespace, scope=None):
+    """Make every entry of the namespace (or just one scope of it) unreachable"""
+    key = _version_key(namespace) if scope is None else _version_key(namespace, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Never read yet, or evicted: start a fresh version
+        cache.set(key, _initial_version(), None)
+
+
+def cached_endpoint(ttl, namespace, vary_on=(), scope=None):
+    """
+    Cache a GET endpoint's response data under a namespace
+
+    Works on @api_view functions and on ViewSet actions (put it below @api_view /
+    @action, so permission checks still run on every request). Only 200 responses
+    are stored. The key varies on the path, today's date and the query parameters
+    listed in vary_on. `scope` names the query parameter (e.g. 'branch_id') whose
+    value scopes the entry, so invalidate(namespace, scope=value) drops only that scope.
+
+    Usage:
+        @api_view(['GET'])
+        @cached_endpoint(60, 'hotel:room-types', vary_on=['page', 'check_in', 'check_out'])
+        def room_types_api(request):
+            ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if hasattr(arg, 'query_params'))
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            params = request.query_params
+            varies = [request.path, timezone.localdate().isoformat()]
+            varies += [f'{name}={params.get(name, "")}' for name in vary_on]
+            digest = hashlib.md5('|'.join(varies).encode()).hexdigest()
+            key = namespaced_key(namespace, view.__name__, digest, scope=params.get(scope) if scope else None)
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, ttl)
+            return response
+        return wrapper
+    return decorator
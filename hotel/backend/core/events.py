@@ -0,0 +1,114 @@
+"""
+In-process publish/subscribe broker for Server-Sent Events streams.
+
+Model signals publish small change notices from whichever thread saved the
+model; async SSE views subscribe and receive them on their own event loop.
+Events stay within one server process, so each ASGI worker runs its own
+broker and streams only what that worker saw change.
+
+Streams need the ASGI application (core/asgi.py). Under WSGI (runserver,
+passenger_wsgi.py) Django buffers a streaming async response until it ends,
+so an endless stream would never send a byte and would hold a worker thread.
+Stream views check is_asgi_request() and, under WSGI, send the snapshot with
+a retry hint and close: EventSource then reconnects, i.e. falls back to polling.
+"""
+import asyncio
+import itertools
+import json
+import threading
+
+from django.core.handlers.asgi import ASGIRequest
+
+
+class Subscription:
+    """A subscriber's queue of (event_id, channel, payload) tuples"""
+
+    def __init__(self, broker, channels, max_queue=256):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def deliver(self, event):
+        """Called from the publishing thread; hands the event to the subscriber's loop"""
+        def put():
+            if self.queue.full():
+                # Slow consumer: drop the oldest event rather than block publishers
+                self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+        try:
+            self.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # Subscriber loop already closed
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout=None):
+        """Wait for the next event; returns None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Thread-safe fan-out of published events to async subscribers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channels):
+        """Subscribe the running event loop to the given channels"""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, channel, payload=None):
+        """Publish an event to every subscriber of the channel; safe to call from any thread"""
+        with self._lock:
+            event = (next(self._ids), channel, payload or {})
+            subscribers = [s for s in self._subscriptions if channel in s.channels]
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event[0]
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+
+broker = EventBroker()
+
+
+def format_sse(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+SSE_KEEPALIVE = ': keepalive\n\n'
+
+
+def format_sse_retry(seconds):
+    """Tell EventSource how long to wait before reconnecting"""
+    return f'retry: {int(seconds * 1000)}\n\n'
+
+
+def is_asgi_request(request):
+    """True when the request is served by the ASGI handler, so responses can stream"""
+    return isinstance(request, ASGIRequest)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from core.datacopy import copy_database
+
+
+class Command(BaseCommand):
+    help = 'Copy all data from a SQLite file into the configured database (e.g. PostgreSQL), replacing its contents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'db.sqlite3'), help='SQLite file to copy from')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Target database alias')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Do not ask for confirmation')
+
+    def handle(self, *args, **options):
+        target = connections[options['database']]
+        self.stdout.write(f"Copying {options['source']} into {target.vendor} database '{target.settings_dict['NAME']}'")
+        if options['interactive']:
+            answer = input('All existing data in the target database will be replaced. Type "yes" to continue: ')
+            if answer != 'yes':
+                raise CommandError('Copy cancelled')
+
+        try:
+            counts = copy_database(
+                options['source'],
+                target=options['database'],
+                batch_size=options['batch_size'],
+                log=self.stdout.write if options['verbosity'] > 1 else None
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Copied {sum(counts.values())} rows from {len(counts)} tables, sequences reset'
+        ))
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from core.datacopy import SOURCE_ALIAS
+
+from ..models import Room, RoomType, MaintenanceTechnician
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The source snapshot is taken with SQLite VACUUM INTO')
+class CopySqliteDataTest(TransactionTestCase):
+    """copy_sqlite_data, run against the SQLite test database as the target"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='copy@hotel.com',
+            password='testpass123',
+            first_name='Copy',
+            last_name='User'
+        )
+        self.group = Group.objects.create(name='Front Desk')
+        self.user.groups.add(self.group)
+        self.room_type = RoomType.objects.create(
+            name='Deluxe Room',
+            description='Deluxe room',
+            base_price=1000000,
+            max_occupancy=2
+        )
+        self.room = Room.objects.create(number='101', room_type=self.room_type, floor=1)
+        self.technician = MaintenanceTechnician.objects.create(
+            name='Budi', specializations=['ELECTRICAL', 'PLUMBING']
+        )
+        # auto_now_add/auto_now values must survive the copy
+        self.created_at = timezone.now() - timedelta(days=400)
+        Room.objects.filter(id=self.room.id).update(created_at=self.created_at, updated_at=self.created_at)
+
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'source.sqlite3')
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM INTO %s', [self.source])
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def copy(self, **options):
+        out = StringIO()
+        # The command registers the source alias itself; allow it only while it exists
+        with patch.object(type(self), 'databases', {'default', SOURCE_ALIAS}):
+            call_command('copy_sqlite_data', source=self.source, interactive=False, stdout=out, **options)
+        return out.getvalue()
+
+    def test_copy_replaces_target_with_source_rows(self):
+        # Diverge the target from the snapshot; the copy must restore it exactly
+        Room.objects.all().delete()
+        MaintenanceTechnician.objects.create(name='Extra', specializations=[])
+
+        output = self.copy(batch_size=2)
+
+        self.assertIn('✓ Copied', output)
+        room = Room.objects.get(number='101')
+        self.assertEqual(room.id, self.room.id)
+        self.assertEqual(room.room_type_id, self.room_type.id)
+        self.assertEqual(room.created_at, self.created_at)
+        self.assertEqual(room.updated_at, self.created_at)
+        self.assertEqual(
+            list(MaintenanceTechnician.objects.values_list('name', 'specializations')),
+            [('Budi', ['ELECTRICAL', 'PLUMBING'])]
+        )
+        self.assertEqual(list(User.objects.get(id=self.user.id).groups.all()), [self.group])
+        self.assertTrue(User.objects.get(id=self.user.id).check_password('testpass123'))
+
+    def test_new_rows_get_ids_after_copied_rows(self):
+        self.copy()
+
+        room_type = RoomType.objects.create(name='Suite', description='Suite', base_price=2000000, max_occupancy=4)
+
+        self.assertGreater(room_type.id, self.room_type.id)
+
+    def test_missing_source_file(self):
+        with self.assertRaises(CommandError):
+            call_command('copy_sqlite_data', source=os.path.join(self.directory, 'missing.sqlite3'),
+                         interactive=False, stdout=StringIO())
@@ -0,0 +1,5 @@
+from django.db.backends.signals import connection_created
+
+from .sqlite import apply_pragmas
+
+connection_created.connect(apply_pragmas, dispatch_uid='core.sqlite.apply_pragmas')
@@ -0,0 +1,126 @@
+"""
+Copy an existing SQLite database into the configured database (PostgreSQL).
+
+    DB_ENGINE=postgres python manage.py migrate
+    DB_ENGINE=postgres python manage.py copy_sqlite_data --source db.sqlite3
+
+The SQLite file is opened as an extra connection alias and every managed model
+(including auto-created many-to-many tables) is read in primary key order and
+inserted in batches. Rows are inserted raw, like loaddata: no signals, and
+auto_now/auto_now_add timestamps keep their original values.
+
+Everything runs in one transaction on the target. Django creates foreign keys
+DEFERRABLE INITIALLY DEFERRED, so tables can be filled in any order and
+constraints are checked at commit. Afterwards the target's sequences are reset
+past the copied ids, otherwise the next insert would collide with a copied row.
+"""
+import os
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+def copyable_models(target='default'):
+    """Models with a table of their own on the target, m2m through tables included"""
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy and router.allow_migrate_model(target, model)
+    ]
+
+
+def _open_source(path):
+    connections.settings[SOURCE_ALIAS] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path},
+    })[DEFAULT_DB_ALIAS]
+    return connections[SOURCE_ALIAS]
+
+
+def _close_source():
+    if SOURCE_ALIAS in connections.settings:
+        connections[SOURCE_ALIAS].close()
+        del connections[SOURCE_ALIAS]
+        del connections.settings[SOURCE_ALIAS]
+
+
+def _check_source_schema(source, models):
+    """Models whose table is missing in the SQLite file; raises if a table lacks columns"""
+    tables = set(source.introspection.table_names())
+    missing = []
+    with source.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            if table not in tables:
+                missing.append(model)
+                continue
+            columns = {column.name for column in source.introspection.get_table_description(cursor, table)}
+            absent = [field.column for field in model._meta.local_concrete_fields if field.column not in columns]
+            if absent:
+                raise ValueError(
+                    f"{table} in the SQLite file has no column(s) {', '.join(absent)}; "
+                    f"run migrate against it before copying"
+                )
+    return missing
+
+
+def _copy_model(model, target, batch_size):
+    fields = model._meta.local_concrete_fields
+    manager = model._base_manager
+    size = max(1, connections[target].ops.bulk_batch_size(fields, [None] * batch_size) or batch_size)
+    size = min(size, batch_size)
+
+    copied = 0
+    batch = []
+    for obj in manager.using(SOURCE_ALIAS).order_by('pk').iterator(chunk_size=size):
+        batch.append(obj)
+        if len(batch) >= size:
+            manager.using(target)._insert(batch, fields=fields, using=target, raw=True)
+            copied += len(batch)
+            batch = []
+    if batch:
+        manager.using(target)._insert(batch, fields=fields, using=target, raw=True)
+        copied += len(batch)
+    return copied
+
+
+def copy_database(source_path, target='default', batch_size=1000, log=None):
+    """
+    Replace the contents of `target` with the data in the SQLite file at source_path
+    The target schema must already be migrated. Returns: {model label: rows copied}
+    """
+    log = log or (lambda message: None)
+    source_path = os.path.abspath(source_path)
+    if not os.path.isfile(source_path):
+        raise ValueError(f'SQLite file not found: {source_path}')
+    target_connection = connections[target]
+    if target_connection.vendor == 'sqlite' and os.path.abspath(str(target_connection.settings_dict['NAME'])) == source_path:
+        raise ValueError('The source file is the target database')
+
+    models = copyable_models(target)
+    source = _open_source(source_path)
+    try:
+        for model in _check_source_schema(source, models):
+            log(f'Skipping {model._meta.label}: no {model._meta.db_table} table in the SQLite file')
+            models.remove(model)
+
+        counts = {}
+        with transaction.atomic(using=target):
+            # migrate already inserted content types and permissions; replace them
+            # with the source rows so their ids match the copied foreign keys
+            target_connection.ops.execute_sql_flush(target_connection.ops.sql_flush(
+                no_style(), [model._meta.db_table for model in models], allow_cascade=True
+            ))
+            for model in models:
+                counts[model._meta.label] = _copy_model(model, target, batch_size)
+                log(f'{model._meta.label}: {counts[model._meta.label]} rows')
+
+            statements = target_connection.ops.sequence_reset_sql(no_style(), models)
+            if statements:
+                with target_connection.cursor() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+        return counts
+    finally:
+        _close_source()
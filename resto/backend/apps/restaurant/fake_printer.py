@@ -0,0 +1,92 @@
+"""
+Fake ESC/POS Network Printer
+A local TCP server that accepts raw print jobs the way a thermal printer does
+on port 9100, for tests and for trying the printing path without hardware
+"""
+import socketserver
+import threading
+
+from .services.escpos import FEED_AND_CUT
+
+
+class _PrinterHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.add(self.request)
+        try:
+            while True:
+                chunk = self.request.recv(4096)
+                if not chunk:
+                    break
+                with server.lock:
+                    server.received.extend(chunk)
+                    server.changed.notify_all()
+        except OSError:
+            pass
+        finally:
+            with server.lock:
+                server.sockets.discard(self.request)
+
+
+class FakePrinterServer(socketserver.ThreadingTCPServer):
+    """Collects everything sent to it; use as a context manager"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _PrinterHandler)
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.received = bytearray()
+        self.sockets = set()
+        self.connections = 0
+        self._thread = None
+
+    @property
+    def address(self):
+        return self.server_address[0]
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
+
+    def drop_connections(self):
+        """Close every open client connection, like a printer power cycle"""
+        with self.lock:
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+                sock.close()
+            except OSError:
+                pass
+
+    def tickets(self):
+        """Received data split into tickets at each paper cut"""
+        with self.lock:
+            data = bytes(self.received)
+        return [part + FEED_AND_CUT for part in data.split(FEED_AND_CUT)[:-1]]
+
+    def wait_for_tickets(self, count, timeout=5):
+        """Block until at least `count` cut tickets arrived; returns them"""
+        with self.lock:
+            self.changed.wait_for(lambda: self.received.count(FEED_AND_CUT) >= count, timeout)
+        return self.tickets()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
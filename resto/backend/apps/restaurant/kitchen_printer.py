@@ -18,14 +18,16 @@ class KitchenTicketPDF:
     TICKET_WIDTH = 80 * mm
     TICKET_HEIGHT = 297 * mm  # A4 height, will auto-size based on content
     
-    def __init__(self, order, station='KITCHEN'):
+    def __init__(self, order, station='KITCHEN', items=None):
         """
         Initialize ticket generator
         :param order: Order model instance
         :param station: 'KITCHEN' or 'BAR'
+        :param items: the station's order items, if already partitioned
         """
         self.order = order
         self.station = station
+        self.items = items
         self.filename = self._generate_filename()
         self.filepath = self._get_filepath()
         
@@ -43,28 +45,11 @@ class KitchenTicketPDF:
         return os.path.join(media_path, self.filename)
     
     def _filter_items_by_station(self):
-        """Filter order items based on station (kitchen or bar)"""
-        items = []
-        for item in self.order.items.all():
-            product = item.product
-            category_name = product.category.name.lower() if product.category else ''
-
-            # Kitchen gets: Food items (nasi, sup, pembuka, pencuci mulut, sarapan, jajanan)
-            # Bar gets: Beverage items (minuman)
-            if self.station == 'KITCHEN':
-                # Indonesian categories for food
-                kitchen_keywords = ['nasi', 'makanan', 'sup', 'berkuah', 'pembuka', 'camilan',
-                                   'pencuci mulut', 'sarapan', 'jajanan', 'utama', 'food',
-                                   'appetizer', 'dessert', 'main']
-                if any(keyword in category_name for keyword in kitchen_keywords):
-                    items.append(item)
-            elif self.station == 'BAR':
-                # Indonesian categories for beverages
-                beverage_keywords = ['minuman', 'beverage', 'drink', 'es', 'jus', 'kopi', 'teh']
-                if any(keyword in category_name for keyword in beverage_keywords):
-                    items.append(item)
-
-        return items
+        """Filter order items based on station (kitchen or bar) using the category station routing"""
+        if self.items is not None:
+            return self.items
+        kitchen_items, bar_items = self.order.partition_items_by_station()
+        return bar_items if self.station == 'BAR' else kitchen_items
     
     def generate(self):
         """Generate the PDF ticket"""
@@ -203,6 +188,17 @@ class KitchenTicketPDF:
         return self.filepath
 
 
+def render_order_tickets(order):
+    """
+    Render the kitchen and bar tickets of an order from a single station partition
+    Returns (kitchen_path, bar_path), None for a station without items; errors propagate
+    """
+    kitchen_items, bar_items = order.partition_items_by_station()
+    kitchen_path = KitchenTicketPDF(order, station='KITCHEN', items=kitchen_items).generate()
+    bar_path = KitchenTicketPDF(order, station='BAR', items=bar_items).generate()
+    return kitchen_path, bar_path
+
+
 def generate_kitchen_bar_tickets(order):
     """
     Generate kitchen and/or bar tickets for an order
@@ -216,17 +212,9 @@ def generate_kitchen_bar_tickets(order):
     }
     
     try:
-        # Generate kitchen ticket
-        kitchen_ticket = KitchenTicketPDF(order, station='KITCHEN')
-        kitchen_path = kitchen_ticket.generate()
-        if kitchen_path:
-            results['kitchen_pdf'] = kitchen_path
-        
-        # Generate bar ticket
-        bar_ticket = KitchenTicketPDF(order, station='BAR')
-        bar_path = bar_ticket.generate()
-        if bar_path:
-            results['bar_pdf'] = bar_path
+        kitchen_path, bar_path = render_order_tickets(order)
+        results['kitchen_pdf'] = kitchen_path
+        results['bar_pdf'] = bar_path
         
         if kitchen_path or bar_path:
             results['success'] = True
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.restaurant.models import Order
+from apps.restaurant.services.order_totals import recalculate_order_totals
+
+
+class Command(BaseCommand):
+    help = 'Backfill stored order totals (subtotal, discount, tax, grand total) from order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Orders recalculated per batch')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        order_ids = list(Order.objects.order_by('id').values_list('id', flat=True))
+
+        self.stdout.write(self.style.WARNING(f'Recalculating totals for {len(order_ids)} orders...'))
+
+        updated = 0
+        for start in range(0, len(order_ids), batch_size):
+            updated += len(recalculate_order_totals(order_ids[start:start + batch_size]))
+            self.stdout.write(f'  {updated}/{len(order_ids)}')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Backfill complete! Updated {updated} orders'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+import time
+from apps.restaurant.fake_printer import FakePrinterServer
+
+
+class Command(BaseCommand):
+    help = 'Run a fake ESC/POS network printer that prints received tickets to the console'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+        parser.add_argument('--port', type=int, default=9100, help='Port to listen on (printers use 9100)')
+
+    def handle(self, *args, **options):
+        with FakePrinterServer(options['host'], options['port']) as printer:
+            self.stdout.write(self.style.SUCCESS(f'Fake printer listening on {printer.address}:{printer.port}'))
+            self.stdout.write('Press Ctrl+C to stop\n')
+            printed = 0
+            try:
+                while True:
+                    tickets = printer.wait_for_tickets(printed + 1, timeout=1)
+                    for ticket in tickets[printed:]:
+                        text = bytes(b for b in ticket if b >= 0x20 or b == 0x0a)
+                        self.stdout.write(text.decode('cp437', errors='replace'))
+                        self.stdout.write(self.style.WARNING('-' * 16 + ' cut ' + '-' * 19))
+                    printed = len(tickets)
+            except KeyboardInterrupt:
+                self.stdout.write('\n' + self.style.SUCCESS('Fake printer stopped'))
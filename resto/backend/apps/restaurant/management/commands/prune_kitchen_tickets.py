@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import timedelta
+from django.utils import timezone
+from apps.restaurant.services.ticket_catalog import archive_tickets, index_existing_files
+
+
+class Command(BaseCommand):
+    help = 'Archive kitchen/bar ticket PDFs older than the retention period into per-day tarballs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep PDFs of the last N days unarchived')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived without changing anything')
+        parser.add_argument(
+            '--index-existing',
+            action='store_true',
+            help='First catalog PDFs already on disk that were rendered before the ticket catalog existed'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        if options['index_existing']:
+            indexed = index_existing_files()
+            self.stdout.write(self.style.SUCCESS(f'✓ Cataloged {indexed} existing ticket PDFs'))
+
+        # Archive whole local days only
+        cutoff = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=options['days'] - 1)
+        self.stdout.write(self.style.WARNING(f'Archiving tickets created before {cutoff:%Y-%m-%d}...'))
+        stats = archive_tickets(cutoff, dry_run=options['dry_run'])
+
+        prefix = 'Would archive' if options['dry_run'] else '✓ Archived'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['files']} PDFs into {stats['archives']} tarballs "
+            f"({stats['missing']} already missing from disk)"
+        ))
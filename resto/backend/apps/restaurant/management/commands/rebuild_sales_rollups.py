@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.restaurant.services.sales_rollup import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily sales rollups (per branch and per product) used by the sales reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First order date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last order date to rebuild (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--days', type=int, default=365, help='Without --start, rebuild this many days ending at --end')
+        parser.add_argument('--branch', type=int, help='Only rebuild this branch ID')
+
+    def _parse(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        end_date = self._parse(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start_date = self._parse(options['start'])
+        else:
+            start_date = end_date - timedelta(days=max(options['days'], 1) - 1)
+
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        self.stdout.write(self.style.WARNING(f'Rebuilding sales rollups {start_date} to {end_date}...'))
+        sales, products = rebuild_sales_rollups(start_date, end_date, options['branch'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {sales} daily sales rows and {products} product rows'))
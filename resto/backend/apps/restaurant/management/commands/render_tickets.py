@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+import time
+from apps.restaurant.services.ticket_rendering import process_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run the background worker that renders queued kitchen and bar PDF tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per poll')
+        parser.add_argument('--once', action='store_true', help='Process the due jobs once and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.report(process_jobs(options['batch_size']))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Ticket render worker running'))
+        self.stdout.write('Press Ctrl+C to stop\n')
+        try:
+            while True:
+                jobs = process_jobs(options['batch_size'])
+                self.report(jobs)
+                if not jobs:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('\n' + self.style.SUCCESS('Ticket render worker stopped'))
+
+    def report(self, jobs):
+        for job in jobs:
+            if job.status == 'DONE':
+                self.stdout.write(self.style.SUCCESS(f'✓ Rendered tickets for job {job.id}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'Job {job.id} {job.status.lower()}: {job.last_error}'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:56
+
+import re
+
+from django.db import migrations, models
+
+
+FOOD_KEYWORDS = ['nasi', 'makanan', 'sup', 'berkuah', 'pembuka', 'camilan',
+                 'pencuci mulut', 'sarapan', 'jajanan', 'utama', 'food',
+                 'appetizer', 'dessert', 'main']
+BEVERAGE_KEYWORDS = ['minuman', 'beverage', 'drink', 'jus', 'kopi',
+                     'juice', 'coffee']
+BEVERAGE_WORDS = ['es', 'teh', 'tea']
+
+
+def set_category_stations(apps, schema_editor):
+    """
+    Route existing categories from their names, like Category.save() does for new ones
+    Names matching no keyword go to KITCHEN (they used to get no kitchen or bar order)
+    """
+    Category = apps.get_model('restaurant', 'Category')
+    for category in Category.objects.all():
+        name = category.name.lower()
+        words = re.findall(r'\w+', name)
+        is_food = any(keyword in name for keyword in FOOD_KEYWORDS)
+        is_beverage = (
+            any(keyword in name for keyword in BEVERAGE_KEYWORDS)
+            or any(word in words for word in BEVERAGE_WORDS)
+        )
+        if is_beverage and is_food:
+            category.station = 'BOTH'
+        elif is_beverage:
+            category.station = 'BAR'
+        else:
+            category.station = 'KITCHEN'
+        category.save(update_fields=['station'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0029_order_is_split_bill_order_merged_from_tables_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='station',
+            field=models.CharField(blank=True, choices=[('KITCHEN', 'Kitchen'), ('BAR', 'Bar'), ('BOTH', 'Kitchen & Bar')], help_text='Station that prepares items of this category (inferred from the name when left blank)', max_length=10),
+        ),
+        migrations.RunPython(set_category_stations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0030_category_station'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductAvailability',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='availability', serialize=False, to='restaurant.product')),
+                ('max_servings', models.IntegerField(blank=True, help_text='Servings makeable from current stock (null = no recipe, unlimited)', null=True)),
+                ('insufficient_ingredients', models.JSONField(blank=True, default=list, help_text='Ingredients short for a single serving')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Availability',
+                'verbose_name_plural': 'Product Availability',
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:09
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, Sum
+
+
+CENT = Decimal('0.01')
+BATCH_SIZE = 1000
+TOTAL_FIELDS = ['subtotal', 'discount_total', 'tax_total', 'grand_total']
+
+
+def backfill_order_totals(apps, schema_editor):
+    """
+    Fill the new columns from the existing items, batch by batch, the way
+    services.order_totals.recalculate_order_totals() does for live orders
+    """
+    Order = apps.get_model('restaurant', 'Order')
+    OrderItem = apps.get_model('restaurant', 'OrderItem')
+    order_ids = list(Order.objects.order_by('id').values_list('id', flat=True))
+
+    for start in range(0, len(order_ids), BATCH_SIZE):
+        batch = order_ids[start:start + BATCH_SIZE]
+        item_totals = {
+            row['order_id']: row
+            for row in OrderItem.objects.filter(order_id__in=batch).values('order_id').annotate(
+                subtotal=Sum(F('unit_price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+                discount_total=Sum('discount_amount')
+            ).order_by()
+        }
+        orders = []
+        for order_id, tax_rate in Order.objects.filter(id__in=batch).values_list(
+            'id', 'branch__restaurant__settings__tax_rate'
+        ):
+            row = item_totals.get(order_id, {})
+            subtotal = Decimal(row.get('subtotal') or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+            discount_total = Decimal(row.get('discount_total') or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+            tax_total = ((subtotal - discount_total) * Decimal(tax_rate or 0) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+            orders.append(Order(
+                id=order_id,
+                subtotal=subtotal,
+                discount_total=discount_total,
+                tax_total=tax_total,
+                grand_total=subtotal - discount_total + tax_total
+            ))
+        Order.objects.bulk_update(orders, TOTAL_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0031_productavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discount_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of item discounts', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='grand_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Subtotal - discounts + tax', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of unit price x quantity over items', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='tax_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Tax on the discounted subtotal at the restaurant tax rate', max_digits=12),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sales_rollups(apps, schema_editor):
+    """
+    Roll up every existing paid order (COMPLETED with a COMPLETED payment), the way
+    services.sales_rollup.rebuild_sales_rollups() does for a date range
+    """
+    Order = apps.get_model('restaurant', 'Order')
+    OrderItem = apps.get_model('restaurant', 'OrderItem')
+    Payment = apps.get_model('restaurant', 'Payment')
+    DailySalesRollup = apps.get_model('restaurant', 'DailySalesRollup')
+    DailyProductSalesRollup = apps.get_model('restaurant', 'DailyProductSalesRollup')
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    orders = Order.objects.filter(status='COMPLETED').filter(
+        Exists(Payment.objects.filter(order_id=OuterRef('pk'), status='COMPLETED'))
+    )
+    order_rows = orders.annotate(day=TruncDate('created_at')).values('branch_id', 'day').annotate(
+        revenue=Sum(F('subtotal') - F('discount_total'), output_field=money),
+        orders_count=Count('id'),
+        tables_served=Count('table', distinct=True)
+    ).order_by()
+    product_rows = OrderItem.objects.filter(order__in=orders).annotate(
+        day=TruncDate('order__created_at')
+    ).values('order__branch_id', 'day', 'product_id').annotate(
+        quantity_sold=Sum('quantity'),
+        revenue=Sum(F('quantity') * F('unit_price'), output_field=money)
+    ).order_by()
+
+    DailySalesRollup.objects.bulk_create([
+        DailySalesRollup(
+            branch_id=row['branch_id'],
+            date=row['day'],
+            revenue=row['revenue'] or 0,
+            orders_count=row['orders_count'],
+            tables_served=row['tables_served']
+        )
+        for row in order_rows
+    ], batch_size=1000)
+    DailyProductSalesRollup.objects.bulk_create([
+        DailyProductSalesRollup(
+            branch_id=row['order__branch_id'],
+            date=row['day'],
+            product_id=row['product_id'],
+            quantity_sold=row['quantity_sold'] or 0,
+            revenue=row['revenue'] or 0
+        )
+        for row in product_rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0032_order_stored_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Unit price x quantity', max_digits=14)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_sales_rollups', to='restaurant.branch')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='restaurant.product')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('branch', 'date', 'product')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Order totals after discounts, before tax', max_digits=14)),
+                ('orders_count', models.IntegerField(default=0)),
+                ('tables_served', models.IntegerField(default=0, help_text='Distinct tables with a paid order')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='restaurant.branch')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('branch', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_sales_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0034_ticket_render_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KitchenTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True)),
+                ('station', models.CharField(choices=[('KITCHEN', 'Kitchen'), ('BAR', 'Bar')], max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('archived_at', models.DateTimeField(blank=True, null=True)),
+                ('archive_name', models.CharField(blank=True, help_text='Tarball holding the PDF once archived', max_length=255)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kitchen_tickets', to='restaurant.branch')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tickets', to='restaurant.order')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['station', 'created_at'], name='restaurant__station_bd5c0c_idx'), models.Index(fields=['branch', 'station', 'created_at'], name='restaurant__branch__0a99af_idx'), models.Index(fields=['archived_at', 'created_at'], name='restaurant__archive_7d3d9e_idx')],
+            },
+        ),
+    ]
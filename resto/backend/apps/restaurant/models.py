@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
+import re
 import uuid
 from datetime import date
 
@@ -81,15 +82,62 @@ class Staff(models.Model):
         ordering = ['branch', 'user__email']
 
 
+class StationRouting(models.TextChoices):
+    KITCHEN = 'KITCHEN', 'Kitchen'
+    BAR = 'BAR', 'Bar'
+    BOTH = 'BOTH', 'Kitchen & Bar'
+
+
+# Category name keywords used to pick a default station for new categories
+FOOD_KEYWORDS = ['nasi', 'makanan', 'sup', 'berkuah', 'pembuka', 'camilan',
+                 'pencuci mulut', 'sarapan', 'jajanan', 'utama', 'food',
+                 'appetizer', 'dessert', 'main']
+BEVERAGE_KEYWORDS = ['minuman', 'beverage', 'drink', 'jus', 'kopi',
+                     'juice', 'coffee']
+# Short keywords that only count as a whole word ("Es Campur" and "Teh Tarik",
+# not "Dessert" or "Steak")
+BEVERAGE_WORDS = ['es', 'teh', 'tea']
+
+
+def infer_station(category_name):
+    """
+    Default station for a category name: BAR for drinks, BOTH for mixed, otherwise KITCHEN
+    Names matching no keyword go to the kitchen, so their items get a kitchen ticket
+    """
+    name = (category_name or '').lower()
+    words = re.findall(r'\w+', name)
+    is_food = any(keyword in name for keyword in FOOD_KEYWORDS)
+    is_beverage = (
+        any(keyword in name for keyword in BEVERAGE_KEYWORDS)
+        or any(word in words for word in BEVERAGE_WORDS)
+    )
+    if is_beverage and is_food:
+        return StationRouting.BOTH
+    if is_beverage:
+        return StationRouting.BAR
+    return StationRouting.KITCHEN
+
+
 class Category(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='categories')
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     display_order = models.IntegerField(default=0)
+    station = models.CharField(
+        max_length=10,
+        choices=StationRouting.choices,
+        blank=True,
+        help_text='Station that prepares items of this category (inferred from the name when left blank)'
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        if not self.station:
+            self.station = infer_station(self.name)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.restaurant.name} - {self.name}"
 
@@ -400,6 +448,10 @@ class InventoryTransaction(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Expense reports: IN/ADJUST movements over a period
+            models.Index(fields=['transaction_type', 'created_at']),
+        ]
 
 
 class BatchStatus(models.TextChoices):
@@ -622,6 +674,28 @@ class RecipeIngredient(models.Model):
         unique_together = ['recipe', 'inventory_item']
 
 
+class ProductAvailability(models.Model):
+    """
+    Servings of a product makeable from current stock, maintained incrementally
+    whenever one of its ingredients' stock or its recipe changes
+    """
+    product = models.OneToOneField('Product', on_delete=models.CASCADE, primary_key=True, related_name='availability')
+    max_servings = models.IntegerField(null=True, blank=True, help_text="Servings makeable from current stock (null = no recipe, unlimited)")
+    insufficient_ingredients = models.JSONField(default=list, blank=True, help_text="Ingredients short for a single serving")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def can_be_made(self):
+        return self.max_servings is None or self.max_servings > 0
+
+    def __str__(self):
+        return f"{self.product.name}: {self.max_servings if self.max_servings is not None else 'unlimited'}"
+
+    class Meta:
+        verbose_name = "Product Availability"
+        verbose_name_plural = "Product Availability"
+
+
 class Table(models.Model):
     branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='tables')
     number = models.CharField(max_length=10)
@@ -680,6 +754,12 @@ class Order(models.Model):
     # Merged tables field
     merged_from_tables = models.JSONField(default=list, blank=True, help_text='List of table IDs that were merged into this table')
 
+    # Stored totals, maintained from the items by the OrderItem signals
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Sum of unit price x quantity over items')
+    discount_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Sum of item discounts')
+    tax_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Tax on the discounted subtotal at the restaurant tax rate')
+    grand_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Subtotal - discounts + tax')
+
     # Staff tracking - who handled this order at each stage
     order_taken_by = models.ForeignKey(
         'Staff',
@@ -725,6 +805,11 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Written by recalculate_order_totals() only. An instance loaded before its
+    # items changed holds stale totals: refresh_from_db(fields=TOTAL_FIELDS)
+    # before saving it, or save it with explicit update_fields
+    TOTAL_FIELDS = ['subtotal', 'discount_total', 'tax_total', 'grand_total']
+
     def save(self, *args, **kwargs):
         if not self.order_number:
             self.order_number = f"ORD{timezone.now().strftime('%Y%m%d')}{uuid.uuid4().hex[:6].upper()}"
@@ -732,129 +817,87 @@ class Order(models.Model):
 
     @property
     def total_amount(self):
-        return sum(item.subtotal for item in self.items.all())
+        """Item total after discounts, before tax"""
+        return self.subtotal - self.discount_total
+
+    def recalculate_totals(self):
+        """Recompute the stored totals from the items and refresh them on this instance"""
+        from .services.order_totals import recalculate_order_totals
+
+        totals = recalculate_order_totals([self.pk]).get(self.pk)
+        if totals:
+            for field, value in totals.items():
+                setattr(self, field, value)
 
     def deduct_inventory(self):
         """
         Deduct inventory based on recipes when order is confirmed/preparing.
+        All ingredients are deducted together or not at all.
         Returns (success: bool, message: str)
         """
-        from decimal import Decimal
+        from .services.inventory_deduction import InsufficientStockError, deduct_order_ingredients
 
         if self.status not in ['CONFIRMED', 'PREPARING']:
             return False, "Order must be CONFIRMED or PREPARING to deduct inventory"
 
-        deductions = []
-        errors = []
+        try:
+            transactions, missing_recipes = deduct_order_ingredients(
+                self,
+                performed_by=self.created_by.user if self.created_by else None
+            )
+        except InsufficientStockError as e:
+            return False, str(e)
+
+        if missing_recipes:
+            return False, "; ".join(f"No active recipe found for {name}" for name in missing_recipes)
 
-        for order_item in self.items.all():
-            try:
-                # Get recipe for this product
-                recipe = Recipe.objects.filter(product=order_item.product, is_active=True).first()
-
-                if not recipe:
-                    errors.append(f"No active recipe found for {order_item.product.name}")
-                    continue
-
-                # Deduct each ingredient
-                for ingredient in recipe.ingredients.all():
-                    required_qty = Decimal(str(ingredient.quantity)) * order_item.quantity
-                    inventory_item = ingredient.inventory_item
-
-                    # Check sufficient stock
-                    if inventory_item.quantity < required_qty:
-                        errors.append(
-                            f"Insufficient stock for {inventory_item.name} in {inventory_item.location}: "
-                            f"need {required_qty} {inventory_item.unit}, have {inventory_item.quantity}"
-                        )
-                        continue
-
-                    # Deduct inventory
-                    inventory_item.quantity -= required_qty
-                    inventory_item.save()
-
-                    # Create transaction record
-                    InventoryTransaction.objects.create(
-                        inventory=inventory_item,
-                        transaction_type='USAGE',
-                        quantity=-required_qty,
-                        unit_cost=inventory_item.cost_per_unit,
-                        reference_number=self.order_number,
-                        performed_by=self.created_by.user if self.created_by else None,
-                        notes=f"Used for Order {self.order_number} - {order_item.product.name} x{order_item.quantity}"
-                    )
-
-                    deductions.append(
-                        f"{inventory_item.name} ({inventory_item.location}): -{required_qty} {inventory_item.unit}"
-                    )
-
-            except Exception as e:
-                errors.append(f"Error processing {order_item.product.name}: {str(e)}")
-
-        if errors:
-            return False, "; ".join(errors)
-
-        return True, f"Deducted {len(deductions)} ingredients"
+        return True, f"Deducted {len(transactions)} ingredients"
+
+    def partition_items_by_station(self):
+        """
+        Split order items into (kitchen_items, bar_items) in one pass using each
+        item's category station; BOTH goes to both lists, uncategorized items to neither
+        """
+        from .services.station_routing import get_category_station
+
+        items = self.items.all()
+        if 'items' not in getattr(self, '_prefetched_objects_cache', {}):
+            items = items.select_related('product')
+
+        kitchen_items = []
+        bar_items = []
+        for item in items:
+            station = get_category_station(item.product.category_id)
+            if station in (StationRouting.KITCHEN, StationRouting.BOTH):
+                kitchen_items.append(item)
+            if station in (StationRouting.BAR, StationRouting.BOTH):
+                bar_items.append(item)
+        return kitchen_items, bar_items
 
     def has_food_items(self):
         """Check if order contains any food items (for kitchen)"""
-        food_keywords = ['nasi', 'makanan', 'sup', 'berkuah', 'pembuka', 'camilan',
-                        'pencuci mulut', 'sarapan', 'jajanan', 'utama', 'food',
-                        'appetizer', 'dessert', 'main']
-
-        for item in self.items.all():
-            if item.product.category:
-                category_name = item.product.category.name.lower()
-                if any(keyword in category_name for keyword in food_keywords):
-                    return True
-        return False
+        return bool(self.partition_items_by_station()[0])
 
     def has_beverage_items(self):
         """Check if order contains any beverage items (for bar)"""
-        beverage_keywords = ['minuman', 'beverage', 'drink', 'es', 'jus',
-                            'kopi', 'teh', 'juice', 'coffee', 'tea']
-
-        for item in self.items.all():
-            if item.product.category:
-                category_name = item.product.category.name.lower()
-                if any(keyword in category_name for keyword in beverage_keywords):
-                    return True
-        return False
+        return bool(self.partition_items_by_station()[1])
 
     def get_food_items(self):
         """Get all food items in this order"""
-        food_keywords = ['nasi', 'makanan', 'sup', 'berkuah', 'pembuka', 'camilan',
-                        'pencuci mulut', 'sarapan', 'jajanan', 'utama', 'food',
-                        'appetizer', 'dessert', 'main']
-
-        food_items = []
-        for item in self.items.all():
-            if item.product.category:
-                category_name = item.product.category.name.lower()
-                if any(keyword in category_name for keyword in food_keywords):
-                    food_items.append(item)
-        return food_items
+        return self.partition_items_by_station()[0]
 
     def get_beverage_items(self):
         """Get all beverage items in this order"""
-        beverage_keywords = ['minuman', 'beverage', 'drink', 'es', 'jus',
-                            'kopi', 'teh', 'juice', 'coffee', 'tea']
-
-        beverage_items = []
-        for item in self.items.all():
-            if item.product.category:
-                category_name = item.product.category.name.lower()
-                if any(keyword in category_name for keyword in beverage_keywords):
-                    beverage_items.append(item)
-        return beverage_items
+        return self.partition_items_by_station()[1]
 
     def update_order_status(self):
         """
         Update order status based on kitchen and bar order statuses.
         Order is only READY when both kitchen and bar (if applicable) are READY.
         """
-        has_kitchen = self.has_food_items()
-        has_bar = self.has_beverage_items()
+        kitchen_items, bar_items = self.partition_items_by_station()
+        has_kitchen = bool(kitchen_items)
+        has_bar = bool(bar_items)
 
         # Check kitchen status
         kitchen_ready = True
@@ -887,6 +930,11 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Dashboard and sales reports: one branch's orders for a day, paid orders per period
+            models.Index(fields=['branch', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
 
 
 class OrderItem(models.Model):
@@ -995,6 +1043,11 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # "Has a completed payment" checks per order, and completed payments per day
+            models.Index(fields=['order', 'status']),
+            models.Index(fields=['status', 'created_at']),
+        ]
 
 
 class KitchenOrder(models.Model):
@@ -1091,6 +1144,68 @@ class BarOrderItem(models.Model):
         ordering = ['bar_order', 'product']
 
 
+class TicketRenderJob(models.Model):
+    """Background job rendering the kitchen and bar PDF tickets of an order"""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='ticket_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text='Earliest time the job may (re)run')
+    last_error = models.TextField(blank=True)
+    kitchen_pdf = models.CharField(max_length=255, blank=True)
+    bar_pdf = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Ticket job {self.id} for {self.order.order_number} - {self.status}"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+
+class KitchenTicket(models.Model):
+    """Catalog entry for a rendered kitchen/bar ticket PDF"""
+    STATION_CHOICES = [
+        ('KITCHEN', 'Kitchen'),
+        ('BAR', 'Bar'),
+    ]
+
+    filename = models.CharField(max_length=255, unique=True)
+    station = models.CharField(max_length=10, choices=STATION_CHOICES)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='tickets')
+    branch = models.ForeignKey(Branch, on_delete=models.SET_NULL, null=True, blank=True, related_name='kitchen_tickets')
+    created_at = models.DateTimeField(default=timezone.now)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    archive_name = models.CharField(max_length=255, blank=True, help_text='Tarball holding the PDF once archived')
+
+    @property
+    def folder(self):
+        return 'kitchen_orders' if self.station == 'KITCHEN' else 'bar_orders'
+
+    def __str__(self):
+        return self.filename
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['station', 'created_at']),
+            models.Index(fields=['branch', 'station', 'created_at']),
+            models.Index(fields=['archived_at', 'created_at']),
+        ]
+
+
 class Promotion(models.Model):
     DISCOUNT_TYPES = [
         ('PERCENTAGE', 'Percentage'),
@@ -1473,6 +1588,42 @@ class Report(models.Model):
         ordering = ['-created_at']
 
 
+class DailySalesRollup(models.Model):
+    """
+    Paid sales per branch and day (order date), kept current by payment/order signals
+    and rebuilt on demand with the rebuild_sales_rollups command
+    """
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='sales_rollups')
+    date = models.DateField(db_index=True)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Order totals after discounts, before tax')
+    orders_count = models.IntegerField(default=0)
+    tables_served = models.IntegerField(default=0, help_text='Distinct tables with a paid order')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.branch.name} {self.date}: {self.revenue}"
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['branch', 'date']
+
+
+class DailyProductSalesRollup(models.Model):
+    """Paid quantity and revenue per branch, day and product"""
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='product_sales_rollups')
+    date = models.DateField(db_index=True)
+    product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='sales_rollups')
+    quantity_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Unit price x quantity')
+
+    def __str__(self):
+        return f"{self.product.name} {self.date}: {self.quantity_sold}"
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['branch', 'date', 'product']
+
+
 class PurchaseOrderStatus(models.TextChoices):
     DRAFT = 'DRAFT', 'Draft'
     SUBMITTED = 'SUBMITTED', 'Submitted'
@@ -7,8 +7,8 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Avg, Count, F, Q, DecimalField, OuterRef, Subquery
-from django.db.models.functions import TruncDate, Coalesce
+from django.db.models import Sum, F, Q, DecimalField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.http import HttpResponse
 from datetime import timedelta, datetime
@@ -28,7 +28,9 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
-from .models import Order, OrderItem, Payment, Product, InventoryTransaction, CashierSession
+from .models import (
+    Product, InventoryTransaction, CashierSession, DailySalesRollup, DailyProductSalesRollup
+)
 from .permissions import IsManagerOrAdmin
 
 
@@ -40,29 +42,31 @@ class ReportViewSet(viewsets.ViewSet):
     """
     permission_classes = [IsAuthenticated]
 
-    def get_order_total_sum(self):
+    def get_sales_rollups(self, start_date, end_date, branch_id=None):
         """
-        Returns a Sum expression for calculating order totals from items
-        Use this in aggregate() calls directly to avoid nested aggregation issues
+        Daily sales rollup rows for a date range (paid, completed orders)
         """
-        return Coalesce(
-            Sum(
-                F('items__unit_price') * F('items__quantity') - F('items__discount_amount'),
-                output_field=DecimalField()
-            ),
-            Decimal('0')
-        )
+        rollups = DailySalesRollup.objects.filter(date__range=[start_date, end_date])
+        if branch_id and branch_id != 'all':
+            rollups = rollups.filter(branch_id=branch_id)
+        return rollups
+
+    def get_product_rollups(self, start_date, end_date, branch_id=None):
+        """
+        Daily per-product sales rollup rows for a date range
+        """
+        rollups = DailyProductSalesRollup.objects.filter(date__range=[start_date, end_date])
+        if branch_id and branch_id != 'all':
+            rollups = rollups.filter(branch_id=branch_id)
+        return rollups
 
-    def get_order_total_avg(self):
+    def summarize_rollups(self, rollups):
         """
-        Returns an Avg expression for calculating average order value from items
+        Total revenue and order count over rollup rows
         """
-        return Coalesce(
-            Avg(
-                F('items__unit_price') * F('items__quantity') - F('items__discount_amount'),
-                output_field=DecimalField()
-            ),
-            Decimal('0')
+        return rollups.aggregate(
+            total_revenue=Coalesce(Sum('revenue'), Decimal('0')),
+            total_orders=Coalesce(Sum('orders_count'), 0)
         )
 
     def get_date_range(self, period, start_date=None, end_date=None):
@@ -120,6 +124,20 @@ class ReportViewSet(viewsets.ViewSet):
         prev_start = prev_end - timedelta(days=period_length - 1)
         return prev_start, prev_end
 
+    def get_datetime_bounds(self, start_date, end_date):
+        """
+        Aware datetimes bounding whole local days, for filtering DateTimeFields
+
+        Filtering with created_at__gte/__lt on these (instead of created_at__date)
+        compares the raw column, so its index can be used.
+
+        Returns:
+            tuple: (start of start_date, start of the day after end_date)
+        """
+        start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+        return start, end
+
     @action(detail=False, methods=['get'])
     def sales(self, request):
         """
@@ -144,54 +162,19 @@ class ReportViewSet(viewsets.ViewSet):
         start_date, end_date = self.get_date_range(period, start_date_str, end_date_str)
         prev_start, prev_end = self.get_previous_period_range(start_date, end_date)
 
-        # Base query for completed orders with non-refunded payments
-        # Exclude orders where ALL payments are REFUNDED
-        from django.db.models import Exists, OuterRef
-
-        # Subquery to check if order has at least one non-refunded payment
-        has_valid_payment = Payment.objects.filter(
-            order_id=OuterRef('pk'),
-            status='COMPLETED'
-        )
-
-        orders = Order.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-            status='COMPLETED'
-        ).annotate(
-            has_completed_payment=Exists(has_valid_payment)
-        ).filter(has_completed_payment=True)
-
-        prev_orders = Order.objects.filter(
-            created_at__date__gte=prev_start,
-            created_at__date__lte=prev_end,
-            status='COMPLETED'
-        ).annotate(
-            has_completed_payment=Exists(has_valid_payment)
-        ).filter(has_completed_payment=True)
-
-        if branch_id and branch_id != 'all':
-            orders = orders.filter(branch_id=branch_id)
-            prev_orders = prev_orders.filter(branch_id=branch_id)
-
-        # Annotate with calculated totals
-
-        # Calculate summary statistics
-        summary = orders.aggregate(
-            total_revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            total_orders=Count('id'),
-            avg_order_value=Coalesce(Avg(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0'))
-        )
-
-        prev_summary = prev_orders.aggregate(
-            total_revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            total_orders=Count('id')
+        # Pre-aggregated paid sales (completed orders with a completed payment)
+        rollups = self.get_sales_rollups(start_date, end_date, branch_id)
+        summary = self.summarize_rollups(rollups)
+        summary['avg_order_value'] = (
+            summary['total_revenue'] / summary['total_orders'] if summary['total_orders'] else Decimal('0')
         )
+        prev_summary = self.summarize_rollups(self.get_sales_rollups(prev_start, prev_end, branch_id))
 
         # Calculate expenses (inventory movements with type 'OUT' or 'ADJUSTMENT')
+        range_start, range_end = self.get_datetime_bounds(start_date, end_date)
         expenses = InventoryTransaction.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
+            created_at__gte=range_start,
+            created_at__lt=range_end,
             transaction_type__in=['IN', 'ADJUST']
         )
 
@@ -207,35 +190,27 @@ class ReportViewSet(viewsets.ViewSet):
         profit_margin = (net_profit / summary['total_revenue'] * 100) if summary['total_revenue'] > 0 else 0
 
         # Daily breakdown
-        daily_data = orders.annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            orders_count=Count('id'),
-            avg_order_value=Coalesce(Avg(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0'))
+        daily_data = rollups.values('date').annotate(
+            revenue=Sum('revenue'),
+            orders_count=Sum('orders_count')
         ).order_by('date')
 
-        # Get top product for each day
+        # Top product for each day from one query over the product rollups
+        top_products = {}
+        product_days = self.get_product_rollups(start_date, end_date, branch_id).values(
+            'date', 'product__name'
+        ).annotate(total_qty=Sum('quantity_sold')).order_by('date', '-total_qty')
+        for row in product_days:
+            top_products.setdefault(row['date'], row['product__name'])
+
         daily_breakdown = []
         for day in daily_data:
-            # Find top product for this day - only from orders with valid payments
-            top_product_items = OrderItem.objects.filter(
-                order__created_at__date=day['date'],
-                order__status='COMPLETED'
-            ).annotate(
-                has_completed_payment=Exists(has_valid_payment)
-            ).filter(has_completed_payment=True)
-
-            top_product = top_product_items.values('product__name').annotate(
-                total_qty=Sum('quantity')
-            ).order_by('-total_qty').first()
-
             daily_breakdown.append({
                 'date': day['date'].strftime('%Y-%m-%d'),
                 'revenue': float(day['revenue']),
                 'orders': day['orders_count'],
-                'avg_order_value': float(day['avg_order_value']),
-                'top_product': top_product['product__name'] if top_product else 'N/A'
+                'avg_order_value': float(day['revenue'] / day['orders_count']) if day['orders_count'] else 0.0,
+                'top_product': top_products.get(day['date'], 'N/A')
             })
 
         # Calculate growth metrics
@@ -294,16 +269,18 @@ class ReportViewSet(viewsets.ViewSet):
         prev_start, prev_end = self.get_previous_period_range(start_date, end_date)
 
         # Current period expenses
+        range_start, range_end = self.get_datetime_bounds(start_date, end_date)
         expenses_query = InventoryTransaction.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
+            created_at__gte=range_start,
+            created_at__lt=range_end,
             transaction_type__in=['IN', 'ADJUST']
         )
 
         # Previous period expenses
+        prev_range_start, prev_range_end = self.get_datetime_bounds(prev_start, prev_end)
         prev_expenses_query = InventoryTransaction.objects.filter(
-            created_at__date__gte=prev_start,
-            created_at__date__lte=prev_end,
+            created_at__gte=prev_range_start,
+            created_at__lt=prev_range_end,
             transaction_type__in=['IN', 'ADJUST']
         )
 
@@ -359,8 +336,8 @@ class ReportViewSet(viewsets.ViewSet):
         # Add labor costs (from cashier sessions)
         # This is a placeholder - you may want to add actual payroll tracking
         labor_costs = CashierSession.objects.filter(
-            opened_at__date__gte=start_date,
-            opened_at__date__lte=end_date,
+            opened_at__gte=range_start,
+            opened_at__lt=range_end,
             status='CLOSED'
         )
 
@@ -424,32 +401,13 @@ class ReportViewSet(viewsets.ViewSet):
 
         start_date, end_date = self.get_date_range(period, start_date_str, end_date_str)
 
-        # Query order items for completed orders with valid payments
-        from django.db.models import Exists, OuterRef
-
-        has_valid_payment = Payment.objects.filter(
-            order_id=OuterRef('order_id'),
-            status='COMPLETED'
-        )
-
-        order_items = OrderItem.objects.filter(
-            order__created_at__date__gte=start_date,
-            order__created_at__date__lte=end_date,
-            order__status='COMPLETED'
-        ).annotate(
-            has_completed_payment=Exists(has_valid_payment)
-        ).filter(has_completed_payment=True)
-
-        if branch_id and branch_id != 'all':
-            order_items = order_items.filter(order__branch_id=branch_id)
-
-        # Aggregate by product
-        product_stats = order_items.values(
+        # Aggregate by product from the daily product rollups
+        product_stats = self.get_product_rollups(start_date, end_date, branch_id).values(
             'product_id',
             'product__name'
         ).annotate(
-            quantity_sold=Sum('quantity'),
-            revenue=Sum(F('quantity') * F('unit_price'), output_field=DecimalField())
+            quantity_sold=Sum('quantity_sold'),
+            revenue=Sum('revenue')
         ).order_by('-quantity_sold')
 
         # Calculate total revenue for contribution percentages
@@ -512,43 +470,13 @@ class ReportViewSet(viewsets.ViewSet):
         start_date, end_date = self.get_date_range(period, start_date_str, end_date_str)
         prev_start, prev_end = self.get_previous_period_range(start_date, end_date)
 
-        # Query orders - exclude orders with only REFUNDED payments
-        from django.db.models import Exists, OuterRef
-
-        has_valid_payment = Payment.objects.filter(
-            order_id=OuterRef('pk'),
-            status='COMPLETED'
-        )
-
-        orders = Order.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date,
-            status='COMPLETED'
-        ).annotate(
-            has_completed_payment=Exists(has_valid_payment)
-        ).filter(has_completed_payment=True)
-
-        prev_orders = Order.objects.filter(
-            created_at__date__gte=prev_start,
-            created_at__date__lte=prev_end,
-            status='COMPLETED'
-        ).annotate(
-            has_completed_payment=Exists(has_valid_payment)
-        ).filter(has_completed_payment=True)
-
-        if branch_id and branch_id != 'all':
-            orders = orders.filter(branch_id=branch_id)
-            prev_orders = prev_orders.filter(branch_id=branch_id)
-
-        # Annotate with calculated totals
+        rollups = self.get_sales_rollups(start_date, end_date, branch_id)
 
         # Time series data
-        time_series = orders.annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            orders_count=Count('id'),
-            unique_customers=Count('table', distinct=True)  # Using table as proxy for customers
+        time_series = rollups.values('date').annotate(
+            revenue=Sum('revenue'),
+            orders_count=Sum('orders_count'),
+            unique_customers=Sum('tables_served')  # Using tables as proxy for customers
         ).order_by('date')
 
         time_series_data = [
@@ -562,15 +490,11 @@ class ReportViewSet(viewsets.ViewSet):
         ]
 
         # Current period aggregates
-        current_agg = orders.aggregate(
-            revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            orders=Count('id')
-        )
+        current_summary = self.summarize_rollups(rollups)
+        current_agg = {'revenue': current_summary['total_revenue'], 'orders': current_summary['total_orders']}
 
-        prev_agg = prev_orders.aggregate(
-            revenue=Coalesce(Sum(F('items__unit_price') * F('items__quantity') - F('items__discount_amount'), output_field=DecimalField()), Decimal('0')),
-            orders=Count('id')
-        )
+        prev_summary = self.summarize_rollups(self.get_sales_rollups(prev_start, prev_end, branch_id))
+        prev_agg = {'revenue': prev_summary['total_revenue'], 'orders': prev_summary['total_orders']}
 
         # Calculate daily averages
         days_in_period = (end_date - start_date).days + 1
@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from .models import (
     Restaurant, Branch, Staff, StaffRole,
     Category, Product, Inventory, InventoryTransaction, InventoryBatch,
     Order, OrderItem, Payment, Table,
-    KitchenOrder, KitchenOrderItem, BarOrder, BarOrderItem,
+    KitchenOrder, KitchenOrderItem, BarOrder, BarOrderItem, TicketRenderJob, KitchenTicket,
     Promotion, Schedule, Report, CashierSession, StaffSession,
     Recipe, RecipeIngredient, PurchaseOrder, PurchaseOrderItem,
     StockTransfer, Vendor,
@@ -149,10 +150,9 @@ class OrderItemSerializer(serializers.ModelSerializer):
     quantity_remaining = serializers.ReadOnlyField()
 
     def get_payment_status(self, obj):
-        """Get payment status from order's payments"""
+        """Get payment status from order's payments (prefetched by OrderViewSet)"""
         if hasattr(obj, 'order') and obj.order:
-            payments = obj.order.payments.filter(status='COMPLETED')
-            if payments.exists():
+            if any(payment.status == 'COMPLETED' for payment in obj.order.payments.all()):
                 return 'PAID'
         return 'UNPAID'
 
@@ -178,7 +178,10 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = '__all__'
-        read_only_fields = ['order_number', 'created_at', 'updated_at', 'total_amount']
+        read_only_fields = [
+            'order_number', 'created_at', 'updated_at', 'total_amount',
+            'subtotal', 'discount_total', 'tax_total', 'grand_total'
+        ]
 
     def get_order_taken_by_name(self, obj):
         if obj.order_taken_by:
@@ -209,8 +212,7 @@ class OrderSerializer(serializers.ModelSerializer):
         return None
 
     def get_payments(self, obj):
-        from .models import Payment
-        payments = Payment.objects.filter(order=obj)
+        payments = obj.payments.all()
         return [{
             'id': p.id,
             'status': p.status,
@@ -289,59 +291,60 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             })
 
         # All ingredients available, proceed with order creation
-        order = Order.objects.create(**validated_data)
-
-        # Create order items first
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
-
-        # Separate items into food (kitchen) and drinks (bar)
-        if order.order_type in ['DINE_IN', 'TAKEAWAY', 'DELIVERY']:
-            priority_map = {
-                'DINE_IN': 5,
-                'TAKEAWAY': 3,
-                'DELIVERY': 1
-            }
-
-            food_items = order.get_food_items()
-            beverage_items = order.get_beverage_items()
-
-            # Create KitchenOrder only if there are food items
-            if food_items:
-                kitchen_order = KitchenOrder.objects.create(
-                    order=order,
-                    priority=priority_map.get(order.order_type, 0),
-                    status='PENDING'
-                )
-
-                # Add food items to kitchen order
-                for order_item in food_items:
-                    KitchenOrderItem.objects.create(
-                        kitchen_order=kitchen_order,
-                        product=order_item.product,
-                        quantity=order_item.quantity,
-                        notes=order_item.notes or "",
+        # (one transaction, so the ticket worker never sees an order without its items)
+        with transaction.atomic():
+            order = Order.objects.create(**validated_data)
+
+            # Create order items first
+            for item_data in items_data:
+                OrderItem.objects.create(order=order, **item_data)
+
+            # Separate items into food (kitchen) and drinks (bar)
+            if order.order_type in ['DINE_IN', 'TAKEAWAY', 'DELIVERY']:
+                priority_map = {
+                    'DINE_IN': 5,
+                    'TAKEAWAY': 3,
+                    'DELIVERY': 1
+                }
+
+                food_items, beverage_items = order.partition_items_by_station()
+
+                # Create KitchenOrder only if there are food items
+                if food_items:
+                    kitchen_order = KitchenOrder.objects.create(
+                        order=order,
+                        priority=priority_map.get(order.order_type, 0),
                         status='PENDING'
                     )
 
-            # Create BarOrder only if there are beverage items
-            if beverage_items:
-                bar_order = BarOrder.objects.create(
-                    order=order,
-                    priority=priority_map.get(order.order_type, 0),
-                    status='PENDING'
-                )
-
-                # Add beverage items to bar order
-                for order_item in beverage_items:
-                    BarOrderItem.objects.create(
-                        bar_order=bar_order,
-                        product=order_item.product,
-                        quantity=order_item.quantity,
-                        notes=order_item.notes or "",
+                    # Add food items to kitchen order
+                    for order_item in food_items:
+                        KitchenOrderItem.objects.create(
+                            kitchen_order=kitchen_order,
+                            product=order_item.product,
+                            quantity=order_item.quantity,
+                            notes=order_item.notes or "",
+                            status='PENDING'
+                        )
+
+                # Create BarOrder only if there are beverage items
+                if beverage_items:
+                    bar_order = BarOrder.objects.create(
+                        order=order,
+                        priority=priority_map.get(order.order_type, 0),
                         status='PENDING'
                     )
 
+                    # Add beverage items to bar order
+                    for order_item in beverage_items:
+                        BarOrderItem.objects.create(
+                            bar_order=bar_order,
+                            product=order_item.product,
+                            quantity=order_item.quantity,
+                            notes=order_item.notes or "",
+                            status='PENDING'
+                        )
+
         return order
 
 
@@ -423,6 +426,48 @@ class BarOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
+class TicketRenderJobSerializer(serializers.ModelSerializer):
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
+    kitchen_pdf_url = serializers.SerializerMethodField()
+    bar_pdf_url = serializers.SerializerMethodField()
+
+    def _media_url(self, path, folder):
+        import os
+        return f'/media/{folder}/{os.path.basename(path)}' if path else None
+
+    def get_kitchen_pdf_url(self, obj):
+        return self._media_url(obj.kitchen_pdf, 'kitchen_orders')
+
+    def get_bar_pdf_url(self, obj):
+        return self._media_url(obj.bar_pdf, 'bar_orders')
+
+    class Meta:
+        model = TicketRenderJob
+        fields = ['id', 'order', 'order_number', 'status', 'attempts', 'max_attempts', 'run_after',
+                  'last_error', 'kitchen_pdf_url', 'bar_pdf_url', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class KitchenTicketSerializer(serializers.ModelSerializer):
+    order_number = serializers.CharField(source='order.order_number', read_only=True, default=None)
+    url = serializers.SerializerMethodField()
+    modified = serializers.SerializerMethodField()
+
+    def get_url(self, obj):
+        if obj.archived_at:
+            return f'/media/{obj.archive_name}' if obj.archive_name else None
+        return f'/media/{obj.folder}/{obj.filename}'
+
+    def get_modified(self, obj):
+        return obj.created_at.timestamp()
+
+    class Meta:
+        model = KitchenTicket
+        fields = ['id', 'filename', 'url', 'modified', 'station', 'order', 'order_number', 'branch',
+                  'created_at', 'archived_at', 'archive_name']
+        read_only_fields = fields
+
+
 class PromotionSerializer(serializers.ModelSerializer):
     is_valid = serializers.SerializerMethodField()
     
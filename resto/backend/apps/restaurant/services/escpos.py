@@ -0,0 +1,54 @@
+"""
+ESC/POS Encoder
+Turns KitchenTicketPrinter's 40-column text tickets into raw ESC/POS bytes for
+network thermal printers: initialize, select code page, print, feed and cut.
+"""
+from typing import Any, Dict, List
+
+from .kitchen_printer import KitchenTicketPrinter
+
+
+ESC = b'\x1b'
+GS = b'\x1d'
+
+INITIALIZE = ESC + b'@'
+CODE_PAGE_PC437 = ESC + b't\x00'
+BOLD_ON = ESC + b'E\x01'
+BOLD_OFF = ESC + b'E\x00'
+DOUBLE_HEIGHT_ON = GS + b'!\x01'
+DOUBLE_HEIGHT_OFF = GS + b'!\x00'
+FEED_AND_CUT = GS + b'V\x42\x03'  # feed 3 lines, then partial cut
+
+ENCODING = 'cp437'
+
+
+def encode_line(text: str) -> bytes:
+    """Encode one line for the printer's code page; characters it lacks (emoji) are dropped"""
+    return text.encode(ENCODING, errors='ignore')
+
+
+def render_text(text: str, title: str = None) -> bytes:
+    """
+    ESC/POS bytes for a plain-text ticket
+    The line equal to `title` (if any) is printed bold and double height.
+    """
+    out = [INITIALIZE, CODE_PAGE_PC437]
+    for line in text.split('\n'):
+        if title and line.strip() == title:
+            out.extend([BOLD_ON, DOUBLE_HEIGHT_ON, encode_line(line.strip().center(KitchenTicketPrinter.TICKET_WIDTH)),
+                        DOUBLE_HEIGHT_OFF, BOLD_OFF, b'\n'])
+        else:
+            out.extend([encode_line(line), b'\n'])
+    out.append(FEED_AND_CUT)
+    return b''.join(out)
+
+
+def render_ticket(order_data: Dict[str, Any], items: List[Dict[str, Any]], title: str = 'KITCHEN ORDER') -> bytes:
+    """ESC/POS bytes for a kitchen/bar ticket, with a real paper cut instead of the text cut line"""
+    printer = KitchenTicketPrinter()
+    text = '\n'.join([
+        printer.format_header(order_data, title=title),
+        printer.format_items(items),
+        printer.format_footer(order_data),
+    ])
+    return render_text(text, title=title)
@@ -0,0 +1,154 @@
+"""
+Inventory Deduction Service
+Single engine for recipe-based and packaging stock deductions:
+
+    order items -> merged ingredient bill of materials (one query)
+    lock the affected inventory rows (one SELECT ... FOR UPDATE)
+    subtract with one F() UPDATE and bulk_create the transaction records
+
+Everything runs inside one atomic block, so concurrent payments cannot both pass
+the stock check and oversell an ingredient.
+"""
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from ..models import Inventory, InventoryTransaction, RecipeIngredient
+from .product_availability import refresh_for_inventory
+
+
+class InsufficientStockError(Exception):
+    """Raised when one or more inventory items cannot cover a deduction"""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__('; '.join(
+            f"Insufficient stock for {shortage['ingredient']} in {shortage['location']}: "
+            f"need {shortage['needed']} {shortage['unit']}, have {shortage['available']}"
+            for shortage in shortages
+        ))
+
+
+def build_order_bom(order):
+    """
+    Expand an order into a merged ingredient bill of materials
+
+    Returns: (bom, missing_recipes) where bom is
+        {inventory_id: {'quantity': Decimal, 'products': [(name, qty), ...]}}
+    and missing_recipes lists product names without an active recipe
+    """
+    ordered = OrderedDict()
+    for product_id, name, quantity in order.items.values_list('product_id', 'product__name', 'quantity'):
+        entry = ordered.setdefault(product_id, {'name': name, 'quantity': 0})
+        entry['quantity'] += quantity
+
+    ingredients = RecipeIngredient.objects.filter(
+        recipe__product_id__in=ordered,
+        recipe__is_active=True
+    ).values_list('recipe__product_id', 'inventory_item_id', 'quantity')
+
+    bom = OrderedDict()
+    with_recipe = set()
+    for product_id, inventory_id, per_serving in ingredients:
+        with_recipe.add(product_id)
+        product = ordered[product_id]
+        line = bom.setdefault(inventory_id, {'quantity': Decimal('0'), 'products': []})
+        line['quantity'] += Decimal(str(per_serving)) * product['quantity']
+        line['products'].append((product['name'], product['quantity']))
+
+    missing_recipes = [entry['name'] for product_id, entry in ordered.items() if product_id not in with_recipe]
+    return bom, missing_recipes
+
+
+def apply_deductions(lines, transaction_type, reference_number='', performed_by=None, skip_insufficient=False):
+    """
+    Deduct stock for {inventory_id: {'quantity': Decimal, 'notes': str}} atomically
+
+    Rows are locked before the stock check. Shortages raise InsufficientStockError
+    (nothing is deducted) unless skip_insufficient=True, in which case those lines
+    are dropped. Returns the list of created InventoryTransaction objects.
+    """
+    lines = {inventory_id: line for inventory_id, line in lines.items() if line['quantity'] > 0}
+    if not lines:
+        return []
+
+    with transaction.atomic():
+        locked = Inventory.objects.select_for_update().filter(id__in=lines).in_bulk()
+
+        shortages = []
+        for inventory_id, line in list(lines.items()):
+            item = locked.get(inventory_id)
+            if item is None or item.quantity < line['quantity']:
+                if not skip_insufficient:
+                    shortages.append({
+                        'inventory_id': inventory_id,
+                        'ingredient': item.name if item else f'#{inventory_id}',
+                        'location': item.location if item else '',
+                        'unit': item.unit if item else '',
+                        'needed': line['quantity'],
+                        'available': item.quantity if item else Decimal('0'),
+                        'products': line.get('products', []),
+                    })
+                del lines[inventory_id]
+        if shortages:
+            raise InsufficientStockError(shortages)
+        if not lines:
+            return []
+
+        # Same precision as the column, so the UPDATE expression and Inventory.quantity agree
+        quantity_field = Inventory._meta.get_field('quantity')
+        Inventory.objects.filter(id__in=lines).update(
+            quantity=F('quantity') - Case(
+                *[When(id=inventory_id, then=Value(line['quantity'])) for inventory_id, line in lines.items()],
+                output_field=quantity_field
+            ),
+            updated_at=timezone.now()
+        )
+
+        # bulk UPDATE skips Inventory signals, so refresh availability here
+        refresh_for_inventory(list(lines))
+
+        return InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(
+                inventory_id=inventory_id,
+                transaction_type=transaction_type,
+                quantity=line['quantity'],
+                unit_cost=locked[inventory_id].cost_per_unit,
+                reference_number=reference_number,
+                performed_by=performed_by,
+                notes=line.get('notes', '')
+            )
+            for inventory_id, line in lines.items()
+        ])
+
+
+def deduct_order_ingredients(order, transaction_type='OUT', reference_number=None, performed_by=None):
+    """
+    Deduct every ingredient of an order's recipes in one locked, atomic pass
+
+    Raises InsufficientStockError when any merged ingredient is short.
+    Returns: (transactions, missing_recipes)
+    """
+    bom, missing_recipes = build_order_bom(order)
+    if reference_number is None:
+        reference_number = order.order_number
+
+    lines = {}
+    for inventory_id, line in bom.items():
+        used_for = ', '.join(f'{name} x{quantity}' for name, quantity in line['products'])
+        lines[inventory_id] = {
+            'quantity': line['quantity'],
+            'products': line['products'],
+            'notes': f'Used for Order {order.order_number} - {used_for}',
+        }
+
+    transactions = apply_deductions(
+        lines,
+        transaction_type=transaction_type,
+        reference_number=reference_number,
+        performed_by=performed_by
+    )
+    return transactions, missing_recipes
@@ -18,13 +18,13 @@ class KitchenTicketPrinter:
     def __init__(self):
         self.ticket_counter = 0
     
-    def format_header(self, order_data: Dict[str, Any]) -> str:
+    def format_header(self, order_data: Dict[str, Any], title: str = "KITCHEN ORDER") -> str:
         """Format the ticket header with order information"""
         header_lines = []
         
         # Restaurant header
         header_lines.append(self.SEPARATOR)
-        header_lines.append(self.center_text("KITCHEN ORDER"))
+        header_lines.append(self.center_text(title))
         header_lines.append(self.SEPARATOR)
         
         # Order number and type
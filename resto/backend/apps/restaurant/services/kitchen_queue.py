@@ -0,0 +1,235 @@
+"""
+Kitchen Queue Service
+In-memory display queues of open KitchenOrder / BarOrder tickets per branch:
+
+    heap key = (-priority, created_at, estimated prep time, ticket id)
+
+Each branch queue is loaded from the database on first use and kept current by
+model signals. Every change bumps the queue version and is appended to a short
+change log, so kitchen and bar screens poll for the changes since the version
+they last saw instead of reloading the whole queue.
+
+Queues live in the server process. A periodic resync against the database picks
+up tickets changed by other worker processes, and the queue epoch changes
+whenever a queue is rebuilt so clients know to discard their copy.
+"""
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.db.models import Max
+
+from ..models import BarOrder, KitchenOrder
+
+
+KITCHEN = 'KITCHEN'
+BAR = 'BAR'
+
+STATION_MODELS = {
+    KITCHEN: KitchenOrder,
+    BAR: BarOrder,
+}
+
+OPEN_STATUSES = ['PENDING', 'PREPARING']
+
+DEFAULT_PREP_TIME = 15  # minutes, matches the ticket printer's estimate
+CHANGE_LOG_SIZE = 500
+QUEUE_RESYNC_SECONDS = 30
+
+_lock = threading.RLock()
+_queues = {}
+
+
+def _load_entries(station, **filters):
+    """Open-or-not ticket entries for a station, prep time aggregated in the same query"""
+    rows = STATION_MODELS[station].objects.filter(**filters).annotate(
+        max_prep_time=Max('order__items__product__preparation_time')
+    ).values(
+        'id', 'order_id', 'order__order_number', 'order__order_type', 'order__table__number',
+        'order__branch_id', 'status', 'priority', 'assigned_to_id', 'created_at', 'max_prep_time'
+    )
+    entries = []
+    for row in rows:
+        entries.append({
+            'id': row['id'],
+            'station': station,
+            'branch_id': row['order__branch_id'],
+            'order_id': row['order_id'],
+            'order_number': row['order__order_number'],
+            'order_type': row['order__order_type'],
+            'table_number': row['order__table__number'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'assigned_to': row['assigned_to_id'],
+            'created_at': row['created_at'],
+            'estimated_prep_time': max(DEFAULT_PREP_TIME, row['max_prep_time'] or 0),
+        })
+    return entries
+
+
+def _serialize(entry):
+    if 'created_at' not in entry:
+        return entry
+    return {**entry, 'created_at': entry['created_at'].isoformat()}
+
+
+class BranchQueue:
+    """Priority heap of one station's open tickets in one branch"""
+
+    def __init__(self, station, branch_id):
+        self.station = station
+        self.branch_id = branch_id
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self.entries = {}
+        self.heap = []
+        self.changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self.synced_at = 0.0
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def sort_key(entry):
+        return (-entry['priority'], entry['created_at'], entry['estimated_prep_time'], entry['id'])
+
+    def _record(self, op, entry):
+        self.version += 1
+        self.changes.append((self.version, op, entry))
+
+    def upsert(self, entry):
+        if self.entries.get(entry['id']) == entry:
+            return False
+        self.entries[entry['id']] = entry
+        # Superseded heap items are skipped lazily (their entry no longer matches)
+        heapq.heappush(self.heap, (self.sort_key(entry), next(self._sequence), entry))
+        self._record('upsert', entry)
+        self._compact()
+        return True
+
+    def remove(self, ticket_id):
+        entry = self.entries.pop(ticket_id, None)
+        if entry is None:
+            return False
+        self._record('remove', {'id': ticket_id, 'station': self.station, 'branch_id': self.branch_id})
+        self._compact()
+        return True
+
+    def _compact(self):
+        if len(self.heap) > 2 * len(self.entries) + 32:
+            self.heap = [item for item in self.heap if self.entries.get(item[2]['id']) is item[2]]
+            heapq.heapify(self.heap)
+
+    def sync(self, entries):
+        """Apply the difference between the queue and a fresh list of open entries"""
+        fresh = {entry['id']: entry for entry in entries}
+        for ticket_id in [ticket_id for ticket_id in self.entries if ticket_id not in fresh]:
+            self.remove(ticket_id)
+        for entry in fresh.values():
+            self.upsert(entry)
+        self.synced_at = time.monotonic()
+
+    def ordered(self):
+        """Open tickets, highest priority first"""
+        live = [item for item in self.heap if self.entries.get(item[2]['id']) is item[2]]
+        return [item[2] for item in heapq.nsmallest(len(live), live)]
+
+    def changes_since(self, version):
+        """
+        Changes after `version`, collapsed to the latest change per ticket
+        Returns None when the change log no longer reaches back that far
+        """
+        if version > self.version:
+            return None
+        if version < self.version and (not self.changes or self.changes[0][0] > version + 1):
+            return None
+        latest = {}
+        for change_version, op, entry in self.changes:
+            if change_version > version:
+                latest.pop(entry['id'], None)
+                latest[entry['id']] = (op, entry)
+        return [{'op': op, 'entry': _serialize(entry)} for op, entry in latest.values()]
+
+
+def _get_queue(station, branch_id):
+    """The branch queue, loading it on first use and resyncing it when stale"""
+    key = (station, int(branch_id))
+    with _lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = BranchQueue(station, key[1])
+        if time.monotonic() - queue.synced_at > QUEUE_RESYNC_SECONDS:
+            queue.sync(_load_entries(station, order__branch_id=key[1], status__in=OPEN_STATUSES))
+        return queue
+
+
+def get_queue(station, branch_id):
+    """
+    Current queue for a station and branch
+    Returns: {'epoch', 'version', 'orders': [entry, ...]} highest priority first
+    """
+    with _lock:
+        queue = _get_queue(station, branch_id)
+        return {
+            'epoch': queue.epoch,
+            'version': queue.version,
+            'orders': [_serialize(entry) for entry in queue.ordered()],
+        }
+
+
+def get_queue_changes(station, branch_id, since=None, epoch=None):
+    """
+    Changes to a queue since a client's version
+    A client without a usable version (none given, other epoch, log truncated)
+    gets the full queue with reset=True and should replace its copy.
+    """
+    with _lock:
+        queue = _get_queue(station, branch_id)
+        changes = None
+        if since is not None and epoch == queue.epoch:
+            changes = queue.changes_since(since)
+        if changes is None:
+            return {'reset': True, **get_queue(station, branch_id)}
+        return {
+            'reset': False,
+            'epoch': queue.epoch,
+            'version': queue.version,
+            'changes': changes,
+        }
+
+
+def refresh_tickets(station, ticket_ids):
+    """Reload tickets into any loaded branch queue; closed or deleted tickets leave it"""
+    ticket_ids = set(ticket_ids)
+    with _lock:
+        if not any(key[0] == station for key in _queues):
+            return
+    entries = {entry['id']: entry for entry in _load_entries(station, id__in=ticket_ids)}
+    with _lock:
+        for (queue_station, branch_id), queue in _queues.items():
+            if queue_station != station:
+                continue
+            for ticket_id in ticket_ids:
+                entry = entries.get(ticket_id)
+                if entry and entry['branch_id'] == branch_id and entry['status'] in OPEN_STATUSES:
+                    queue.upsert(entry)
+                else:
+                    queue.remove(ticket_id)
+
+
+def tickets_for_order(order_id):
+    """(station, ticket_id) pairs currently queued for an order"""
+    with _lock:
+        return [
+            (station, entry['id'])
+            for (station, branch_id), queue in _queues.items()
+            for entry in queue.entries.values()
+            if entry['order_id'] == order_id
+        ]
+
+
+def rebuild_all():
+    """Drop every loaded queue; each is reloaded (with a new epoch) on next use"""
+    with _lock:
+        _queues.clear()
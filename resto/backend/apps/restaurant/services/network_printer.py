@@ -0,0 +1,289 @@
+"""
+Network Printer Service
+Sends raw ESC/POS tickets to thermal printers over TCP (port 9100):
+
+    submit() -> per-printer queue -> sender thread -> persistent socket
+
+Each printer gets one sender thread holding one persistent connection. Jobs that
+queue up while a ticket is being sent go out together in one write. A failed
+send closes the connection and retries the batch with exponential backoff, so
+a printer that is rebooting or briefly off the network catches up instead of
+losing tickets. Idle connections are closed after IDLE_TIMEOUT.
+"""
+import logging
+import queue
+import socket
+import threading
+import time
+
+from django.core.exceptions import ObjectDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+
+PRINTER_PORT = 9100
+CONNECT_TIMEOUT = 3  # seconds
+IDLE_TIMEOUT = 60
+MAX_BATCH_BYTES = 64 * 1024
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+
+class PrintJob:
+    """A ticket waiting for its printer; wait() blocks until it was sent or gave up"""
+
+    def __init__(self, data, label=''):
+        self.data = data
+        self.label = label
+        self.attempts = 0
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def sent(self):
+        return self._done.is_set() and self.error is None
+
+    def finish(self, error=None):
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """True once the job is finished (sent or failed)"""
+        return self._done.wait(timeout)
+
+
+class PrinterChannel:
+    """Queue, sender thread and persistent connection for one printer"""
+
+    def __init__(self, host, port=PRINTER_PORT):
+        self.host = host
+        self.port = port
+        self.jobs = queue.Queue()
+        self.sock = None
+        self.last_used = 0.0
+        self.connects = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'printer-{host}:{port}', daemon=True)
+        self._thread.start()
+
+    def submit(self, data, label=''):
+        job = PrintJob(data, label)
+        self.jobs.put(job)
+        return job
+
+    def _connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self.connects += 1
+
+    def _connection_alive(self):
+        """
+        Whether the printer still holds the idle connection open; a write to a
+        connection the printer already closed can appear to succeed and lose the ticket.
+        Any status bytes the printer sent meanwhile are discarded.
+        """
+        try:
+            self.sock.setblocking(False)
+            return self.sock.recv(4096) != b''
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            if self.sock is not None:
+                self.sock.settimeout(CONNECT_TIMEOUT)
+
+    def _close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def _next_batch(self):
+        """Block for one job, then take whatever else is already queued"""
+        try:
+            job = self.jobs.get(timeout=1)
+        except queue.Empty:
+            return []
+        if job is None:  # stop() wake-up
+            return []
+        batch = [job]
+        size = len(batch[0].data)
+        while size < MAX_BATCH_BYTES:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                break
+            batch.append(job)
+            size += len(job.data)
+        return batch
+
+    def _send(self, batch):
+        """Write a batch, reconnecting with backoff; returns when sent or out of attempts"""
+        payload = b''.join(job.data for job in batch)
+        attempt = 0
+        while not self._stopped.is_set():
+            attempt += 1
+            for job in batch:
+                job.attempts = attempt
+            try:
+                if self.sock is not None and not self._connection_alive():
+                    self._close()
+                if self.sock is None:
+                    self._connect()
+                self.sock.sendall(payload)
+                self.last_used = time.monotonic()
+                for job in batch:
+                    job.finish()
+                return
+            except OSError as e:
+                self._close()
+                if attempt >= MAX_ATTEMPTS:
+                    logger.error(f"Printer {self.host}:{self.port} unreachable, dropping {len(batch)} ticket(s): {e}")
+                    for job in batch:
+                        job.finish(error=str(e))
+                    return
+                delay = min(BACKOFF_BASE * 2 ** (attempt - 1), BACKOFF_MAX)
+                logger.warning(f"Printer {self.host}:{self.port} send failed ({e}), retrying in {delay:.1f}s")
+                self._stopped.wait(delay)
+        for job in batch:
+            job.finish(error='printer channel stopped')
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+            elif self.sock is not None and time.monotonic() - self.last_used > IDLE_TIMEOUT:
+                self._close()
+        self._close()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        self.jobs.put(None)
+        self._thread.join(timeout)
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(error='printer channel stopped')
+
+
+class PrinterPool:
+    """One channel per printer address, created on first use"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def channel(self, host, port=PRINTER_PORT):
+        key = (host, int(port))
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = PrinterChannel(host, key[1])
+            return channel
+
+    def submit(self, host, data, port=PRINTER_PORT, label=''):
+        """Queue raw bytes for a printer; returns the PrintJob without waiting"""
+        return self.channel(host, port).submit(data, label)
+
+    def close(self):
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels.clear()
+        for channel in channels:
+            channel.stop()
+
+
+pool = PrinterPool()
+
+
+def check_printer(host, port=PRINTER_PORT, timeout=CONNECT_TIMEOUT):
+    """
+    Open (and close) a TCP connection to the printer's raw print port
+    Returns: (reachable, message)
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True, f'Printer at {host}:{port} is accepting connections'
+    except socket.timeout:
+        return False, f'Printer at {host}:{port} did not respond'
+    except OSError as e:
+        return False, f'Printer at {host}:{port} is not reachable: {e}'
+
+
+def _ticket_data(order):
+    created_by = order.created_by.user.get_full_name() if order.created_by else 'System'
+    return {
+        'order_number': order.order_number,
+        'order_type': order.order_type,
+        'table_number': order.table.number if order.table else None,
+        'priority': 0,
+        'created_at': order.created_at,
+        'notes': order.notes,
+        'customer_name': order.customer_name,
+        'customer_phone': order.customer_phone,
+        'delivery_address': order.delivery_address,
+        'created_by': created_by,
+    }
+
+
+def print_order_tickets(order, settings):
+    """
+    Queue an order's kitchen and bar tickets on the printers configured in
+    RestaurantSettings; stations without a printer IP or items are skipped
+    Returns: {station: PrintJob}
+    """
+    from .escpos import render_ticket
+
+    printers = {
+        'KITCHEN': (settings.kitchen_printer_ip, 'KITCHEN ORDER'),
+        'BAR': (settings.bar_printer_ip, 'BAR ORDER'),
+    }
+    if not any(ip for ip, title in printers.values()):
+        return {}
+
+    kitchen_items, bar_items = order.partition_items_by_station()
+    order_data = _ticket_data(order)
+    for related in ('kitchen_order', 'bar_order'):
+        try:
+            order_data['priority'] = max(order_data['priority'], getattr(order, related).priority)
+        except ObjectDoesNotExist:
+            pass
+
+    jobs = {}
+    for station, items in (('KITCHEN', kitchen_items), ('BAR', bar_items)):
+        ip, title = printers[station]
+        if not ip or not items:
+            continue
+        lines = [
+            {'quantity': item.quantity, 'product_name': item.product.name, 'notes': item.notes, 'modifiers': []}
+            for item in items
+        ]
+        jobs[station] = pool.submit(
+            ip, render_ticket(order_data, lines, title=title), port=PRINTER_PORT, label=order.order_number
+        )
+    return jobs
+
+
+def print_order_tickets_after_commit(order_id, settings):
+    """Load a committed order and queue its tickets; errors are logged, never raised to the request"""
+    from ..models import Order, OrderItem
+    from django.db.models import Prefetch
+
+    try:
+        order = Order.objects.select_related('table', 'created_by__user').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        ).get(id=order_id)
+        return print_order_tickets(order, settings)
+    except Exception as e:
+        logger.error(f"Error sending order {order_id} to network printers: {str(e)}")
+        return {}
@@ -0,0 +1,66 @@
+"""
+Order Totals Service
+Keeps the stored Order.subtotal / discount_total / tax_total / grand_total columns
+in step with the order's items, so reports aggregate orders without joining items.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import DecimalField, F, Sum
+from django.utils import timezone
+
+from ..models import Order, OrderItem
+from .sales_rollup import refresh_order_day
+
+
+CENT = Decimal('0.01')
+
+
+def compute_totals(subtotal, discount_total, tax_rate):
+    """Totals for one order; tax is charged on the discounted subtotal"""
+    subtotal = Decimal(subtotal or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+    discount_total = Decimal(discount_total or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+    tax_total = ((subtotal - discount_total) * Decimal(tax_rate or 0) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+    return {
+        'subtotal': subtotal,
+        'discount_total': discount_total,
+        'tax_total': tax_total,
+        'grand_total': subtotal - discount_total + tax_total,
+    }
+
+
+def recalculate_order_totals(order_ids):
+    """
+    Recompute stored totals for the given orders with one grouped query and
+    write them with a queryset update per order (no save(), no signals)
+    The update skips the Order post_save rollup refresh, so the sales rollup of
+    each affected day with a COMPLETED order is rebuilt here, once per branch and day
+    Returns: {order_id: totals}
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return {}
+
+    item_totals = {
+        row['order_id']: row
+        for row in OrderItem.objects.filter(order_id__in=order_ids).values('order_id').annotate(
+            subtotal=Sum(F('unit_price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            discount_total=Sum('discount_amount')
+        ).order_by()
+    }
+    tax_rates = Order.objects.filter(id__in=order_ids).values_list('id', 'branch__restaurant__settings__tax_rate')
+
+    totals = {}
+    for order_id, tax_rate in tax_rates:
+        row = item_totals.get(order_id, {})
+        totals[order_id] = compute_totals(row.get('subtotal'), row.get('discount_total'), tax_rate)
+
+    for order_id, values in totals.items():
+        Order.objects.filter(id=order_id).update(**values)
+
+    refreshed = set()
+    for order in Order.objects.filter(id__in=order_ids, status='COMPLETED').only('branch_id', 'created_at'):
+        day = (order.branch_id, timezone.localdate(order.created_at))
+        if day not in refreshed:
+            refreshed.add(day)
+            refresh_order_day(order)
+    return totals
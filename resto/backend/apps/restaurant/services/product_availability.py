@@ -0,0 +1,85 @@
+"""
+Product Availability Service
+Maintains ProductAvailability rows (max servings makeable from current stock).
+Only products whose ingredients changed are recomputed, with one read and one upsert.
+"""
+from decimal import Decimal
+
+from django.utils import timezone
+
+from ..models import Product, ProductAvailability, RecipeIngredient
+
+
+def refresh_products(product_ids):
+    """Recompute availability for the given product IDs; returns the number of rows written"""
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+
+    rows = {product_id: {'max_servings': None, 'insufficient': []} for product_id in product_ids}
+    ingredients = RecipeIngredient.objects.filter(recipe__product_id__in=product_ids).values_list(
+        'recipe__product_id', 'quantity',
+        'inventory_item__name', 'inventory_item__quantity', 'inventory_item__unit'
+    )
+    for product_id, per_serving, name, stock, unit in ingredients:
+        row = rows[product_id]
+        per_serving = Decimal(per_serving)
+        servings = int(max(stock, 0) // per_serving) if per_serving > 0 else None
+        if servings is not None:
+            row['max_servings'] = servings if row['max_servings'] is None else min(row['max_servings'], servings)
+        if stock < per_serving:
+            row['insufficient'].append({
+                'name': name,
+                'needed': float(per_serving),
+                'available': float(stock),
+                'unit': unit
+            })
+
+    now = timezone.now()
+    ProductAvailability.objects.bulk_create(
+        [
+            ProductAvailability(
+                product_id=product_id,
+                max_servings=row['max_servings'],
+                insufficient_ingredients=row['insufficient'],
+                updated_at=now
+            )
+            for product_id, row in rows.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['max_servings', 'insufficient_ingredients', 'updated_at']
+    )
+    return len(rows)
+
+
+def refresh_for_inventory(inventory_ids):
+    """Recompute availability for every product whose recipe uses one of these inventory items"""
+    product_ids = RecipeIngredient.objects.filter(
+        inventory_item_id__in=inventory_ids
+    ).values_list('recipe__product_id', flat=True).distinct()
+    return refresh_products(product_ids)
+
+
+def availability_for(products):
+    """
+    {product_id: ProductAvailability} for products loaded with select_related('availability');
+    products never computed yet (e.g. just created) are filled in first
+    """
+    availability = {}
+    missing = []
+    for product in products:
+        try:
+            availability[product.id] = product.availability
+        except ProductAvailability.DoesNotExist:
+            missing.append(product.id)
+
+    if missing:
+        refresh_products(missing)
+        availability.update(ProductAvailability.objects.in_bulk(missing))
+    return availability
+
+
+def rebuild_all():
+    """Recompute availability for every product"""
+    return refresh_products(Product.objects.values_list('id', flat=True))
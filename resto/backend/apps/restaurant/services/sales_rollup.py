@@ -0,0 +1,93 @@
+"""
+Sales Rollup Service
+Maintains DailySalesRollup / DailyProductSalesRollup: paid sales per branch, order
+date and product. A sale counts once its order is COMPLETED with a COMPLETED payment,
+matching what the reports have always counted.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import DailyProductSalesRollup, DailySalesRollup, Order, OrderItem, Payment
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def paid_orders(start_date, end_date, branch_id=None):
+    """Completed orders with a completed payment, created between start_date and end_date (local days)"""
+    orders = Order.objects.filter(
+        created_at__gte=_day_start(start_date),
+        created_at__lt=_day_start(end_date + timedelta(days=1)),
+        status='COMPLETED'
+    ).filter(
+        Exists(Payment.objects.filter(order_id=OuterRef('pk'), status='COMPLETED'))
+    )
+    if branch_id:
+        orders = orders.filter(branch_id=branch_id)
+    return orders
+
+
+def rebuild_sales_rollups(start_date, end_date, branch_id=None):
+    """
+    Replace rollup rows for [start_date, end_date] (optionally one branch) from two grouped queries
+    Returns: (sales rows written, product rows written)
+    """
+    orders = paid_orders(start_date, end_date, branch_id)
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    order_rows = orders.annotate(day=TruncDate('created_at')).values('branch_id', 'day').annotate(
+        revenue=Sum(F('subtotal') - F('discount_total'), output_field=money),
+        orders_count=Count('id'),
+        tables_served=Count('table', distinct=True)
+    ).order_by()
+
+    product_rows = OrderItem.objects.filter(order__in=orders).annotate(
+        day=TruncDate('order__created_at')
+    ).values('order__branch_id', 'day', 'product_id').annotate(
+        quantity_sold=Sum('quantity'),
+        revenue=Sum(F('quantity') * F('unit_price'), output_field=money)
+    ).order_by()
+
+    sales = [
+        DailySalesRollup(
+            branch_id=row['branch_id'],
+            date=row['day'],
+            revenue=row['revenue'] or 0,
+            orders_count=row['orders_count'],
+            tables_served=row['tables_served']
+        )
+        for row in order_rows
+    ]
+    products = [
+        DailyProductSalesRollup(
+            branch_id=row['order__branch_id'],
+            date=row['day'],
+            product_id=row['product_id'],
+            quantity_sold=row['quantity_sold'] or 0,
+            revenue=row['revenue'] or 0
+        )
+        for row in product_rows
+    ]
+
+    with transaction.atomic():
+        for model in (DailySalesRollup, DailyProductSalesRollup):
+            stale = model.objects.filter(date__range=[start_date, end_date])
+            if branch_id:
+                stale = stale.filter(branch_id=branch_id)
+            stale.delete()
+        DailySalesRollup.objects.bulk_create(sales)
+        DailyProductSalesRollup.objects.bulk_create(products)
+    return len(sales), len(products)
+
+
+def refresh_order_day(order):
+    """Rebuild the rollup for the branch and day an order belongs to"""
+    if not order.created_at:
+        return
+    day = timezone.localdate(order.created_at)
+    rebuild_sales_rollups(day, day, order.branch_id)
@@ -0,0 +1,52 @@
+"""
+Station routing map: category ID -> KITCHEN / BAR / BOTH
+
+Loaded once per process and kept in memory; category saves and deletes
+invalidate it through signals. A short TTL and a reload on unknown IDs pick
+up changes made by other worker processes.
+"""
+import threading
+import time
+
+from ..models import Category
+
+
+STATION_MAP_TTL = 300  # seconds
+
+_lock = threading.Lock()
+_station_map = None
+_loaded_at = 0.0
+
+
+def _load():
+    global _station_map, _loaded_at
+    with _lock:
+        _station_map = dict(Category.objects.values_list('id', 'station'))
+        _loaded_at = time.monotonic()
+    return _station_map
+
+
+def get_station_map():
+    """Current category ID -> station map, loading it if missing or expired"""
+    station_map = _station_map
+    if station_map is None or time.monotonic() - _loaded_at > STATION_MAP_TTL:
+        station_map = _load()
+    return station_map
+
+
+def get_category_station(category_id):
+    """Station for a category ID, or None for uncategorized items"""
+    if category_id is None:
+        return None
+    station = get_station_map().get(category_id)
+    if station is None:
+        # Category created after the map was loaded (possibly by another process)
+        station = _load().get(category_id)
+    return station
+
+
+def invalidate_station_map():
+    """Drop the cached map; the next lookup reloads it"""
+    global _station_map
+    with _lock:
+        _station_map = None
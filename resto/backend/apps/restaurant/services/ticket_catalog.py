@@ -0,0 +1,137 @@
+"""
+Ticket Catalog Service
+Records rendered kitchen/bar ticket PDFs in KitchenTicket, so ticket listings are
+indexed queries instead of directory scans, and archives old PDFs into one
+tarball per station and day:
+
+    media/kitchen_orders/archive/kitchen_2025-01-31.tar.gz
+"""
+import os
+import re
+import tarfile
+from datetime import datetime
+from itertools import groupby
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import KitchenTicket, Order
+
+
+STATION_FOLDERS = {
+    'KITCHEN': 'kitchen_orders',
+    'BAR': 'bar_orders',
+}
+
+ARCHIVE_FOLDER = 'archive'
+
+# kitchen_order_<order_number>_<YYYYmmdd_HHMMSS>.pdf, as written by KitchenTicketPDF
+FILENAME_PATTERN = re.compile(r'^(?:kitchen|bar)_order_(?P<order_number>.+)_(?P<timestamp>\d{8}_\d{6})\.pdf$')
+
+
+def record_tickets(order, paths):
+    """Catalog freshly rendered PDFs; paths is {station: filepath or None}"""
+    return KitchenTicket.objects.bulk_create([
+        KitchenTicket(
+            filename=os.path.basename(path),
+            station=station,
+            order=order,
+            branch_id=order.branch_id
+        )
+        for station, path in paths.items() if path
+    ], ignore_conflicts=True)
+
+
+def index_existing_files():
+    """
+    Catalog PDFs already on disk (rendered before the catalog existed)
+    Returns: number of tickets added
+    """
+    known = set(KitchenTicket.objects.values_list('filename', flat=True))
+    found = []
+    for station, folder in STATION_FOLDERS.items():
+        folder_path = os.path.join(settings.MEDIA_ROOT, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for entry in os.scandir(folder_path):
+            if entry.is_file() and entry.name.endswith('.pdf') and entry.name not in known:
+                found.append((station, entry.name, entry.stat().st_mtime))
+
+    order_numbers = {}
+    for station, filename, mtime in found:
+        match = FILENAME_PATTERN.match(filename)
+        if match:
+            order_numbers[filename] = match.group('order_number')
+    orders = {
+        order_number: (order_id, branch_id)
+        for order_id, order_number, branch_id in Order.objects.filter(
+            order_number__in=set(order_numbers.values())
+        ).values_list('id', 'order_number', 'branch_id')
+    }
+
+    tickets = []
+    for station, filename, mtime in found:
+        order_id, branch_id = orders.get(order_numbers.get(filename), (None, None))
+        tickets.append(KitchenTicket(
+            filename=filename,
+            station=station,
+            order_id=order_id,
+            branch_id=branch_id,
+            created_at=datetime.fromtimestamp(mtime, tz=timezone.get_current_timezone())
+        ))
+    KitchenTicket.objects.bulk_create(tickets, ignore_conflicts=True, batch_size=500)
+    return len(tickets)
+
+
+def _archive_path(station, day):
+    """A new tarball path for a station and day; a suffix avoids overwriting earlier runs"""
+    folder = os.path.join(settings.MEDIA_ROOT, STATION_FOLDERS[station], ARCHIVE_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    base = f'{station.lower()}_{day.isoformat()}'
+    path = os.path.join(folder, f'{base}.tar.gz')
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(folder, f'{base}_{suffix}.tar.gz')
+    return path
+
+
+def archive_tickets(before, dry_run=False):
+    """
+    Move PDFs of tickets created before `before` into per-station, per-day tarballs
+    Returns: {'archives': n, 'files': n, 'missing': n}
+    """
+    tickets = KitchenTicket.objects.filter(
+        archived_at__isnull=True, created_at__lt=before
+    ).order_by('station', 'created_at').values_list('id', 'station', 'filename', 'created_at')
+
+    def day_key(row):
+        return row[1], timezone.localdate(row[3])
+
+    stats = {'archives': 0, 'files': 0, 'missing': 0}
+    for (station, day), rows in groupby(tickets, key=day_key):
+        rows = list(rows)
+        folder_path = os.path.join(settings.MEDIA_ROOT, STATION_FOLDERS[station])
+        present = [row for row in rows if os.path.exists(os.path.join(folder_path, row[2]))]
+        stats['files'] += len(present)
+        stats['missing'] += len(rows) - len(present)
+        if dry_run:
+            stats['archives'] += 1 if present else 0
+            continue
+
+        archive_name = ''
+        if present:
+            archive_path = _archive_path(station, day)
+            with tarfile.open(archive_path, 'x:gz') as archive:
+                for row in present:
+                    archive.add(os.path.join(folder_path, row[2]), arcname=row[2])
+            archive_name = os.path.relpath(archive_path, settings.MEDIA_ROOT)
+            stats['archives'] += 1
+
+        KitchenTicket.objects.filter(id__in=[row[0] for row in rows]).update(
+            archived_at=timezone.now(), archive_name=archive_name
+        )
+        # Only delete once the tarball is closed and the catalog points at it
+        for row in present:
+            os.remove(os.path.join(folder_path, row[2]))
+    return stats
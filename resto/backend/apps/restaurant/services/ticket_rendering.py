@@ -0,0 +1,115 @@
+"""
+Ticket Rendering Service
+Database-backed queue for kitchen/bar PDF tickets:
+
+    order created -> TicketRenderJob row (same transaction as the order)
+    render_tickets worker -> claims due jobs, renders both stations' PDFs
+
+Rendering therefore never runs on the request thread. Failed jobs are retried
+with exponential backoff until max_attempts, and jobs left RUNNING by a worker
+that died are reclaimed after RUNNING_TIMEOUT.
+"""
+import logging
+from datetime import timedelta
+
+from django.db.models import F, Prefetch, Q
+from django.utils import timezone
+
+from ..models import Order, OrderItem, TicketRenderJob
+from .ticket_catalog import record_tickets
+
+logger = logging.getLogger(__name__)
+
+
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+RUNNING_TIMEOUT = timedelta(minutes=5)
+
+
+def enqueue_order_tickets(order):
+    """Queue ticket rendering for an order; the job becomes visible when the order commits"""
+    return TicketRenderJob.objects.create(order=order)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures"""
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+def _due_jobs(now):
+    return TicketRenderJob.objects.filter(
+        Q(status='PENDING', run_after__lte=now) |
+        Q(status='RUNNING', started_at__lt=now - RUNNING_TIMEOUT),
+        attempts__lt=F('max_attempts')
+    )
+
+
+def claim_jobs(limit=10):
+    """
+    Claim up to `limit` due jobs for this worker
+    Each claim is a conditional UPDATE, so concurrent workers never render the same job
+    """
+    now = timezone.now()
+    # Abandoned by a dead worker on its last attempt
+    TicketRenderJob.objects.filter(
+        status='RUNNING', started_at__lt=now - RUNNING_TIMEOUT, attempts__gte=F('max_attempts')
+    ).update(status='FAILED', last_error='Worker stopped while rendering', finished_at=now)
+
+    claimed = []
+    for job_id, job_status, started_at in _due_jobs(now).order_by('run_after', 'id').values_list(
+        'id', 'status', 'started_at'
+    )[:limit]:
+        updated = TicketRenderJob.objects.filter(
+            id=job_id, status=job_status, started_at=started_at
+        ).update(status='RUNNING', started_at=now, attempts=F('attempts') + 1)
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def run_job(job_id):
+    """Render one claimed job, recording success, a scheduled retry or the final failure"""
+    from ..kitchen_printer import render_order_tickets
+
+    job = TicketRenderJob.objects.get(id=job_id)
+    order = Order.objects.select_related('table').prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+    ).get(id=job.order_id)
+
+    try:
+        kitchen_path, bar_path = render_order_tickets(order)
+    except Exception as e:
+        job.last_error = str(e)
+        if job.attempts >= job.max_attempts:
+            job.status = 'FAILED'
+            job.finished_at = timezone.now()
+            logger.error(f"Ticket rendering failed for order {order.order_number}: {e}")
+        else:
+            job.status = 'PENDING'
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+            logger.warning(f"Ticket rendering for order {order.order_number} failed, retrying: {e}")
+        job.save(update_fields=['status', 'last_error', 'run_after', 'finished_at'])
+        return job
+
+    record_tickets(order, {'KITCHEN': kitchen_path, 'BAR': bar_path})
+    job.status = 'DONE'
+    job.kitchen_pdf = kitchen_path or ''
+    job.bar_pdf = bar_path or ''
+    job.last_error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'kitchen_pdf', 'bar_pdf', 'last_error', 'finished_at'])
+    return job
+
+
+def process_jobs(limit=10):
+    """Claim and run due jobs; returns the processed jobs"""
+    return [run_job(job_id) for job_id in claim_jobs(limit)]
+
+
+def retry_job(job):
+    """Put a failed job back in the queue with a fresh attempt budget"""
+    job.status = 'PENDING'
+    job.run_after = timezone.now()
+    job.max_attempts = job.attempts + TicketRenderJob._meta.get_field('max_attempts').default
+    job.save(update_fields=['status', 'run_after', 'max_attempts'])
+    return job
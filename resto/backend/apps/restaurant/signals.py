@@ -1,22 +1,21 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
-from .models import Order, KitchenOrder, KitchenOrderItem, Inventory, PurchaseOrder, Payment, Customer, LoyaltyTransaction, MembershipTierBenefit
+from core.caching import invalidate
+from core.events import broker
+from .models import Category, Product, Order, OrderItem, RecipeIngredient, KitchenOrder, KitchenOrderItem, BarOrder, Inventory, PurchaseOrder, Payment, Customer, LoyaltyTransaction, MembershipTierBenefit
+from .services.station_routing import invalidate_station_map
+from .services.product_availability import refresh_for_inventory, refresh_products
+from .services.sales_rollup import refresh_order_day
+from .services import kitchen_queue
+from .services.ticket_rendering import enqueue_order_tickets
+from .services.network_printer import print_order_tickets_after_commit
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Import kitchen printer utility
-try:
-    from .kitchen_printer import generate_kitchen_bar_tickets
-    KITCHEN_PRINTER_AVAILABLE = True
-except ImportError:
-    logger.warning("Kitchen printer module not available")
-    KITCHEN_PRINTER_AVAILABLE = False
-
-
 # Kitchen order creation is now handled in OrderCreateSerializer.create()
 # to ensure proper ordering of operations and avoid timing issues with OrderItems
 #
@@ -202,8 +201,8 @@ def award_loyalty_points_on_payment(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Order)
 def generate_kitchen_bar_tickets_on_order(sender, instance, created, **kwargs):
     """
-    Automatically generate kitchen and bar order tickets (PDFs) when a new order is created.
-    PDFs are saved to media/kitchen_orders/ and media/bar_orders/
+    Queue kitchen and bar order tickets (PDFs) when a new order is created.
+    The render_tickets worker saves them to media/kitchen_orders/ and media/bar_orders/
     """
     # Only generate for new orders with CONFIRMED status
     if not created:
@@ -212,42 +211,28 @@ def generate_kitchen_bar_tickets_on_order(sender, instance, created, **kwargs):
     if instance.status != 'CONFIRMED':
         return
 
-    # Check if kitchen printer is available
-    if not KITCHEN_PRINTER_AVAILABLE:
-        logger.warning(f"Kitchen printer not available, skipping ticket generation for order {instance.order_number}")
-        return
-
     # Check restaurant settings
     try:
-        settings = instance.restaurant.settings
+        settings = instance.branch.restaurant.settings
 
         # Check if auto-print is enabled
         if not settings.enable_auto_print:
-            logger.info(f"Auto-print disabled for restaurant {instance.restaurant.name}, skipping ticket generation")
+            logger.info(f"Auto-print disabled for restaurant {instance.branch.restaurant.name}, skipping ticket generation")
             return
 
         # Check if kitchen orders should be printed
         if not settings.print_kitchen_orders:
-            logger.info(f"Kitchen orders printing disabled for restaurant {instance.restaurant.name}, skipping ticket generation")
+            logger.info(f"Kitchen orders printing disabled for restaurant {instance.branch.restaurant.name}, skipping ticket generation")
             return
     except Exception as e:
         logger.warning(f"Could not check restaurant settings: {str(e)}, proceeding with ticket generation")
+        settings = None
 
-    try:
-        # Generate tickets
-        result = generate_kitchen_bar_tickets(instance)
-
-        if result['success']:
-            logger.info(f"Kitchen/Bar tickets generated for order {instance.order_number}")
-            if result['kitchen_pdf']:
-                logger.info(f"  - Kitchen PDF: {result['kitchen_pdf']}")
-            if result['bar_pdf']:
-                logger.info(f"  - Bar PDF: {result['bar_pdf']}")
-        else:
-            logger.info(f"No tickets generated for order {instance.order_number}: {result['message']}")
+    enqueue_order_tickets(instance)
 
-    except Exception as e:
-        logger.error(f"Error generating kitchen/bar tickets for order {instance.order_number}: {str(e)}")
+    # Raw ESC/POS straight to the network printers, without waiting for the PDFs
+    if settings and (settings.kitchen_printer_ip or settings.bar_printer_ip):
+        transaction.on_commit(lambda: print_order_tickets_after_commit(instance.id, settings))
 
 
 @receiver(post_save, sender=Order)
@@ -265,7 +250,8 @@ def deduct_utility_items_for_packaging(sender, instance, created, **kwargs):
         return
 
     try:
-        from .models import InventoryTransaction, InventoryCategory, InventoryItemType, InventoryLocation
+        from .models import InventoryCategory, InventoryItemType, InventoryLocation
+        from .services.inventory_deduction import apply_deductions
         from decimal import Decimal
 
         # Get total items in order
@@ -275,45 +261,172 @@ def deduct_utility_items_for_packaging(sender, instance, created, **kwargs):
             return
 
         # Find packaging items in warehouse
-        packaging_items = Inventory.objects.filter(
+        packaging_items = list(Inventory.objects.filter(
             branch=instance.branch,
             item_type=InventoryItemType.UTILITY,
             category=InventoryCategory.PACKAGING,
             location=InventoryLocation.WAREHOUSE
-        )
+        ).only('id', 'name'))
+
+        def find_packaging(keyword):
+            return next((item for item in packaging_items if keyword in item.name.lower()), None)
 
         # Standard packaging deduction rules
-        deductions = []
+        deductions = {}
 
         # Box takeaway: 1 box per 2 items (rounded up)
         boxes_needed = (total_items + 1) // 2  # Round up division
-        box = packaging_items.filter(name__icontains='box').first()
-        if box and box.quantity >= boxes_needed:
-            deductions.append((box, boxes_needed, 'Takeaway boxes'))
+        box = find_packaging('box')
+        if box:
+            deductions[box.id] = {'quantity': Decimal(boxes_needed), 'description': 'Takeaway boxes'}
 
         # Plastic bag: 1 bag per order
-        bag = packaging_items.filter(name__icontains='kantong').first()
-        if bag and bag.quantity >= 1:
-            deductions.append((bag, 1, 'Plastic bag'))
-
-        # Perform deductions
-        for item, quantity, description in deductions:
-            # Create transaction
-            InventoryTransaction.objects.create(
-                inventory=item,
-                transaction_type='OUT',
-                quantity=Decimal(quantity),
-                unit_cost=item.cost_per_unit,
-                reference_number=instance.order_number,
-                notes=f'Auto-deduct for {instance.get_order_type_display()} order - {description}',
-                performed_by=instance.created_by.user if instance.created_by else None
+        bag = find_packaging('kantong')
+        if bag and bag.id not in deductions:
+            deductions[bag.id] = {'quantity': Decimal(1), 'description': 'Plastic bag'}
+
+        for line in deductions.values():
+            line['notes'] = f'Auto-deduct for {instance.get_order_type_display()} order - {line["description"]}'
+
+        # Perform deductions (items without enough stock are skipped)
+        transactions = apply_deductions(
+            deductions,
+            transaction_type='OUT',
+            reference_number=instance.order_number,
+            performed_by=instance.created_by.user if instance.created_by else None,
+            skip_insufficient=True
+        )
+
+        names = {item.id: item.name for item in packaging_items}
+        for item_transaction in transactions:
+            logger.info(
+                f"Order {instance.order_number}: Auto-deducted {item_transaction.quantity} "
+                f"of {names[item_transaction.inventory_id]}"
             )
 
-            # Update quantity
-            item.quantity -= Decimal(quantity)
-            item.save()
+    except Exception as e:
+        logger.error(f"Error auto-deducting utility items for order {instance.order_number}: {str(e)}")
 
-            logger.info(f"Order {instance.order_number}: Auto-deducted {quantity} {item.unit} of {item.name}")
 
-    except Exception as e:
-        logger.error(f"Error auto-deducting utility items for order {instance.order_number}: {str(e)}")
\ No newline at end of file
+def _order_delta(order, **extra):
+    """Minimal order-state payload pushed to live order streams"""
+    delta = {
+        'id': order.pk,
+        'order_number': order.order_number,
+        'branch_id': order.branch_id,
+        'table_id': order.table_id,
+        'order_type': order.order_type,
+        'status': order.status,
+        'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+    }
+    delta.update(extra)
+    return delta
+
+
+@receiver(post_save, sender=Order)
+def publish_order_change(sender, instance, created, **kwargs):
+    """Push the order's new state to live order streams once the change is committed"""
+    delta = _order_delta(instance, created=created)
+    transaction.on_commit(lambda: broker.publish('orders', delta))
+
+
+@receiver(post_delete, sender=Order)
+def publish_order_removal(sender, instance, **kwargs):
+    """Tell live order streams that an order is gone"""
+    delta = _order_delta(instance, deleted=True)
+    transaction.on_commit(lambda: broker.publish('orders', delta))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_station_routing(sender, instance, **kwargs):
+    """Drop the cached category -> station map whenever a category changes"""
+    invalidate_station_map()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_product_listings(sender, instance, **kwargs):
+    """Drop cached product listings (they include the category name)"""
+    from .viewsets import PRODUCTS_CACHE_NAMESPACE
+
+    invalidate(PRODUCTS_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=Inventory)
+def refresh_availability_on_stock_change(sender, instance, **kwargs):
+    """Recompute max servings for products that use this inventory item"""
+    refresh_for_inventory([instance.pk])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def refresh_availability_on_recipe_change(sender, instance, **kwargs):
+    """Recompute max servings for the product whose recipe changed"""
+    refresh_products([instance.recipe.product_id])
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def refresh_availability_on_ingredient_delete(sender, instance, **kwargs):
+    """Recompute after the delete commits; the product itself may be going away in the same cascade"""
+    product_id = instance.recipe.product_id
+
+    def refresh():
+        from .models import Product
+        refresh_products(Product.objects.filter(id=product_id).values_list('id', flat=True))
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_totals(sender, instance, **kwargs):
+    """Keep the order's stored totals in step with its items"""
+    instance.order.recalculate_totals()
+
+
+@receiver(post_save, sender=Payment)
+def refresh_sales_rollup_on_payment(sender, instance, **kwargs):
+    """Completed, voided and refunded payments change the paid sales of their order's day"""
+    refresh_order_day(instance.order)
+
+
+@receiver(post_save, sender=Order)
+def refresh_sales_rollup_on_order(sender, instance, created, **kwargs):
+    """Orders become sales when COMPLETED (often after the payment) and leave them when cancelled"""
+    if not created and instance.status in ['COMPLETED', 'CANCELLED']:
+        refresh_order_day(instance)
+
+
+@receiver(post_delete, sender=Payment)
+def refresh_sales_rollup_on_payment_delete(sender, instance, **kwargs):
+    """A deleted payment can take its order out of the paid sales"""
+    order = Order.objects.filter(id=instance.order_id).only('branch_id', 'created_at').first()
+    if order:
+        refresh_order_day(order)
+
+
+@receiver(post_delete, sender=Order)
+def refresh_sales_rollup_on_order_delete(sender, instance, **kwargs):
+    """Deleted orders leave the sales; the row is gone, but the instance still has its branch and date"""
+    refresh_order_day(instance)
+
+
+@receiver(post_save, sender=KitchenOrder)
+@receiver(post_delete, sender=KitchenOrder)
+@receiver(post_save, sender=BarOrder)
+@receiver(post_delete, sender=BarOrder)
+def refresh_kitchen_queue(sender, instance, **kwargs):
+    """Push ticket changes into the in-memory kitchen/bar display queues"""
+    station = kitchen_queue.KITCHEN if sender is KitchenOrder else kitchen_queue.BAR
+    ticket_id = instance.pk  # cleared on the instance once a delete finishes
+    transaction.on_commit(lambda: kitchen_queue.refresh_tickets(station, [ticket_id]))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_kitchen_queue_prep_time(sender, instance, **kwargs):
+    """Items added to or removed from a queued order change its estimated prep time"""
+    for station, ticket_id in kitchen_queue.tickets_for_order(instance.order_id):
+        transaction.on_commit(lambda station=station, ticket_id=ticket_id: kitchen_queue.refresh_tickets(station, [ticket_id]))
@@ -15,8 +15,9 @@ from decimal import Decimal
 from apps.restaurant.models import (
     Restaurant, Branch, Staff, StaffRole,
     Category, Product, Order, OrderItem, Table,
-    KitchenOrder, KitchenOrderItem
+    KitchenOrder, KitchenOrderItem, StationRouting
 )
+from apps.restaurant.services.station_routing import get_station_map
 from django.utils import timezone
 
 User = get_user_model()
@@ -735,3 +736,111 @@ class KitchenBarPrinterSeparationTest(TestCase):
 
         # Should generate bar PDF only
         # Should NOT generate kitchen PDF
+
+
+class StationRoutingTest(TestCase):
+    """Test that items are routed by the category station instead of keyword matching"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            email='cashier@test.com',
+            password='test123'
+        )
+        self.restaurant = Restaurant.objects.create(
+            name='Test Restaurant',
+            address='Test Address'
+        )
+        self.branch = Branch.objects.create(
+            restaurant=self.restaurant,
+            name='Main Branch',
+            address='Main Address'
+        )
+        self.cashier = Staff.objects.create(
+            user=self.user,
+            branch=self.branch,
+            role=StaffRole.CASHIER
+        )
+
+    def _order_with(self, *categories):
+        order = Order.objects.create(
+            branch=self.branch,
+            order_type='DINE_IN',
+            status='CONFIRMED',
+            created_by=self.cashier
+        )
+        for index, category in enumerate(categories):
+            product = Product.objects.create(
+                restaurant=self.restaurant,
+                category=category,
+                name=f'Product {index}',
+                price=Decimal('10000.00')
+            )
+            OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+        return order
+
+    def test_station_inferred_from_category_name(self):
+        """Blank stations default from the name; 'Dessert' and 'Steak' are not drinks"""
+        expected = {
+            'Makanan Utama': StationRouting.KITCHEN,
+            'Dessert': StationRouting.KITCHEN,
+            'Steak': StationRouting.KITCHEN,
+            'Minuman': StationRouting.BAR,
+            'Es Campur': StationRouting.BAR,
+            'Teh & Kopi': StationRouting.BAR,
+            'Iced Tea': StationRouting.BAR,
+            'Makanan & Minuman': StationRouting.BOTH,
+            'Signature': StationRouting.KITCHEN,
+        }
+        for name, station in expected.items():
+            category = Category.objects.create(restaurant=self.restaurant, name=name)
+            self.assertEqual(category.station, station, name)
+
+    def test_explicit_station_overrides_name(self):
+        """A category explicitly routed to BAR sends its items to the bar only"""
+        cocktails = Category.objects.create(
+            restaurant=self.restaurant,
+            name='Signature',
+            station=StationRouting.BAR
+        )
+        order = self._order_with(cocktails)
+
+        kitchen_items, bar_items = order.partition_items_by_station()
+        self.assertEqual(kitchen_items, [])
+        self.assertEqual(len(bar_items), 1)
+
+    def test_both_station_goes_to_kitchen_and_bar(self):
+        """BOTH items appear on both tickets; items without a category on neither"""
+        platter = Category.objects.create(
+            restaurant=self.restaurant,
+            name='Paket',
+            station=StationRouting.BOTH
+        )
+        order = self._order_with(platter, None)
+
+        kitchen_items, bar_items = order.partition_items_by_station()
+        self.assertEqual(len(kitchen_items), 1)
+        self.assertEqual(kitchen_items, bar_items)
+
+    def test_station_map_invalidated_on_category_change(self):
+        """Changing a category's station is picked up by the cached routing map"""
+        category = Category.objects.create(restaurant=self.restaurant, name='Minuman')
+        self.assertEqual(get_station_map()[category.id], StationRouting.BAR)
+
+        category.station = StationRouting.KITCHEN
+        category.save()
+        self.assertEqual(get_station_map()[category.id], StationRouting.KITCHEN)
+
+        category.delete()
+        self.assertNotIn(category.id, get_station_map())
+
+    def test_update_order_status_uses_single_items_query(self):
+        """Status update partitions items once, without per-item category queries"""
+        food = Category.objects.create(restaurant=self.restaurant, name='Makanan Utama')
+        drink = Category.objects.create(restaurant=self.restaurant, name='Minuman')
+        order = self._order_with(food, food, drink, drink)
+        get_station_map()
+
+        # One items query plus the kitchen_order / bar_order lookups
+        with self.assertNumQueries(3):
+            order.update_order_status()
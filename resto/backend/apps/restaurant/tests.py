@@ -1,11 +1,13 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from decimal import Decimal
+from django.utils import timezone
 from apps.restaurant.models import (
     Restaurant, Branch, Staff, StaffRole,
     Category, Product, Inventory, InventoryTransaction,
     Recipe, RecipeIngredient, StockTransfer,
-    Order, OrderItem, Payment, CashierSession, StaffSession, Schedule
+    Order, OrderItem, Payment, CashierSession, StaffSession, Schedule,
+    ProductAvailability
 )
 
 User = get_user_model()
@@ -1634,3 +1636,1214 @@ class OrderStockDeductionTestCase(TestCase):
         # No stock should be deducted
         self.kitchen_beras.refresh_from_db()
         self.assertEqual(self.kitchen_beras.quantity, initial_beras)
+
+
+    def test_deduction_engine_merges_shared_ingredients(self):
+        """Test a 10-item order is deducted with a handful of queries and one transaction per ingredient"""
+        from apps.restaurant.services.inventory_deduction import deduct_order_ingredients
+
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN', status='CONFIRMED')
+        for index in range(10):
+            product = self.nasi_goreng if index % 2 else self.ayam_goreng
+            OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+
+        # items, recipe ingredients, lock, update, availability refresh (3), bulk insert + savepoint
+        with self.assertNumQueries(10):
+            transactions, missing = deduct_order_ingredients(order, performed_by=self.user)
+
+        self.assertEqual(missing, [])
+        self.assertEqual(len(transactions), 4)
+        self.kitchen_minyak.refresh_from_db()
+        self.kitchen_ayam.refresh_from_db()
+        # 5 x 30ml + 5 x 50ml from a single merged line
+        self.assertEqual(self.kitchen_minyak.quantity, Decimal('9600.00'))
+        self.assertEqual(self.kitchen_ayam.quantity, Decimal('18500.00'))
+        self.assertEqual(
+            InventoryTransaction.objects.filter(inventory=self.kitchen_minyak, transaction_type='OUT').count(), 1
+        )
+
+    def test_deduction_engine_is_all_or_nothing(self):
+        """Test a shortage on one ingredient leaves every other ingredient untouched"""
+        from apps.restaurant.services.inventory_deduction import InsufficientStockError, deduct_order_ingredients
+
+        self.kitchen_bawang.quantity = Decimal('10.00')
+        self.kitchen_bawang.save()
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN', status='CONFIRMED')
+        OrderItem.objects.create(order=order, product=self.nasi_goreng, quantity=1, unit_price=self.nasi_goreng.price)
+
+        with self.assertRaises(InsufficientStockError) as context:
+            deduct_order_ingredients(order)
+
+        shortage, = context.exception.shortages
+        self.assertEqual(shortage['ingredient'], 'Bawang Merah')
+        self.assertEqual(shortage['products'], [('Nasi Goreng', 1)])
+        self.kitchen_beras.refresh_from_db()
+        self.assertEqual(self.kitchen_beras.quantity, Decimal('50000.00'))
+        self.assertFalse(InventoryTransaction.objects.filter(reference_number=order.order_number).exists())
+
+    def test_preparing_status_deducts_through_engine(self):
+        """Test moving an order to PREPARING deducts its recipe ingredients"""
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN', status='CONFIRMED')
+        OrderItem.objects.create(order=order, product=self.nasi_goreng, quantity=2, unit_price=self.nasi_goreng.price)
+
+        order.status = 'PREPARING'
+        order.save()
+
+        self.kitchen_beras.refresh_from_db()
+        self.assertEqual(self.kitchen_beras.quantity, Decimal('49500.00'))
+
+# =============================================================================
+# ORDER SERIALIZER QUERY TESTS
+# =============================================================================
+
+class OrderSerializerQueryTestCase(TestCase):
+    """Test order screens load in a constant number of queries"""
+
+    def setUp(self):
+        """Set up staff, a member customer and a menu"""
+        from apps.restaurant.models import Customer
+
+        self.user = User.objects.create_user(
+            email='waiter@example.com',
+            password='testpass123',
+            first_name='Waiter',
+            last_name='Test'
+        )
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.WAITRESS)
+        self.customer = Customer.objects.create(name='Member', phone_number='08120000000')
+        category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.products = [
+            Product.objects.create(restaurant=self.restaurant, category=category, name=f'Dish {index}', price=Decimal('10000.00'))
+            for index in range(3)
+        ]
+        self.client.force_login(self.user)
+
+    def create_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(
+                branch=self.branch,
+                order_type='DINE_IN',
+                status='PREPARING',
+                customer=self.customer,
+                created_by=self.staff,
+                order_taken_by=self.staff,
+                prepared_by=self.staff
+            )
+            for product in self.products:
+                OrderItem.objects.create(order=order, product=product, quantity=2, unit_price=product.price)
+            Payment.objects.create(order=order, amount=Decimal('60000.00'), payment_method='CASH', status='PENDING')
+
+    def count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_processing_query_count_is_constant(self):
+        """Test 1 and 100 processing orders cost the same number of queries"""
+        self.create_orders(1)
+        single, _ = self.count_queries('/api/orders/processing/')
+
+        self.create_orders(99)
+        many, data = self.count_queries('/api/orders/processing/')
+
+        self.assertEqual(many, single)
+        self.assertEqual(data['count'], 100)
+        order = data['results'][0]
+        self.assertEqual(len(order['items']), 3)
+        self.assertEqual(order['items'][0]['payment_status'], 'UNPAID')
+        self.assertEqual(order['payments'][0]['status'], 'PENDING')
+        self.assertEqual(order['customer_info']['name'], 'Member')
+        self.assertEqual(order['prepared_by_name'], 'Waiter Test')
+
+    def test_list_query_count_is_constant(self):
+        """Test the paginated order list does not grow with the page size"""
+        self.create_orders(1)
+        single, _ = self.count_queries('/api/orders/')
+
+        self.create_orders(19)
+        many, _ = self.count_queries('/api/orders/')
+        self.assertEqual(many, single)
+
+# =============================================================================
+# STORED ORDER TOTALS TESTS
+# =============================================================================
+
+class OrderTotalsTestCase(TestCase):
+    """Test stored order totals follow the items and feed the reports"""
+
+    def setUp(self):
+        """Set up a restaurant with 10% tax and two products"""
+        from apps.restaurant.models import RestaurantSettings
+
+        self.user = User.objects.create_user(email='manager@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        RestaurantSettings.objects.create(restaurant=self.restaurant, tax_rate=Decimal('10.00'))
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.MANAGER)
+        category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Nasi', price=Decimal('20000.00')
+        )
+        self.teh = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Teh', price=Decimal('5000.00')
+        )
+
+    def create_paid_order(self, *lines):
+        order = Order.objects.create(branch=self.branch, order_type='TAKEAWAY', status='COMPLETED')
+        for product, quantity in lines:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, unit_price=product.price)
+        Payment.objects.create(order=order, amount=order.total_amount, payment_method='CASH', status='COMPLETED')
+        return order
+
+    def test_totals_follow_item_changes(self):
+        """Test creating, editing and deleting items updates the stored totals"""
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        item = OrderItem.objects.create(
+            order=order, product=self.nasi, quantity=2, unit_price=Decimal('20000.00'), discount_amount=Decimal('5000.00')
+        )
+        OrderItem.objects.create(order=order, product=self.teh, quantity=1, unit_price=Decimal('5000.00'))
+
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal('45000.00'))
+        self.assertEqual(order.discount_total, Decimal('5000.00'))
+        self.assertEqual(order.tax_total, Decimal('4000.00'))
+        self.assertEqual(order.grand_total, Decimal('44000.00'))
+        self.assertEqual(order.total_amount, Decimal('40000.00'))
+
+        item.quantity = 1
+        item.save()
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal('5000.00'))
+        self.assertEqual(order.grand_total, Decimal('5500.00'))
+
+    def test_stale_order_refreshed_before_save_keeps_totals(self):
+        """Test an order loaded before its items changed keeps the totals once they are refreshed"""
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        stale = Order.objects.get(pk=order.pk)
+        OrderItem.objects.create(order=order, product=self.nasi, quantity=1, unit_price=self.nasi.price)
+
+        stale.refresh_from_db(fields=Order.TOTAL_FIELDS)
+        stale.status = 'PREPARING'
+        stale.save()
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'PREPARING')
+        self.assertEqual(order.subtotal, Decimal('20000.00'))
+
+    def test_order_save_has_default_semantics(self):
+        """Test a plain save writes every field and re-inserts a deleted row"""
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        Order.objects.filter(pk=order.pk).delete()
+
+        order.save()
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+
+    def test_sales_report_averages_per_order(self):
+        """Test average order value is per order rather than per item"""
+        self.create_paid_order((self.nasi, 1), (self.teh, 2))   # 30,000 over two items
+        self.create_paid_order((self.nasi, 1))                  # 20,000
+
+        self.client.force_login(self.user)
+        response = self.client.get('/api/reports/sales/?period=today')
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['summary']
+        self.assertEqual(summary['total_revenue'], 50000.0)
+        self.assertEqual(summary['total_orders'], 2)
+        self.assertEqual(summary['avg_order_value'], 25000.0)
+
+    def test_backfill_command_recomputes_totals(self):
+        """Test the backfill command restores totals written before the columns existed"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        order = self.create_paid_order((self.nasi, 3))
+        Order.objects.filter(pk=order.pk).update(subtotal=0, tax_total=0, grand_total=0)
+
+        call_command('backfill_order_totals', stdout=StringIO())
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal('60000.00'))
+        self.assertEqual(order.grand_total, Decimal('66000.00'))
+
+# =============================================================================
+# SALES ROLLUP TESTS
+# =============================================================================
+
+class SalesRollupTestCase(TestCase):
+    """Test daily sales rollups follow payments and back the report endpoints"""
+
+    def setUp(self):
+        """Set up a restaurant with two products"""
+        self.user = User.objects.create_user(email='reports@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.MANAGER)
+        category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Nasi', price=Decimal('20000.00')
+        )
+        self.teh = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Teh', price=Decimal('5000.00')
+        )
+
+    def create_paid_order(self, *lines):
+        order = Order.objects.create(branch=self.branch, order_type='TAKEAWAY', status='COMPLETED')
+        for product, quantity in lines:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, unit_price=product.price)
+        Payment.objects.create(order=order, amount=order.total_amount, payment_method='CASH', status='COMPLETED')
+        return order
+
+    def test_payment_and_refund_update_rollup(self):
+        """Test a completed payment adds the sale and a refund removes it"""
+        from apps.restaurant.models import DailySalesRollup, DailyProductSalesRollup
+
+        order = self.create_paid_order((self.nasi, 2), (self.teh, 1))
+        rollup = DailySalesRollup.objects.get(branch=self.branch, date=timezone.localdate())
+        self.assertEqual(rollup.revenue, Decimal('45000.00'))
+        self.assertEqual(rollup.orders_count, 1)
+        self.assertEqual(
+            DailyProductSalesRollup.objects.get(product=self.nasi).quantity_sold, 2
+        )
+
+        payment = order.payments.get()
+        payment.status = 'REFUNDED'
+        payment.save()
+        self.assertFalse(DailySalesRollup.objects.filter(branch=self.branch).exists())
+        self.assertFalse(DailyProductSalesRollup.objects.exists())
+
+    def test_order_completed_after_payment_is_counted(self):
+        """Test the POS flow (payment first, then order COMPLETED) lands in the rollup"""
+        from apps.restaurant.models import DailySalesRollup
+
+        order = Order.objects.create(branch=self.branch, order_type='TAKEAWAY', status='READY')
+        OrderItem.objects.create(order=order, product=self.nasi, quantity=1, unit_price=self.nasi.price)
+        Payment.objects.create(order=order, amount=order.total_amount, payment_method='CASH', status='COMPLETED')
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+        order.status = 'COMPLETED'
+        order.save()
+        self.assertEqual(DailySalesRollup.objects.get().revenue, Decimal('20000.00'))
+
+    def test_item_edit_on_paid_order_updates_rollup(self):
+        """Test changing an item of a completed, paid order rebuilds that day's rollup"""
+        from apps.restaurant.models import DailySalesRollup, DailyProductSalesRollup
+
+        order = self.create_paid_order((self.nasi, 1))
+        item = order.items.get()
+        item.quantity = 3
+        item.save()
+
+        self.assertEqual(DailySalesRollup.objects.get(branch=self.branch).revenue, Decimal('60000.00'))
+        self.assertEqual(DailyProductSalesRollup.objects.get(product=self.nasi).quantity_sold, 3)
+
+    def test_deleting_paid_order_removes_sale(self):
+        """Test deleting a paid order (and, by cascade, its payment) takes it out of the rollups"""
+        from apps.restaurant.models import DailySalesRollup, DailyProductSalesRollup
+
+        kept = self.create_paid_order((self.teh, 2))
+        deleted = self.create_paid_order((self.nasi, 1))
+        deleted.delete()
+
+        rollup = DailySalesRollup.objects.get(branch=self.branch, date=timezone.localdate())
+        self.assertEqual(rollup.revenue, Decimal('10000.00'))
+        self.assertEqual(rollup.orders_count, 1)
+        self.assertFalse(DailyProductSalesRollup.objects.filter(product=self.nasi).exists())
+
+        kept.payments.get().delete()
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+    def test_rebuild_command_restores_rollups(self):
+        """Test rebuild_sales_rollups recreates rows from orders"""
+        from django.core.management import call_command
+        from io import StringIO
+        from apps.restaurant.models import DailySalesRollup
+
+        self.create_paid_order((self.teh, 4))
+        DailySalesRollup.objects.all().delete()
+
+        call_command('rebuild_sales_rollups', '--days', '7', stdout=StringIO())
+        self.assertEqual(DailySalesRollup.objects.get().revenue, Decimal('20000.00'))
+
+    def test_reports_read_rollups(self):
+        """Test sales, products and trends come from the rollups with a fixed query count"""
+        self.create_paid_order((self.nasi, 1), (self.teh, 4))
+        self.create_paid_order((self.nasi, 2))
+        self.client.force_login(self.user)
+
+        sales = self.client.get('/api/reports/sales/?period=year').json()
+        self.assertEqual(sales['daily_breakdown'][0]['top_product'], 'Teh')
+        self.assertEqual(sales['daily_breakdown'][0]['orders'], 2)
+
+        products = self.client.get('/api/reports/products/?period=year').json()
+        self.assertEqual(products['top_products'][0]['product_name'], 'Teh')
+        self.assertEqual(products['top_products'][1]['revenue'], 60000.0)
+
+        trends = self.client.get('/api/reports/trends/?period=year').json()
+        self.assertEqual(trends['comparison']['current_period']['revenue'], 80000.0)
+
+        # session + user, sales/prev totals, expenses, daily series, top products
+        with self.assertNumQueries(7):
+            self.client.get('/api/reports/sales/?period=year')
+
+# =============================================================================
+# KITCHEN DISPLAY QUEUE TESTS
+# =============================================================================
+
+class KitchenQueueTestCase(TestCase):
+    """Test the in-memory kitchen/bar display queues and their delta feed"""
+
+    def setUp(self):
+        """Set up a branch with a quick and a slow dish"""
+        from apps.restaurant.services import kitchen_queue
+        kitchen_queue.rebuild_all()
+        self.addCleanup(kitchen_queue.rebuild_all)
+
+        self.user = User.objects.create_user(email='kitchen@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.KITCHEN)
+        category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Nasi Goreng',
+            price=Decimal('20000.00'), preparation_time=10
+        )
+        self.rendang = Product.objects.create(
+            restaurant=self.restaurant, category=category, name='Rendang',
+            price=Decimal('45000.00'), preparation_time=40
+        )
+
+    def create_ticket(self, product, priority=0):
+        from apps.restaurant.models import KitchenOrder
+
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+        return KitchenOrder.objects.create(order=order, priority=priority)
+
+    def queue(self, **params):
+        params['branch_id'] = self.branch.id
+        return self.client.get('/api/kitchen-orders/queue/', params).json()
+
+    def test_queue_orders_by_priority_time_and_prep_time(self):
+        """Test the queue loads from the database in priority, then age order"""
+        first = self.create_ticket(self.nasi, priority=1)
+        urgent = self.create_ticket(self.nasi, priority=5)
+        slow = self.create_ticket(self.rendang, priority=1)
+        self.client.force_login(self.user)
+
+        data = self.queue()
+        self.assertTrue(data['reset'])
+        self.assertEqual([entry['id'] for entry in data['orders']], [urgent.id, first.id, slow.id])
+        self.assertEqual(data['orders'][0]['estimated_prep_time'], 15)
+        self.assertEqual(data['orders'][2]['estimated_prep_time'], 40)
+
+    def test_changes_since_version(self):
+        """Test a client with the current version only receives later changes"""
+        ticket = self.create_ticket(self.nasi)
+        other = self.create_ticket(self.nasi)
+        self.client.force_login(self.user)
+        snapshot = self.queue()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.status = 'READY'
+            ticket.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderItem.objects.create(order=other.order, product=self.rendang, quantity=1, unit_price=self.rendang.price)
+        with self.captureOnCommitCallbacks(execute=True):
+            added = self.create_ticket(self.rendang)
+
+        data = self.queue(since=snapshot['version'], epoch=snapshot['epoch'])
+        self.assertFalse(data['reset'])
+        changes = {change['entry']['id']: change for change in data['changes']}
+        self.assertEqual(changes[ticket.id]['op'], 'remove')
+        self.assertEqual(changes[other.id]['entry']['estimated_prep_time'], 40)
+        self.assertEqual(changes[added.id]['op'], 'upsert')
+
+        self.assertEqual(self.queue(since=data['version'], epoch=data['epoch'])['changes'], [])
+
+    def test_unknown_version_gets_full_queue(self):
+        """Test a stale epoch or future version falls back to a full reset"""
+        self.create_ticket(self.nasi)
+        self.client.force_login(self.user)
+        snapshot = self.queue()
+
+        data = self.queue(since=snapshot['version'], epoch='other')
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['orders']), 1)
+        self.assertTrue(self.queue(since=snapshot['version'] + 10, epoch=snapshot['epoch'])['reset'])
+
+    def test_queue_polling_does_not_requery(self):
+        """Test polling a loaded queue only costs the session and user lookups"""
+        for _ in range(5):
+            self.create_ticket(self.nasi)
+        self.client.force_login(self.user)
+        snapshot = self.queue()
+
+        with self.assertNumQueries(2):
+            self.queue(since=snapshot['version'], epoch=snapshot['epoch'])
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/kitchen-orders/queue_summary/', {'branch_id': self.branch.id})
+        self.assertEqual(response.json()['total_orders'], 5)
+
+# =============================================================================
+# TICKET RENDERING JOB TESTS
+# =============================================================================
+
+class TicketRenderJobTestCase(TestCase):
+    """Test kitchen/bar ticket PDFs are rendered by the background job queue"""
+
+    def setUp(self):
+        """Set up a branch with a food and a drink product and a temporary media root"""
+        import shutil
+        import tempfile
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = media_root
+
+        self.user = User.objects.create_user(email='tickets@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.KITCHEN)
+        food = Category.objects.create(restaurant=self.restaurant, name='Makanan', station='KITCHEN')
+        drinks = Category.objects.create(restaurant=self.restaurant, name='Minuman', station='BAR')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=food, name='Nasi Goreng', price=Decimal('20000.00')
+        )
+        self.teh = Product.objects.create(
+            restaurant=self.restaurant, category=drinks, name='Teh Manis', price=Decimal('5000.00')
+        )
+
+    def create_order(self):
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        OrderItem.objects.create(order=order, product=self.nasi, quantity=2, unit_price=self.nasi.price)
+        OrderItem.objects.create(order=order, product=self.teh, quantity=1, unit_price=self.teh.price)
+        return order
+
+    def test_order_creation_queues_job_without_rendering(self):
+        """Test creating an order only queues a job; no PDF is written on the request"""
+        import os
+
+        order = self.create_order()
+        job = order.ticket_jobs.get()
+        self.assertEqual(job.status, 'PENDING')
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'kitchen_orders')))
+
+    def test_worker_renders_both_stations(self):
+        """Test the worker renders the kitchen and bar tickets and marks the job done"""
+        import os
+        from django.core.management import call_command
+        from io import StringIO
+
+        order = self.create_order()
+        call_command('render_tickets', '--once', stdout=StringIO())
+
+        job = order.ticket_jobs.get()
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.attempts, 1)
+        self.assertTrue(os.path.exists(job.kitchen_pdf))
+        self.assertTrue(os.path.exists(job.bar_pdf))
+        self.assertTrue(job.kitchen_pdf.startswith(os.path.join(self.media_root, 'kitchen_orders')))
+
+    def test_failed_render_is_retried_then_fails(self):
+        """Test a failing render backs off, retries and finally gives up"""
+        from unittest import mock
+        from apps.restaurant.services.ticket_rendering import process_jobs
+
+        order = self.create_order()
+        job = order.ticket_jobs.get()
+        job.max_attempts = 2
+        job.save()
+
+        with mock.patch('apps.restaurant.kitchen_printer.render_order_tickets', side_effect=OSError('disk full')):
+            process_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'PENDING')
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertEqual(process_jobs(), [])
+
+            job.run_after = timezone.now()
+            job.save()
+            process_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.last_error, 'disk full')
+
+    def test_job_status_api_and_retry(self):
+        """Test job status is listed per order and failed jobs can be requeued"""
+        order = self.create_order()
+        job = order.ticket_jobs.get()
+        self.client.force_login(self.user)
+
+        response = self.client.post(f'/api/ticket-jobs/{job.id}/retry/')
+        self.assertEqual(response.status_code, 400)
+
+        job.status = 'FAILED'
+        job.attempts = job.max_attempts
+        job.save()
+        response = self.client.post(f'/api/ticket-jobs/{job.id}/retry/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'PENDING')
+
+        data = self.client.get('/api/ticket-jobs/', {'order': order.id}).json()
+        results = data['results'] if isinstance(data, dict) else data
+        self.assertEqual([row['id'] for row in results], [job.id])
+        self.assertEqual(results[0]['order_number'], order.order_number)
+
+# =============================================================================
+# KITCHEN TICKET CATALOG TESTS
+# =============================================================================
+
+class KitchenTicketCatalogTestCase(TestCase):
+    """Test ticket listings come from the KitchenTicket catalog and old PDFs are archived"""
+
+    def setUp(self):
+        """Set up a branch, an order and a temporary media root"""
+        import shutil
+        import tempfile
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = media_root
+
+        self.user = User.objects.create_user(email='catalog@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.KITCHEN)
+        food = Category.objects.create(restaurant=self.restaurant, name='Makanan', station='KITCHEN')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=food, name='Nasi Goreng', price=Decimal('20000.00')
+        )
+
+    def create_order(self):
+        order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+        OrderItem.objects.create(order=order, product=self.nasi, quantity=1, unit_price=self.nasi.price)
+        return order
+
+    def write_ticket(self, order, days_ago):
+        """Write a fake kitchen PDF and catalog it as created `days_ago` days back"""
+        import os
+        from datetime import timedelta
+        from apps.restaurant.models import KitchenTicket
+
+        folder = os.path.join(self.media_root, 'kitchen_orders')
+        os.makedirs(folder, exist_ok=True)
+        sequence = KitchenTicket.objects.count()
+        filename = f'kitchen_order_{order.order_number}_{days_ago:08d}_{sequence:06d}.pdf'
+        with open(os.path.join(folder, filename), 'wb') as pdf:
+            pdf.write(b'%PDF-1.4')
+        return KitchenTicket.objects.create(
+            filename=filename, station='KITCHEN', order=order, branch=self.branch,
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_rendered_tickets_are_cataloged_and_listed(self):
+        """Test the worker catalogs each PDF and the list is a paginated, filtered query"""
+        from apps.restaurant.services.ticket_rendering import process_jobs
+
+        order = self.create_order()
+        self.create_order()
+        process_jobs()
+        self.client.force_login(self.user)
+
+        data = self.client.get('/api/kitchen-tickets/', {'order': order.id}).json()
+        self.assertEqual(data['count'], 1)
+        ticket = data['results'][0]
+        self.assertEqual(ticket['order_number'], order.order_number)
+        self.assertEqual(ticket['url'], f"/media/kitchen_orders/{ticket['filename']}")
+
+        today = timezone.localdate().isoformat()
+        self.assertEqual(self.client.get('/api/kitchen-tickets/', {'date': today}).json()['count'], 2)
+        self.assertEqual(self.client.get('/api/kitchen-tickets/', {'station': 'BAR'}).json()['count'], 0)
+        self.assertEqual(self.client.get(f"/api/kitchen-tickets/{ticket['filename']}/").json()['order'], order.id)
+
+        # session + user, count, page
+        with self.assertNumQueries(4):
+            self.client.get('/api/kitchen-tickets/')
+
+    def test_prune_archives_old_pdfs_per_day(self):
+        """Test old PDFs move into per-day tarballs and leave the default listing"""
+        import os
+        import tarfile
+        from django.core.management import call_command
+        from io import StringIO
+
+        order = self.create_order()
+        old_a = self.write_ticket(order, 40)
+        old_b = self.write_ticket(order, 40)
+        recent = self.write_ticket(order, 1)
+
+        call_command('prune_kitchen_tickets', '--days', '30', stdout=StringIO())
+
+        old_a.refresh_from_db()
+        old_b.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertIsNotNone(old_a.archived_at)
+        self.assertEqual(old_a.archive_name, old_b.archive_name)
+        self.assertIsNone(recent.archived_at)
+
+        folder = os.path.join(self.media_root, 'kitchen_orders')
+        self.assertFalse(os.path.exists(os.path.join(folder, old_a.filename)))
+        self.assertTrue(os.path.exists(os.path.join(folder, recent.filename)))
+        with tarfile.open(os.path.join(self.media_root, old_a.archive_name)) as archive:
+            self.assertEqual(sorted(archive.getnames()), sorted([old_a.filename, old_b.filename]))
+
+        self.client.force_login(self.user)
+        listed = self.client.get('/api/kitchen-tickets/').json()
+        self.assertEqual([row['id'] for row in listed['results']], [recent.id])
+        archived = self.client.get('/api/kitchen-tickets/', {'include_archived': 'true'}).json()
+        self.assertEqual(archived['count'], 3)
+
+    def test_index_existing_files(self):
+        """Test PDFs rendered before the catalog existed are cataloged and linked to their order"""
+        import os
+        from apps.restaurant.models import KitchenTicket
+        from apps.restaurant.services.ticket_catalog import index_existing_files
+
+        order = self.create_order()
+        ticket = self.write_ticket(order, 2)
+        ticket.delete()
+
+        self.assertEqual(index_existing_files(), 1)
+        self.assertEqual(index_existing_files(), 0)
+        indexed = KitchenTicket.objects.get()
+        self.assertEqual(indexed.order, order)
+        self.assertEqual(indexed.branch, self.branch)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'kitchen_orders', indexed.filename)))
+
+# =============================================================================
+# NETWORK PRINTER TESTS
+# =============================================================================
+
+class NetworkPrinterTestCase(TestCase):
+    """Test ESC/POS tickets reach network printers over pooled connections"""
+
+    def setUp(self):
+        """Set up a fake printer and a branch with a food and a drink product"""
+        from apps.restaurant.fake_printer import FakePrinterServer
+
+        self.printer = FakePrinterServer().start()
+        self.addCleanup(self.printer.stop)
+
+        self.user = User.objects.create_user(email='printer@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.MANAGER)
+        food = Category.objects.create(restaurant=self.restaurant, name='Makanan', station='KITCHEN')
+        drinks = Category.objects.create(restaurant=self.restaurant, name='Minuman', station='BAR')
+        self.nasi = Product.objects.create(
+            restaurant=self.restaurant, category=food, name='Nasi Goreng', price=Decimal('20000.00')
+        )
+        self.teh = Product.objects.create(
+            restaurant=self.restaurant, category=drinks, name='Teh Manis', price=Decimal('5000.00')
+        )
+
+    def pool(self):
+        from apps.restaurant.services.network_printer import PrinterPool
+
+        pool = PrinterPool()
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_render_ticket_escpos(self):
+        """Test tickets encode to ESC/POS with init, bold title and a paper cut"""
+        from apps.restaurant.services import escpos
+
+        data = escpos.render_ticket(
+            {'order_number': 'ORD-1', 'order_type': 'DINE_IN', 'table_number': '7', 'priority': 10,
+             'created_at': timezone.now()},
+            [{'quantity': 2, 'product_name': 'Nasi Goreng', 'notes': 'pedas'}],
+            title='BAR ORDER'
+        )
+        self.assertTrue(data.startswith(escpos.INITIALIZE))
+        self.assertTrue(data.endswith(escpos.FEED_AND_CUT))
+        self.assertIn(escpos.BOLD_ON + escpos.DOUBLE_HEIGHT_ON, data)
+        self.assertIn(b'2X NASI GORENG', data)
+        self.assertIn(b'RUSH (10)', data)
+        self.assertNotIn(b'CUT HERE', data)
+
+    def test_jobs_share_one_persistent_connection(self):
+        """Test consecutive tickets reuse the printer connection"""
+        pool = self.pool()
+        first = pool.submit(self.printer.address, b'one' + b'\x1dVB\x03', port=self.printer.port)
+        self.assertTrue(first.wait(5))
+        second = pool.submit(self.printer.address, b'two' + b'\x1dVB\x03', port=self.printer.port)
+        self.assertTrue(second.wait(5))
+
+        self.assertTrue(first.sent and second.sent)
+        self.assertEqual(len(self.printer.wait_for_tickets(2)), 2)
+        self.assertEqual(self.printer.connections, 1)
+
+    def test_reconnects_after_printer_drops_connection(self):
+        """Test a printer power cycle costs a reconnect, not a ticket"""
+        pool = self.pool()
+        job = pool.submit(self.printer.address, b'one' + b'\x1dVB\x03', port=self.printer.port)
+        self.assertTrue(job.wait(5))
+        self.printer.wait_for_tickets(1)
+        self.printer.drop_connections()
+
+        job = pool.submit(self.printer.address, b'two' + b'\x1dVB\x03', port=self.printer.port)
+        self.assertTrue(job.wait(5))
+        self.assertTrue(job.sent)
+        self.assertEqual(len(self.printer.wait_for_tickets(2)), 2)
+        self.assertEqual(pool.channel(self.printer.address, self.printer.port).connects, 2)
+
+    def test_unreachable_printer_gives_up_after_backoff(self):
+        """Test sends to a dead printer retry with backoff, then report the error"""
+        from unittest import mock
+        from apps.restaurant.services import network_printer
+
+        port = self.printer.port
+        self.printer.stop()
+        pool = self.pool()
+        with mock.patch.object(network_printer, 'BACKOFF_BASE', 0.01), \
+                mock.patch.object(network_printer, 'MAX_ATTEMPTS', 3):
+            job = pool.submit('127.0.0.1', b'lost', port=port)
+            self.assertTrue(job.wait(5))
+        self.assertFalse(job.sent)
+        self.assertEqual(job.attempts, 3)
+
+    def test_order_tickets_sent_to_configured_printers(self):
+        """Test a new order's kitchen and bar tickets go to their printers after commit"""
+        from unittest import mock
+        from apps.restaurant.models import RestaurantSettings
+        from apps.restaurant.services import network_printer
+
+        RestaurantSettings.objects.create(
+            restaurant=self.restaurant, kitchen_printer_ip='127.0.0.1', bar_printer_ip='127.0.0.1'
+        )
+        self.addCleanup(network_printer.pool.close)
+
+        with mock.patch.object(network_printer, 'PRINTER_PORT', self.printer.port):
+            with self.captureOnCommitCallbacks(execute=True):
+                order = Order.objects.create(branch=self.branch, order_type='DINE_IN')
+                OrderItem.objects.create(order=order, product=self.nasi, quantity=1, unit_price=self.nasi.price)
+                OrderItem.objects.create(order=order, product=self.teh, quantity=1, unit_price=self.teh.price)
+            tickets = self.printer.wait_for_tickets(2)
+
+        self.assertEqual(len(tickets), 2)
+        kitchen = next(ticket for ticket in tickets if b'KITCHEN ORDER' in ticket)
+        bar = next(ticket for ticket in tickets if b'BAR ORDER' in ticket)
+        self.assertIn(b'NASI GORENG', kitchen)
+        self.assertNotIn(b'TEH MANIS', kitchen)
+        self.assertIn(b'TEH MANIS', bar)
+        self.assertIn(order.order_number.encode(), bar)
+
+    def test_printer_check_endpoint(self):
+        """Test test_printer connects to the print port instead of pinging, ignoring client-supplied ports"""
+        from unittest import mock
+        from apps.restaurant.services import network_printer
+
+        self.client.force_login(self.user)
+        response = self.client.post(
+            '/api/settings/test_printer/', {'ip_address': '127.0.0.1', 'port': self.printer.port}
+        )
+        self.assertEqual(response.json()['port'], network_printer.PRINTER_PORT)
+
+        with mock.patch.object(network_printer, 'PRINTER_PORT', self.printer.port):
+            response = self.client.post('/api/settings/test_printer/', {'ip_address': '127.0.0.1'})
+            self.assertTrue(response.json()['success'])
+
+            self.printer.stop()
+            response = self.client.post('/api/settings/test_printer/', {'ip_address': '127.0.0.1'})
+            self.assertFalse(response.json()['success'])
+
+# =============================================================================
+# SQLITE TUNING TESTS
+# =============================================================================
+
+class SQLiteTuningTestCase(TestCase):
+    """Test SQLite connections are tuned from settings.SQLITE_PRAGMAS"""
+
+    def test_pragmas_applied_to_connection(self):
+        """Test busy timeout and temp store PRAGMAs are set on the connection"""
+        from django.conf import settings
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+
+# =============================================================================
+# REPORT INDEX TESTS
+# =============================================================================
+
+class ReportIndexTestCase(TestCase):
+    """Test dashboard and report filters are answered from composite indexes"""
+
+    def setUp(self):
+        """Set up a branch with one order and payment today and one yesterday"""
+        from datetime import timedelta
+
+        self.user = User.objects.create_user(email='indexes@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.MANAGER)
+
+        self.today_order = Order.objects.create(branch=self.branch, order_type='TAKEAWAY', status='PENDING')
+        Payment.objects.create(order=self.today_order, amount=Decimal('10000.00'), payment_method='CASH', status='COMPLETED')
+        yesterday_order = Order.objects.create(branch=self.branch, order_type='TAKEAWAY', status='PENDING')
+        yesterday_payment = Payment.objects.create(
+            order=yesterday_order, amount=Decimal('7000.00'), payment_method='CASH', status='COMPLETED'
+        )
+        yesterday = timezone.now() - timedelta(days=1)
+        Order.objects.filter(id=yesterday_order.id).update(created_at=yesterday)
+        Payment.objects.filter(id=yesterday_payment.id).update(created_at=yesterday)
+
+        self.start = timezone.now() - timedelta(days=30)
+        self.end = timezone.now()
+
+    def assertUsesIndex(self, queryset, model, fields):
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN is SQLite syntax')
+        name = next(index.name for index in model._meta.indexes if index.fields == fields)
+        self.assertIn(f'USING INDEX {name}', queryset.explain())
+
+    def test_dashboard_filters_use_indexes(self):
+        """Test the summary's order and payment filters search the (.., created_at) indexes"""
+        self.assertUsesIndex(
+            Order.objects.filter(branch=self.branch, created_at__gte=self.start, created_at__lt=self.end),
+            Order, ['branch', 'created_at']
+        )
+        self.assertUsesIndex(
+            Payment.objects.filter(
+                order__branch=self.branch, created_at__gte=self.start, created_at__lt=self.end, status='COMPLETED'
+            ),
+            Payment, ['status', 'created_at']
+        )
+
+    def test_report_filters_use_indexes(self):
+        """Test paid-order and expense report filters use their indexes"""
+        from apps.restaurant.services.sales_rollup import paid_orders
+
+        self.assertUsesIndex(paid_orders(self.start.date(), self.end.date()), Order, ['status', 'created_at'])
+        self.assertUsesIndex(
+            InventoryTransaction.objects.filter(
+                created_at__gte=self.start, created_at__lt=self.end, transaction_type__in=['IN', 'ADJUST']
+            ),
+            InventoryTransaction, ['transaction_type', 'created_at']
+        )
+
+    def test_dashboard_summary_counts_only_today(self):
+        """Test the created_at range still selects exactly today's orders and payments"""
+        self.client.force_login(self.user)
+
+        response = self.client.get(f'/api/dashboard/summary/?branch_id={self.branch.id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_orders_today'], 1)
+        self.assertEqual(Decimal(response.data['total_revenue_today']), Decimal('10000.00'))
+        self.assertEqual(response.data['pending_orders'], 1)
+
+
+# =============================================================================
+# QUERY BUDGET TESTS
+# =============================================================================
+
+class QueryBudgetTestCase(TestCase):
+    """Test the per-request query budget middleware and assert_max_queries"""
+
+    ENABLED = {'ENABLED': True, 'MAX_QUERIES': 1000, 'MAX_DB_MS': 10000, 'REPEAT_THRESHOLD': 1000}
+
+    def setUp(self):
+        """Set up a logged-in manager with a few products"""
+        self.user = User.objects.create_user(email='budget@example.com', password='testpass123')
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.staff = Staff.objects.create(user=self.user, branch=self.branch, role=StaffRole.MANAGER)
+        category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.products = [
+            Product.objects.create(
+                restaurant=self.restaurant, category=category, name=f'Product {number}', price=Decimal('10000.00')
+            )
+            for number in range(12)
+        ]
+        self.client.force_login(self.user)
+
+    def test_disabled_middleware_is_skipped(self):
+        """Test the middleware is dropped from the chain when not enabled"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET={**self.ENABLED, 'ENABLED': False}):
+            response = self.client.get('/api/restaurants/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_server_timing_header(self):
+        """Test the query count and database time are reported in Server-Timing"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET=self.ENABLED):
+            response = self.client.get('/api/restaurants/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    def test_over_budget_request_is_logged(self):
+        """Test a request over MAX_QUERIES logs a warning naming the endpoint"""
+        from django.test import override_settings
+
+        with override_settings(QUERY_BUDGET={**self.ENABLED, 'MAX_QUERIES': 0}):
+            with self.assertLogs('core.querybudget', level='WARNING') as logs:
+                self.client.get('/api/restaurants/')
+
+        self.assertIn('GET /api/restaurants/', logs.output[0])
+
+    def test_repeated_queries_are_grouped(self):
+        """Test an N+1 loop is reported as one shape with the calling code"""
+        from core.querybudget import QueryRecorder
+
+        recorder = QueryRecorder(repeat_threshold=10)
+        with recorder.record():
+            for product in self.products:
+                Product.objects.get(id=product.id)
+
+        (shape, count), = recorder.repeated()
+        self.assertEqual(count, 12)
+        self.assertIn('tests.py', recorder.samples[shape])
+
+    def test_assert_max_queries(self):
+        """Test assert_max_queries passes within the limit and fails above it"""
+        from core.querybudget import assert_max_queries
+
+        with assert_max_queries(1):
+            list(Product.objects.all())
+        with self.assertRaises(AssertionError):
+            with assert_max_queries(1):
+                list(Product.objects.all())
+                list(Category.objects.all())
+
+
+# =============================================================================
+# CACHED ENDPOINT TESTS
+# =============================================================================
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'caching-tests'}
+})
+class CachedEndpointTestCase(TestCase):
+    """Test the available-products listing is cached and invalidated by product changes"""
+
+    def setUp(self):
+        """Set up a restaurant with one available product, on a private in-memory cache"""
+        from django.core.cache import cache
+        cache.clear()
+
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+        self.product = Product.objects.create(
+            restaurant=self.restaurant, category=self.category, name='Nasi Goreng', price=Decimal('25000.00')
+        )
+        self.user = User.objects.create_user(email='cache@example.com', password='testpass123')
+        self.client.force_login(self.user)
+
+    def test_available_products_cached_until_product_changes(self):
+        """Test the listing is served without queries until a product is saved"""
+        response = self.client.get('/api/products/available/')
+        self.assertEqual([row['name'] for row in response.json()], ['Nasi Goreng'])
+
+        # session + user only
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/products/available/').json(), response.json())
+
+        self.product.is_available = False
+        self.product.save()
+        self.assertEqual(self.client.get('/api/products/available/').json(), [])
+
+    def test_category_rename_invalidates_listing(self):
+        """Test renaming a category refreshes the category_name in the cached listing"""
+        self.client.get('/api/products/available/')
+
+        self.category.name = 'Rice Dishes'
+        self.category.save()
+
+        response = self.client.get('/api/products/available/')
+        self.assertEqual(response.json()[0]['category_name'], 'Rice Dishes')
+
+    def test_scoped_invalidation(self):
+        """Test invalidating one branch scope leaves the others cached"""
+        from core.caching import namespaced_key, invalidate
+
+        branch_1 = namespaced_key('test:menu', 'list', scope=1)
+        branch_2 = namespaced_key('test:menu', 'list', scope=2)
+
+        invalidate('test:menu', scope=1)
+        self.assertNotEqual(namespaced_key('test:menu', 'list', scope=1), branch_1)
+        self.assertEqual(namespaced_key('test:menu', 'list', scope=2), branch_2)
+
+
+# =============================================================================
+# LIVE ORDER STREAM TESTS
+# =============================================================================
+
+class OrderStreamTestCase(TestCase):
+    """Test the Server-Sent Events order stream"""
+
+    def setUp(self):
+        """Set up a staff user with one processing order"""
+        self.user = User.objects.create_user(
+            email='stream@example.com',
+            password='testpass123',
+            first_name='Stream',
+            last_name='Test'
+        )
+        self.restaurant = Restaurant.objects.create(
+            name='Test Restaurant',
+            address='Test Address'
+        )
+        self.branch = Branch.objects.create(
+            restaurant=self.restaurant,
+            name='Main Branch',
+            address='Main Address'
+        )
+        self.other_branch = Branch.objects.create(
+            restaurant=self.restaurant,
+            name='Second Branch',
+            address='Second Address'
+        )
+        self.staff = Staff.objects.create(
+            user=self.user,
+            branch=self.branch,
+            role=StaffRole.CASHIER,
+            phone='08123456780'
+        )
+        self.order = Order.objects.create(
+            branch=self.branch,
+            order_type='TAKEAWAY',
+            status='CONFIRMED'
+        )
+
+    async def test_stream_requires_authentication(self):
+        """Test anonymous clients are rejected by the auth middleware"""
+        response = await self.async_client.get('/api/orders/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_sends_snapshot_then_branch_deltas(self):
+        """Test the stream opens with processing orders and then pushes only this branch's changes"""
+        from core.events import broker
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/api/orders/stream/?branch_id={self.branch.id}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = aiter(response.streaming_content)
+        snapshot = (await anext(events)).decode()
+        self.assertIn('event: snapshot', snapshot)
+        self.assertIn(self.order.order_number, snapshot)
+
+        # on_commit never fires inside a test transaction, so publish directly
+        broker.publish('orders', {'id': 999, 'branch_id': self.other_branch.id, 'status': 'READY'})
+        broker.publish('orders', {'id': self.order.id, 'branch_id': self.branch.id, 'status': 'PREPARING'})
+
+        update = (await anext(events)).decode()
+        self.assertIn('event: order', update)
+        self.assertIn(f'"id": {self.order.id}', update)
+        self.assertIn('"status": "PREPARING"', update)
+        await events.aclose()
+
+    def test_stream_under_wsgi_sends_snapshot_and_closes(self):
+        """Test a WSGI-served stream returns the snapshot with a retry hint instead of hanging"""
+        self.client.force_login(self.user)
+        response = self.client.get(f'/api/orders/stream/?branch_id={self.branch.id}')
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('retry: 15000'))
+        self.assertIn('event: snapshot', body)
+        self.assertIn(self.order.order_number, body)
+
+    def test_order_save_publishes_delta_on_commit(self):
+        """Test saving an order queues a delta for live streams"""
+        from unittest.mock import patch
+
+        with patch('apps.restaurant.signals.broker') as mock_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.order.status = 'PREPARING'
+                self.order.save()
+
+        mock_broker.publish.assert_called_once()
+        channel, delta = mock_broker.publish.call_args[0]
+        self.assertEqual(channel, 'orders')
+        self.assertEqual(delta['status'], 'PREPARING')
+        self.assertFalse(delta['created'])
+
+
+# =============================================================================
+# PRODUCT AVAILABILITY TESTS
+# =============================================================================
+
+class ProductAvailabilityTestCase(TestCase):
+    """Test the maintained max-servings matrix behind check_stock_availability"""
+
+    def setUp(self):
+        """Set up two products sharing one ingredient"""
+        self.restaurant = Restaurant.objects.create(name='Test Restaurant', address='Test Address')
+        self.branch = Branch.objects.create(restaurant=self.restaurant, name='Main Branch', address='Main Address')
+        self.category = Category.objects.create(restaurant=self.restaurant, name='Main Dishes')
+
+        self.nasi_goreng = Product.objects.create(
+            restaurant=self.restaurant, category=self.category, name='Nasi Goreng', price=Decimal('25000.00')
+        )
+        self.es_teh = Product.objects.create(
+            restaurant=self.restaurant, category=self.category, name='Es Teh', price=Decimal('5000.00')
+        )
+        self.beras = Inventory.objects.create(
+            branch=self.branch, name='Beras', unit='gram', quantity=Decimal('1000.00'), location='KITCHEN'
+        )
+        self.minyak = Inventory.objects.create(
+            branch=self.branch, name='Minyak', unit='ml', quantity=Decimal('100.00'), location='KITCHEN'
+        )
+        recipe = Recipe.objects.create(product=self.nasi_goreng, branch=self.branch)
+        RecipeIngredient.objects.create(recipe=recipe, inventory_item=self.beras, quantity=Decimal('250'), unit='gram')
+        RecipeIngredient.objects.create(recipe=recipe, inventory_item=self.minyak, quantity=Decimal('30'), unit='ml')
+
+    def test_max_servings_limited_by_scarcest_ingredient(self):
+        """Test 1000g rice / 250g and 100ml oil / 30ml gives 3 servings"""
+        availability = ProductAvailability.objects.get(product=self.nasi_goreng)
+        self.assertEqual(availability.max_servings, 3)
+        self.assertTrue(availability.can_be_made)
+
+    def test_stock_change_refreshes_only_dependent_products(self):
+        """Test saving an ingredient updates the products that use it"""
+        self.minyak.quantity = Decimal('20.00')
+        self.minyak.save()
+
+        availability = ProductAvailability.objects.get(product=self.nasi_goreng)
+        self.assertEqual(availability.max_servings, 0)
+        self.assertEqual(availability.insufficient_ingredients[0]['name'], 'Minyak')
+        self.assertFalse(ProductAvailability.objects.filter(product=self.es_teh).exists())
+
+    def test_check_stock_availability_reads_matrix(self):
+        """Test the endpoint returns max_servings and fills products without a row"""
+        user = User.objects.create_user(email='pos@example.com', password='testpass123')
+        self.client.force_login(user)
+        response = self.client.get('/api/products/check_stock_availability/')
+        self.assertEqual(response.status_code, 200)
+        rows = {row['name']: row for row in response.json()}
+        self.assertEqual(rows['Nasi Goreng']['max_servings'], 3)
+        self.assertIsNone(rows['Es Teh']['max_servings'])
+        self.assertTrue(rows['Es Teh']['can_be_made'])
+
+        # Every product now has a row: session, user and one product query
+        with self.assertNumQueries(3):
+            self.client.get('/api/products/check_stock_availability/')
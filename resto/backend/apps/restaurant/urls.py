@@ -9,10 +9,11 @@ from .viewsets import (
     RecipeViewSet, RecipeIngredientViewSet, PurchaseOrderViewSet, PurchaseOrderItemViewSet,
     StockTransferViewSet, VendorViewSet,
     CustomerViewSet, LoyaltyTransactionViewSet, RewardViewSet, CustomerFeedbackViewSet, MembershipTierBenefitViewSet,
-    KitchenTicketViewSet, RestaurantSettingsViewSet
+    KitchenTicketViewSet, TicketRenderJobViewSet, RestaurantSettingsViewSet
 )
 from .reports import ReportViewSet
 from .views.license import validate_license, get_license_status
+from .views.stream import order_updates
 
 router = DefaultRouter()
 router.register(r'restaurants', RestaurantViewSet)
@@ -47,11 +48,14 @@ router.register(r'rewards', RewardViewSet)
 router.register(r'feedback', CustomerFeedbackViewSet)
 router.register(r'tier-benefits', MembershipTierBenefitViewSet)
 router.register(r'kitchen-tickets', KitchenTicketViewSet, basename='kitchen-tickets')
+router.register(r'ticket-jobs', TicketRenderJobViewSet)
 router.register(r'settings', RestaurantSettingsViewSet, basename='settings')
 
 app_name = 'restaurant'
 
 urlpatterns = [
+    # Live order stream (must precede the router so 'stream' isn't taken as an order pk)
+    path('orders/stream/', order_updates, name='order-stream'),
     path('', include(router.urls)),
     # License validation endpoints
     path('validate-license/', validate_license, name='validate-license'),
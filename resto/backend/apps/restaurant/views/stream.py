@@ -0,0 +1,92 @@
+"""
+Server-Sent Events stream of order-state changes.
+Served by the ASGI application in core/asgi.py so kitchen, bar and cashier
+screens can stop polling OrderViewSet.processing.
+Under WSGI the view sends the snapshot and closes (see core.events).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from core.events import broker, format_sse, format_sse_retry, is_asgi_request, SSE_KEEPALIVE
+from ..models import Order
+
+
+PROCESSING_STATUSES = ['PREPARING', 'CONFIRMED']
+
+
+def _processing_snapshot(branch_id):
+    """Today's processing orders in the same shape as the pushed deltas"""
+    queryset = Order.objects.filter(
+        created_at__date=timezone.now().date(),
+        status__in=PROCESSING_STATUSES
+    )
+    if branch_id:
+        queryset = queryset.filter(branch_id=branch_id)
+
+    return [
+        {
+            'id': order['id'],
+            'order_number': order['order_number'],
+            'branch_id': order['branch_id'],
+            'table_id': order['table_id'],
+            'order_type': order['order_type'],
+            'status': order['status'],
+            'updated_at': order['updated_at'].isoformat(),
+        }
+        for order in queryset.order_by('-created_at').values(
+            'id', 'order_number', 'branch_id', 'table_id', 'order_type', 'status', 'updated_at'
+        )
+    ]
+
+
+async def _order_events(branch_id, keepalive):
+    subscription = broker.subscribe(['orders'])
+    try:
+        snapshot = await sync_to_async(_processing_snapshot)(branch_id)
+        yield format_sse('snapshot', {'orders': snapshot})
+
+        while True:
+            event = await subscription.get(timeout=keepalive)
+            if event is None:
+                yield SSE_KEEPALIVE
+                continue
+
+            event_id, _, delta = event
+            if branch_id and str(delta.get('branch_id')) != str(branch_id):
+                continue
+            yield format_sse('order', delta, event_id)
+    finally:
+        subscription.close()
+
+
+async def order_updates(request):
+    """
+    Stream order-state deltas as Server-Sent Events
+    Endpoint: /api/orders/stream/?branch_id=<id>
+
+    Events:
+    - snapshot: today's PREPARING/CONFIRMED orders on connect
+    - order: one changed order (created, status change, deleted)
+
+    Under WSGI only the snapshot is sent, with a retry hint, and the connection
+    closes; EventSource reconnects and so polls instead.
+
+    Authentication and staff checks are applied by core.middleware.
+    """
+    branch_id = request.GET.get('branch_id')
+
+    if is_asgi_request(request):
+        keepalive = getattr(settings, 'SSE_KEEPALIVE_SECONDS', 15)
+        response = StreamingHttpResponse(_order_events(branch_id, keepalive), content_type='text/event-stream')
+    else:
+        snapshot = await sync_to_async(_processing_snapshot)(branch_id)
+        response = HttpResponse(
+            format_sse_retry(getattr(settings, 'SSE_WSGI_RETRY_SECONDS', 15))
+            + format_sse('snapshot', {'orders': snapshot}),
+            content_type='text/event-stream'
+        )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,14 +4,14 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, Prefetch
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from .models import (
     Restaurant, Branch, Staff,
     Category, Product, Inventory, InventoryTransaction, InventoryBatch,
     Order, OrderItem, Payment, Table,
-    KitchenOrder, KitchenOrderItem, BarOrder, BarOrderItem,
+    KitchenOrder, KitchenOrderItem, BarOrder, BarOrderItem, TicketRenderJob, KitchenTicket,
     Promotion, Schedule, Report, CashierSession, StaffSession,
     Recipe, RecipeIngredient, PurchaseOrder, PurchaseOrderItem,
     StockTransfer,
@@ -24,7 +24,7 @@ from .serializers import (
     InventoryTransactionSerializer, InventoryBatchSerializer, OrderSerializer, OrderCreateSerializer,
     OrderItemSerializer, PaymentSerializer, TableSerializer,
     KitchenOrderSerializer, KitchenOrderItemSerializer,
-    BarOrderSerializer, BarOrderItemSerializer,
+    BarOrderSerializer, BarOrderItemSerializer, TicketRenderJobSerializer, KitchenTicketSerializer,
     PromotionSerializer, ScheduleSerializer, ReportSerializer,
     DashboardSerializer, CashierSessionSerializer, CashierSessionOpenSerializer,
     CashierSessionCloseSerializer, StaffSessionSerializer, StaffSessionCreateSerializer,
@@ -36,6 +36,10 @@ from .serializers import (
     RestaurantSettingsSerializer
 )
 from .permissions import IsManagerOrAdmin, IsKitchenStaff, IsWarehouseStaff
+from core.caching import cached_endpoint
+
+
+PRODUCTS_CACHE_NAMESPACE = 'resto:products'
 
 
 class RestaurantViewSet(viewsets.ModelViewSet):
@@ -111,7 +115,9 @@ class ProductViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'price', 'created_at']
 
     @action(detail=False, methods=['get'])
+    @cached_endpoint(300, PRODUCTS_CACHE_NAMESPACE)
     def available(self, request):
+        """Available products; cached until a product or category changes"""
         available_products = self.get_queryset().filter(is_available=True)
         serializer = self.get_serializer(available_products, many=True)
         return Response(serializer.data)
@@ -119,44 +125,24 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def check_stock_availability(self, request):
         """Check which products can be made based on current kitchen stock"""
-        from .models import Recipe
+        from .services.product_availability import availability_for
 
-        products = self.get_queryset().filter(is_available=True)
+        products = list(self.get_queryset().filter(is_available=True).select_related('category', 'availability'))
+        availability = availability_for(products)
         product_availability = []
 
         for product in products:
-            availability_info = {
+            row = availability[product.id]
+            product_availability.append({
                 'id': product.id,
                 'name': product.name,
                 'price': product.price,
                 'category': product.category.name if product.category else None,
                 'image': product.image.url if product.image else None,
-                'can_be_made': True,
-                'insufficient_ingredients': []
-            }
-
-            try:
-                recipe = product.recipe
-
-                # Check each ingredient availability for 1 serving
-                for recipe_ingredient in recipe.ingredients.all():
-                    inventory_item = recipe_ingredient.inventory_item
-                    quantity_needed = float(recipe_ingredient.quantity)
-
-                    if inventory_item.quantity < quantity_needed:
-                        availability_info['can_be_made'] = False
-                        availability_info['insufficient_ingredients'].append({
-                            'name': inventory_item.name,
-                            'needed': quantity_needed,
-                            'available': float(inventory_item.quantity),
-                            'unit': inventory_item.unit
-                        })
-
-            except Recipe.DoesNotExist:
-                # Product doesn't have a recipe - assume it can be made
-                availability_info['can_be_made'] = True
-
-            product_availability.append(availability_info)
+                'can_be_made': row.can_be_made,
+                'max_servings': row.max_servings,
+                'insufficient_ingredients': row.insufficient_ingredients
+            })
 
         return Response(product_availability)
 
@@ -426,6 +412,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['branch', 'order_type', 'status', 'table']
     ordering = ['-created_at']
+    item_write_actions = ['add_item', 'serve_items', 'split_bill']
 
     def get_queryset(self):
         """
@@ -444,6 +431,18 @@ class OrderViewSet(viewsets.ModelViewSet):
             today = timezone.now().date()
             queryset = queryset.filter(created_at__date=today)
 
+        queryset = queryset.select_related(
+            'table', 'customer',
+            'created_by__user', 'order_taken_by__user', 'prepared_by__user', 'served_by__user'
+        )
+
+        # Load everything OrderSerializer reads in a fixed number of queries;
+        # actions that change items keep reading them live
+        if self.action not in self.item_write_actions:
+            queryset = queryset.prefetch_related(
+                Prefetch('items', queryset=OrderItem.objects.select_related('product__category')),
+                'payments'
+            )
         return queryset
 
     def get_permissions(self):
@@ -514,14 +513,14 @@ class OrderViewSet(viewsets.ModelViewSet):
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
 
-        orders = queryset.order_by('-created_at')
+        orders = list(queryset.order_by('-created_at'))
         serializer = self.get_serializer(orders, many=True)
 
-        # Calculate total amount
+        # Calculate total amount from the stored order totals
         total_amount = sum(order.total_amount for order in orders)
 
         return Response({
-            'count': orders.count(),
+            'count': len(orders),
             'total_amount': float(total_amount),
             'results': serializer.data
         })
@@ -536,11 +535,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
 
-        orders = queryset.order_by('-created_at')
+        orders = list(queryset.order_by('-created_at'))
         serializer = self.get_serializer(orders, many=True)
 
         return Response({
-            'count': orders.count(),
+            'count': len(orders),
             'results': serializer.data
         })
 
@@ -1036,7 +1035,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         # Get active cashier session for the current user
+        from django.db import transaction as db_transaction
         from .models import CashierSession
+        from .services.inventory_deduction import InsufficientStockError, deduct_order_ingredients
         from rest_framework.exceptions import ValidationError
 
         staff = self.request.user.staff
@@ -1052,85 +1053,39 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 'detail': 'Anda harus membuka sesi kasir sebelum dapat memproses pembayaran. Silakan buka sesi kasir di menu Session > Open Session.'
             })
 
-        # Save payment with processed_by and cashier_session
-        payment = serializer.save(
-            processed_by=staff,
-            cashier_session=active_session
-        )
+        with db_transaction.atomic():
+            # Save payment with processed_by and cashier_session
+            payment = serializer.save(
+                processed_by=staff,
+                cashier_session=active_session
+            )
 
-        if payment.status == 'COMPLETED':
-            order = payment.order
+            if payment.status == 'COMPLETED':
+                order = payment.order
 
-            # First, check if all ingredients are available in sufficient quantity
-            insufficient_items = []
-            for order_item in order.items.all():
+                # Lock, check and deduct all recipe ingredients from kitchen inventory at once;
+                # any shortage rejects the payment and rolls everything back
                 try:
-                    recipe = order_item.product.recipe
-                    quantity_ordered = order_item.quantity
-
-                    # Check each ingredient availability
-                    for recipe_ingredient in recipe.ingredients.all():
-                        inventory_item = recipe_ingredient.inventory_item
-                        total_quantity_needed = float(recipe_ingredient.quantity) * quantity_ordered
-
-                        if inventory_item.quantity < total_quantity_needed:
-                            insufficient_items.append({
-                                'product': order_item.product.name,
-                                'ingredient': inventory_item.name,
-                                'needed': total_quantity_needed,
-                                'available': float(inventory_item.quantity),
-                                'unit': inventory_item.unit
-                            })
-                except Recipe.DoesNotExist:
-                    # Product doesn't have a recipe, skip validation
-                    pass
-
-            # If any ingredient is insufficient, reject the payment
-            if insufficient_items:
-                from rest_framework.exceptions import ValidationError
-                error_messages = []
-                for item in insufficient_items:
-                    error_messages.append(
-                        f"{item['product']}: Stok {item['ingredient']} tidak cukup. "
-                        f"Dibutuhkan {item['needed']}{item['unit']}, tersedia {item['available']}{item['unit']}"
+                    deduct_order_ingredients(
+                        order,
+                        reference_number=f"ORDER-{order.id}",
+                        performed_by=self.request.user
                     )
-                raise ValidationError({
-                    'error': 'Stok bahan tidak mencukupi',
-                    'details': error_messages
-                })
-
-            # All ingredients available, proceed with payment
-            order.status = 'COMPLETED'
-            order.save()
-
-            # Deduct ingredients from kitchen inventory based on recipes
-            for order_item in order.items.all():
-                try:
-                    recipe = order_item.product.recipe
-                    quantity_ordered = order_item.quantity
-
-                    # Deduct each ingredient from kitchen inventory
-                    for recipe_ingredient in recipe.ingredients.all():
-                        inventory_item = recipe_ingredient.inventory_item
-                        total_quantity_needed = Decimal(str(float(recipe_ingredient.quantity) * quantity_ordered))
-
-                        # Update inventory quantity
-                        inventory_item.quantity -= total_quantity_needed
-                        inventory_item.save()
-
-                        # Create inventory transaction record (OUT)
-                        InventoryTransaction.objects.create(
-                            inventory=inventory_item,
-                            transaction_type='OUT',
-                            quantity=total_quantity_needed,
-                            unit_cost=inventory_item.cost_per_unit,
-                            reference_number=f"ORDER-{order.id}",
-                            performed_by=self.request.user,
-                            notes=f"Auto-deduction for {quantity_ordered}x {order_item.product.name} (Order #{order.id})"
+                except InsufficientStockError as e:
+                    error_messages = []
+                    for item in e.shortages:
+                        products = ', '.join(name for name, quantity in item['products'])
+                        error_messages.append(
+                            f"{products}: Stok {item['ingredient']} tidak cukup. "
+                            f"Dibutuhkan {item['needed']}{item['unit']}, tersedia {item['available']}{item['unit']}"
                         )
-                except Recipe.DoesNotExist:
-                    # Product doesn't have a recipe, skip ingredient deduction
-                    pass
+                    raise ValidationError({
+                        'error': 'Stok bahan tidak mencukupi',
+                        'details': error_messages
+                    })
+
+                order.status = 'COMPLETED'
+                order.save()
 
     @action(detail=False, methods=['get'])
     def today(self, request):
@@ -1236,6 +1191,23 @@ class PaymentViewSet(viewsets.ModelViewSet):
         })
 
 
+def _queue_changes_response(request, station):
+    """Shared kitchen/bar display queue response"""
+    from .services.kitchen_queue import get_queue_changes
+
+    branch_id = request.query_params.get('branch_id')
+    if not branch_id:
+        return Response({'error': 'branch_id required'}, status=400)
+    try:
+        branch_id = int(branch_id)
+        since = request.query_params.get('since')
+        since = int(since) if since not in (None, '') else None
+    except ValueError:
+        return Response({'error': 'branch_id and since must be integers'}, status=400)
+
+    return Response(get_queue_changes(station, branch_id, since=since, epoch=request.query_params.get('epoch')))
+
+
 class KitchenOrderViewSet(viewsets.ModelViewSet):
     queryset = KitchenOrder.objects.all()
     serializer_class = KitchenOrderSerializer
@@ -1329,27 +1301,17 @@ class KitchenOrderViewSet(viewsets.ModelViewSet):
     def queue_summary(self, request):
         """Get kitchen queue summary"""
         from .services.kitchen_printer import KitchenTicketPrinter
+        from .services.kitchen_queue import KITCHEN, get_queue
         
         branch_id = request.query_params.get('branch_id')
         if not branch_id:
             return Response({'error': 'branch_id required'}, status=400)
         
-        # Get pending orders for the branch
-        orders = self.get_queryset().filter(
-            order__branch_id=branch_id,
-            status__in=['PENDING', 'PREPARING']
-        ).order_by('-priority', 'created_at')
+        if not branch_id.isdigit():
+            return Response({'error': 'branch_id must be an integer'}, status=400)
         
-        order_data_list = []
-        for ko in orders:
-            order_data_list.append({
-                'order_number': ko.order.order_number,
-                'order_type': ko.order.order_type,
-                'table_number': ko.order.table.number if ko.order.table else None,
-                'priority': ko.priority,
-                'created_at': ko.created_at,
-                'status': ko.status
-            })
+        # Pending orders for the branch, from the in-memory display queue
+        order_data_list = get_queue(KITCHEN, int(branch_id))['orders']
         
         printer = KitchenTicketPrinter()
         summary = printer.print_summary_ticket(order_data_list)
@@ -1359,6 +1321,15 @@ class KitchenOrderViewSet(viewsets.ModelViewSet):
             'total_orders': len(order_data_list)
         })
     
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """
+        Kitchen display queue: the full queue, or only the changes since
+        ?since=<version>&epoch=<epoch> from a previous response
+        """
+        from .services.kitchen_queue import KITCHEN
+        return _queue_changes_response(request, KITCHEN)
+    
     def _calculate_prep_time(self, order):
         """Calculate estimated preparation time"""
         max_prep_time = 15
@@ -1419,6 +1390,15 @@ class BarOrderViewSet(viewsets.ModelViewSet):
 
         return Response({'status': 'bar order marked as ready'})
 
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """
+        Bar display queue: the full queue, or only the changes since
+        ?since=<version>&epoch=<epoch> from a previous response
+        """
+        from .services.kitchen_queue import BAR
+        return _queue_changes_response(request, BAR)
+
     def get_permissions(self):
         # Allow bar staff to assign, start, and mark ready
         if self.action in ['assign', 'start_preparation', 'mark_ready']:
@@ -1612,6 +1592,9 @@ class DashboardViewSet(viewsets.ViewSet):
             )
 
         today = timezone.now().date()
+        # Bounds of today as a raw created_at range (created_at__date can't use the indexes)
+        today_start = timezone.make_aware(datetime.combine(today, datetime.min.time()))
+        today_end = today_start + timedelta(days=1)
 
         # If session_id provided, filter by session; otherwise show today's data
         if session_id:
@@ -1648,7 +1631,8 @@ class DashboardViewSet(viewsets.ViewSet):
             # Original day-based logic
             orders_today = Order.objects.filter(
                 branch=branch,
-                created_at__date=today
+                created_at__gte=today_start,
+                created_at__lt=today_end
             )
 
             orders_in_session = orders_today
@@ -1657,7 +1641,8 @@ class DashboardViewSet(viewsets.ViewSet):
             # This represents actual completed sales, not just orders placed
             paid_orders_today = Payment.objects.filter(
                 order__branch=branch,
-                created_at__date=today,
+                created_at__gte=today_start,
+                created_at__lt=today_end,
                 status='COMPLETED'
             ).values('order').distinct().count()
 
@@ -1667,7 +1652,8 @@ class DashboardViewSet(viewsets.ViewSet):
             # This ensures we only count orders that have been paid
             total_revenue_today = Payment.objects.filter(
                 order__branch=branch,
-                created_at__date=today,
+                created_at__gte=today_start,
+                created_at__lt=today_end,
                 status='COMPLETED'
             ).aggregate(total=Sum('amount'))['total'] or 0
         
@@ -1697,7 +1683,8 @@ class DashboardViewSet(viewsets.ViewSet):
             active_tables_ids = Order.objects.filter(
                 branch=branch,
                 table__isnull=False,
-                created_at__date=today
+                created_at__gte=today_start,
+                created_at__lt=today_end
             ).exclude(
                 payments__status='COMPLETED'
             ).values_list('table', flat=True).distinct()
@@ -2944,74 +2931,86 @@ class CustomerFeedbackViewSet(viewsets.ModelViewSet):
 
 class KitchenTicketViewSet(viewsets.ViewSet):
     """
-    ViewSet for Kitchen and Bar order tickets (PDFs)
+    ViewSet for Kitchen and Bar order tickets (PDFs), served from the KitchenTicket catalog
 
     Endpoints:
-    - list: GET /api/kitchen-tickets/?station=KITCHEN|BAR
+    - list: GET /api/kitchen-tickets/?station=KITCHEN|BAR&order=&order_number=&branch=
+            &date=YYYY-MM-DD&date_from=&date_to=&include_archived=true
     - retrieve: GET /api/kitchen-tickets/{filename}/
     """
     permission_classes = [IsAuthenticated]
+    lookup_value_regex = '[^/]+'  # filenames contain dots
 
     def list(self, request):
-        """List available kitchen/bar order tickets"""
-        import os
-        from django.conf import settings
+        """List kitchen/bar order tickets, newest first, paginated"""
+        from .pagination import CustomPageNumberPagination
 
-        station = request.query_params.get('station', 'KITCHEN').upper()
+        params = request.query_params
+        station = params.get('station', 'KITCHEN').upper()
 
         if station not in ['KITCHEN', 'BAR']:
             return Response({'error': 'Invalid station. Use KITCHEN or BAR'}, status=status.HTTP_400_BAD_REQUEST)
 
-        folder = 'kitchen_orders' if station == 'KITCHEN' else 'bar_orders'
-        folder_path = os.path.join(settings.MEDIA_ROOT, folder)
-
-        if not os.path.exists(folder_path):
-            return Response([])
-
-        # List all PDF files, sorted by modification time (newest first)
-        files = []
-        for filename in os.listdir(folder_path):
-            if filename.endswith('.pdf'):
-                filepath = os.path.join(folder_path, filename)
-                mtime = os.path.getmtime(filepath)
-                files.append({
-                    'filename': filename,
-                    'url': f'/media/{folder}/{filename}',
-                    'modified': mtime,
-                    'station': station
-                })
-
-        # Sort by modification time (newest first)
-        files.sort(key=lambda x: x['modified'], reverse=True)
-
-        return Response(files)
+        tickets = KitchenTicket.objects.filter(station=station).select_related('order')
+        if params.get('include_archived', '').lower() != 'true':
+            tickets = tickets.filter(archived_at__isnull=True)
+        if params.get('order'):
+            tickets = tickets.filter(order_id=params['order'])
+        if params.get('order_number'):
+            tickets = tickets.filter(order__order_number=params['order_number'])
+        if params.get('branch'):
+            tickets = tickets.filter(branch_id=params['branch'])
+
+        # Local-day bounds on created_at, so the (station, created_at) index is used
+        try:
+            date_from = params.get('date_from') or params.get('date')
+            date_to = params.get('date_to') or params.get('date')
+            if date_from:
+                start = datetime.strptime(date_from, '%Y-%m-%d')
+                tickets = tickets.filter(created_at__gte=timezone.make_aware(start))
+            if date_to:
+                end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+                tickets = tickets.filter(created_at__lt=timezone.make_aware(end))
+        except ValueError:
+            return Response({'error': 'Invalid date. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = CustomPageNumberPagination()
+        page = paginator.paginate_queryset(tickets.order_by('-created_at', '-id'), request, view=self)
+        return paginator.get_paginated_response(KitchenTicketSerializer(page, many=True).data)
 
     def retrieve(self, request, pk=None):
         """Get URL for a specific ticket PDF"""
-        import os
-        from django.conf import settings
-
         # pk is the filename
-        filename = pk
+        ticket = KitchenTicket.objects.select_related('order').filter(filename=pk).first()
+        if ticket is None:
+            return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(KitchenTicketSerializer(ticket).data)
 
-        # Try kitchen folder first
-        kitchen_path = os.path.join(settings.MEDIA_ROOT, 'kitchen_orders', filename)
-        bar_path = os.path.join(settings.MEDIA_ROOT, 'bar_orders', filename)
 
-        if os.path.exists(kitchen_path):
-            return Response({
-                'filename': filename,
-                'url': f'/media/kitchen_orders/{filename}',
-                'station': 'KITCHEN'
-            })
-        elif os.path.exists(bar_path):
-            return Response({
-                'filename': filename,
-                'url': f'/media/bar_orders/{filename}',
-                'station': 'BAR'
-            })
-        else:
-            return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+class TicketRenderJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of background kitchen/bar ticket rendering jobs
+
+    Endpoints:
+    - list: GET /api/ticket-jobs/?order=<id>&status=PENDING|RUNNING|DONE|FAILED
+    - retry: POST /api/ticket-jobs/{id}/retry/
+    """
+    queryset = TicketRenderJob.objects.select_related('order')
+    serializer_class = TicketRenderJobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['order', 'status']
+    ordering = ['-created_at']
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        from .services.ticket_rendering import retry_job
+
+        job = self.get_object()
+        if job.status != 'FAILED':
+            return Response({'error': 'Only failed jobs can be retried'}, status=status.HTTP_400_BAD_REQUEST)
+        retry_job(job)
+        return Response(self.get_serializer(job).data)
 
 
 class MembershipTierBenefitViewSet(viewsets.ModelViewSet):
@@ -3044,7 +3043,10 @@ class RestaurantSettingsViewSet(viewsets.ModelViewSet):
     queryset = RestaurantSettings.objects.all()
     serializer_class = RestaurantSettingsSerializer
     permission_classes = [IsAuthenticated]
-    http_method_names = ['get', 'put', 'patch']  # No create/delete, only read and update
+    http_method_names = ['get', 'put', 'patch', 'post']  # No create/delete; POST is for actions like test_printer
+
+    def create(self, request, *args, **kwargs):
+        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
     def get_queryset(self):
         """Filter settings based on user's restaurant if staff"""
@@ -3059,9 +3061,11 @@ class RestaurantSettingsViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def test_printer(self, request):
-        """Test printer connection by pinging IP address"""
-        import subprocess
-        import platform
+        """
+        Test printer connection by opening its raw ESC/POS print port
+        Always the printer port: the endpoint must not probe arbitrary ports on the LAN
+        """
+        from .services.network_printer import PRINTER_PORT, check_printer
 
         ip_address = request.data.get('ip_address')
         if not ip_address:
@@ -3079,48 +3083,13 @@ class RestaurantSettingsViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            # Determine ping command based on OS
-            param = '-n' if platform.system().lower() == 'windows' else '-c'
-
-            # Ping with 1 packet, 2 second timeout
-            command = ['ping', param, '1', '-W', '2', ip_address]
-
-            # Execute ping
-            result = subprocess.run(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=5,
-                text=True
-            )
-
-            # Check if ping was successful
-            if result.returncode == 0:
-                return Response({
-                    'success': True,
-                    'message': f'Printer at {ip_address} is reachable',
-                    'ip_address': ip_address
-                })
-            else:
-                return Response({
-                    'success': False,
-                    'message': f'Printer at {ip_address} is not reachable',
-                    'ip_address': ip_address
-                })
-
-        except subprocess.TimeoutExpired:
-            return Response({
-                'success': False,
-                'message': f'Connection timeout to {ip_address}',
-                'ip_address': ip_address
-            })
-        except Exception as e:
-            return Response({
-                'success': False,
-                'message': f'Error testing connection: {str(e)}',
-                'ip_address': ip_address
-            })
+        reachable, message = check_printer(ip_address, PRINTER_PORT)
+        return Response({
+            'success': reachable,
+            'message': message,
+            'ip_address': ip_address,
+            'port': PRINTER_PORT
+        })
 
     @action(detail=False, methods=['get'])
     def current(self, request):
@@ -0,0 +1,171 @@
+"""
+Per-request query budget.
+
+QueryBudgetMiddleware counts the queries and database time of every request,
+across all database aliases, and:
+
+    adds a Server-Timing header     db;dur=12.4;desc="18 queries", app;dur=40.1
+    groups queries by SQL shape     the same statement run again and again is an N+1
+    logs requests over budget       with the repeated shapes and a stack sample
+
+Settings (settings.QUERY_BUDGET):
+
+    ENABLED            off by default; when off the middleware removes itself
+                       from the chain (MiddlewareNotUsed), so it costs nothing
+    MAX_QUERIES        queries per request before a warning is logged
+    MAX_DB_MS          database milliseconds per request before a warning
+    REPEAT_THRESHOLD   executions of one shape that count as an N+1
+
+assert_max_queries() is the test-side guard: like assertNumQueries, but an
+upper bound, so regression tests don't break when a query is saved.
+"""
+import logging
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_QUERIES': 50,
+    'MAX_DB_MS': 500,
+    'REPEAT_THRESHOLD': 10,
+}
+
+STACK_DEPTH = 8
+
+# Literals and IN lists vary between executions of the same statement
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?|:\w+)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def budget_settings():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_BUDGET', {})}
+
+
+def sql_shape(sql):
+    """Statement with literals and IN-list lengths collapsed, so repeats of one query compare equal"""
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def _stack_sample():
+    """The innermost project frames of the current stack (Django and site-packages skipped)"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('querybudget.py')
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts, times and groups queries by shape"""
+
+    def __init__(self, repeat_threshold=DEFAULTS['REPEAT_THRESHOLD']):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.samples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            shape = sql_shape(sql)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == self.repeat_threshold:
+                self.samples[shape] = _stack_sample()
+
+    @contextmanager
+    def record(self, aliases=None):
+        """Record every query run on the given aliases (all by default) inside the block"""
+        with ExitStack() as stack:
+            for alias in aliases or connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def repeated(self):
+        """[(shape, count)] run at least repeat_threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= self.repeat_threshold]
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request, add Server-Timing and log requests over budget or with N+1 patterns"""
+
+    def __init__(self, get_response):
+        self.config = budget_settings()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(self.config['REPEAT_THRESHOLD'])
+        started = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        timing = (
+            f'db;dur={recorder.duration_ms:.1f};desc="{recorder.count} queries", '
+            f'app;dur={max(total_ms - recorder.duration_ms, 0):.1f}'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        repeated = recorder.repeated()
+        over_budget = (
+            recorder.count > self.config['MAX_QUERIES'] or recorder.duration_ms > self.config['MAX_DB_MS']
+        )
+        if over_budget or repeated:
+            self.report(request, recorder, repeated)
+        return response
+
+    def report(self, request, recorder, repeated):
+        lines = [
+            f'{request.method} {request.path}: {recorder.count} queries, {recorder.duration_ms:.1f} ms in the database '
+            f"(budget {self.config['MAX_QUERIES']} queries / {self.config['MAX_DB_MS']} ms)"
+        ]
+        for shape, count in repeated[:3]:
+            lines.append(f'  {count}x {shape[:300]}')
+            if recorder.samples.get(shape):
+                lines.append(recorder.samples[shape].rstrip())
+        logger.warning('\n'.join(lines))
+
+
+@contextmanager
+def assert_max_queries(limit, using=DEFAULT_DB_ALIAS):
+    """
+    Fail if the block runs more than `limit` queries on `using`
+
+    Usage:
+        with assert_max_queries(6):
+            self.client.get('/api/hotel/reservations/')
+    """
+    recorder = QueryRecorder()
+    with recorder.record([using]):
+        yield recorder
+    if recorder.count > limit:
+        details = '\n'.join(f'  {count}x {shape}' for shape, count in recorder.shapes.most_common(5))
+        raise AssertionError(f'{recorder.count} queries executed, {limit} allowed. Most frequent:\n{details}')
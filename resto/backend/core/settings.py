@@ -55,6 +55,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Query counting, N+1 detection and Server-Timing; removes itself unless QUERY_BUDGET['ENABLED']
+    'core.querybudget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,9 +97,61 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests (seconds); 0 closes them after every request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock at BEGIN so concurrent writers wait on busy_timeout
+            # instead of failing with "database is locked" when a read upgrades to a write
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# PRAGMAs applied to every new SQLite connection (see core/sqlite.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 20000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -32000)),
+    'temp_store': 'MEMORY',
+}
+
+# Cache (see core/caching.py): per-process memory by default. CACHE_BACKEND=file
+# shares entries between the workers of one host, CACHE_BACKEND=redis (REDIS_URL,
+# needs the redis package) between hosts.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'resto',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+        'KEY_PREFIX': 'resto',
+    }
+}
+
+# Per-request query budget (see core/querybudget.py)
+QUERY_BUDGET = {
+    'ENABLED': os.environ.get('QUERY_BUDGET_ENABLED', 'False') == 'True',
+    'MAX_QUERIES': int(os.environ.get('QUERY_BUDGET_MAX_QUERIES', 50)),
+    'MAX_DB_MS': float(os.environ.get('QUERY_BUDGET_MAX_DB_MS', 500)),
+    'REPEAT_THRESHOLD': int(os.environ.get('QUERY_BUDGET_REPEAT_THRESHOLD', 10)),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -159,6 +213,12 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Seconds between keepalive comments on Server-Sent Events streams (/api/orders/stream/)
+SSE_KEEPALIVE_SECONDS = int(os.environ.get('SSE_KEEPALIVE_SECONDS', 15))
+# Under WSGI the streams can't stay open: they send the snapshot and ask the
+# browser to reconnect after this many seconds (polling)
+SSE_WSGI_RETRY_SECONDS = int(os.environ.get('SSE_WSGI_RETRY_SECONDS', 15))
+
 # CORS settings
 # Parse CORS_ALLOWED_ORIGINS from environment or use defaults
 cors_origins_env = os.environ.get('CORS_ALLOWED_ORIGINS', '')
@@ -4,7 +4,7 @@ echo "   STARTING HOTELBASE & RESTO SYSTEMS"
 echo "================================================"
 echo
 
-echo "[1/4] Starting PM2 processes..."
+echo "[1/4] Starting PM2 processes (backends, frontends, resto ticket worker)..."
 pm2 start ecosystem.config.js
 
 echo
@@ -28,3 +28,5 @@ echo
 echo "Resto System:     http://resto.example.com"
 echo "HotelBase System: http://hotel.example.com"
 echo
+echo "Resto ticket worker logs: pm2 logs resto-ticket-worker"
+echo
@@ -4,7 +4,7 @@ echo "   STOPPING ALL SYSTEMS"
 echo "================================================"
 echo
 
-echo "[1/2] Stopping PM2 processes..."
+echo "[1/2] Stopping PM2 processes (backends, frontends, resto ticket worker)..."
 pm2 stop all
 pm2 delete all
 